@@ -0,0 +1,130 @@
+import copy
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from core.caching import cache_is_shared
+from core.timing import cache_get
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from .models import User
+from .profiles import ROLE_PROFILES
+
+AUTH_USER_TIMEOUT = 60
+# Every role profile is joined in, and select_related caches a missing one as
+# None, so the user.<role>_profile hasattr() checks in views cost nothing.
+PROFILE_RELATIONS = tuple(ROLE_PROFILES.values())
+# Left out of the cached user, and read from the database if a view asks
+# for them: the password hash and the verification and reset tokens are
+# never written to the cache, and records_version, bumped with
+# QuerySet.update() on every result and attendance change (which no signal
+# reports), is never stale, nor written back by a save() of the cached
+# profile.
+UNCACHED_FIELDS = (
+    'password',
+    'verification_token',
+    'verification_token_created_at',
+    'password_reset_token',
+    'password_reset_token_created_at',
+    'studentprofile_profile__records_version',
+)
+
+
+def auth_user_cache_key(user_id):
+    return f"accounts:auth_user:{user_id}"
+
+
+def load_auth_user(user_id):
+    """
+    The user with every role profile joined in, from the cache when possible.
+
+    Only a cache every process shares is used: saving a user drops the
+    entry, and with a per-process cache that would leave the other workers
+    accepting a deactivated user until their copy expired.
+    """
+    if not cache_is_shared():
+        return query_auth_user(**{api_settings.USER_ID_FIELD: user_id})
+
+    key = auth_user_cache_key(user_id)
+    user = cache_get(key)
+    if user is None:
+        user = query_auth_user(**{api_settings.USER_ID_FIELD: user_id})
+        cache.set(key, user, AUTH_USER_TIMEOUT)
+    return user
+
+
+def query_auth_user(**lookup):
+    return User.objects.select_related(*PROFILE_RELATIONS).defer(*UNCACHED_FIELDS).get(**lookup)
+
+
+def invalidate_auth_user(user_id):
+    cache.delete(auth_user_cache_key(user_id))
+
+
+def invalidate_auth_users(user_ids):
+    cache.delete_many([auth_user_cache_key(user_id) for user_id in user_ids])
+
+
+def authenticate_login(email, password):
+    """
+    ModelBackend.authenticate in a single query: the user is fetched with
+    every role profile joined in, ready for the login response, and goes
+    straight into the cache the user's first authenticated request reads.
+    """
+    try:
+        user = User.objects.select_related(*PROFILE_RELATIONS).get(email=email)
+    except User.DoesNotExist:
+        # Hash anyway, so an unknown email takes as long as a wrong password.
+        User().set_password(password)
+        return None
+
+    if not user.check_password(password) or not ModelBackend().user_can_authenticate(user):
+        return None
+    if cache_is_shared():
+        cache.set(auth_user_cache_key(user.pk), strip_uncached_fields(user), AUTH_USER_TIMEOUT)
+    return user
+
+
+def strip_uncached_fields(user):
+    """A copy of `user` with UNCACHED_FIELDS deferred, as query_auth_user() loads it."""
+    user = copy.deepcopy(user)
+    for path in UNCACHED_FIELDS:
+        *relations, name = path.split('__')
+        instance = user
+        for relation in relations:
+            instance = getattr(instance, relation, None)
+        if instance is not None:
+            instance.__dict__.pop(name, None)
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user, with its role profile,
+    from a short-lived cache entry instead of querying on every request,
+    provided the cache is shared (see load_auth_user). Saving or deleting
+    the user or a profile drops the entry (see signals), and so does
+    User.objects.update() (see UserQuerySet).
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        try:
+            user = load_auth_user(user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # The password hash is not cached, so this reads it from the database.
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
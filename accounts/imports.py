@@ -0,0 +1,306 @@
+import csv
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+from rest_framework import serializers
+from .models import User, StudentProfile, AdmissionSequence, Gender, UserRole, StudentImportJob, StudentImportJobStatus
+from .stats import invalidate_user_counts
+
+IMPORT_CHUNK_SIZE = 500
+SUPPORTED_FORMATS = ('.csv', '.xlsx')
+IMPORT_MAX_ATTEMPTS = 3
+# A running import is left to its worker for this long; if the worker dies
+# the job is claimed again. Rows it already created are then reported as
+# existing emails.
+IMPORT_CLAIM_LEASE = timedelta(hours=1)
+
+logger = logging.getLogger(__name__)
+
+
+class StudentImportError(Exception):
+    pass
+
+
+class StudentImportRowSerializer(serializers.Serializer):
+    email = serializers.EmailField()
+    first_name = serializers.CharField(max_length=100)
+    last_name = serializers.CharField(max_length=100)
+    password = serializers.CharField(min_length=8, required=False, allow_blank=True)
+    class_level = serializers.CharField(max_length=50, required=False, allow_blank=True)
+    academic_year = serializers.CharField(max_length=20, required=False, allow_blank=True)
+    gender = serializers.ChoiceField(choices=Gender.choices, required=False, allow_blank=True)
+    birth_date = serializers.DateField(required=False, allow_null=True)
+    phone = serializers.CharField(max_length=15, required=False, allow_blank=True)
+    address = serializers.CharField(required=False, allow_blank=True)
+    parent_name = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    parent_contact = serializers.CharField(max_length=15, required=False, allow_blank=True)
+
+    def to_internal_value(self, data):
+        # Spreadsheet cells come back as '' or None when empty; treat both as missing.
+        data = {key: value for key, value in data.items() if key and value not in ('', None)}
+        return super().to_internal_value(data)
+
+
+def file_format(filename):
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension not in SUPPORTED_FORMATS:
+        raise StudentImportError(
+            f"Unsupported file type '{extension}'. Upload one of: {', '.join(SUPPORTED_FORMATS)}."
+        )
+    return extension
+
+
+def read_rows(file, filename):
+    """Yield (row number, {column: value}) from a CSV or XLSX file, one row at a time."""
+    if file_format(filename) == '.csv':
+        return read_csv_rows(file)
+    return read_xlsx_rows(file)
+
+
+def read_csv_rows(file):
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(text)
+    for row_number, row in enumerate(reader, start=2):
+        yield row_number, {clean_header(key): value for key, value in row.items()}
+
+
+def read_xlsx_rows(file):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise StudentImportError("XLSX import needs openpyxl installed; upload a CSV file instead.")
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [clean_header(header) for header in next(rows, ())]
+        for row_number, values in enumerate(rows, start=2):
+            yield row_number, dict(zip(headers, values))
+    finally:
+        workbook.close()
+
+
+def clean_header(header):
+    return str(header).strip().lower().replace(' ', '_') if header is not None else None
+
+
+def chunked(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def init_hash_worker():
+    # Workers started with "spawn" import nothing from the parent.
+    import django
+    django.setup()
+
+
+class StudentImporter:
+    """
+    Creates students from file rows in chunks: each chunk is validated with
+    one query for already-registered emails, its passwords are hashed, and
+    its users and profiles are written with bulk_create. Invalid rows are
+    reported and skipped; valid rows are still imported.
+
+    Passwords are hashed in-process unless `workers` asks for a process
+    pool. The pool suits the import_students command, which has the machine
+    to itself; an upload handled by a web worker hashes in-process rather
+    than starting a pool per request.
+    """
+
+    def __init__(self, chunk_size=IMPORT_CHUNK_SIZE, workers=1):
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.seen_emails = set()
+        self.created = 0
+        self.rows = 0
+        self.errors = []
+
+    def run(self, rows):
+        pool = None
+        if self.workers > 1:
+            pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_hash_worker)
+        try:
+            for chunk in chunked(rows, self.chunk_size):
+                self.import_chunk(chunk, pool)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        if self.created:
+            invalidate_user_counts()
+        return {'rows': self.rows, 'created': self.created, 'errors': self.errors}
+
+    def import_chunk(self, chunk, pool):
+        self.rows += len(chunk)
+        valid = self.validate_chunk(chunk)
+        if not valid:
+            return
+
+        hashes = self.hash_passwords([data['password'] for _, data in valid if data.get('password')], pool)
+        rows = [
+            (row_number, data, next(hashes) if data.get('password') else make_password(None))
+            for row_number, data in valid
+        ]
+
+        while rows:
+            try:
+                self.insert(rows)
+            except IntegrityError as e:
+                # Another request registered some of these emails after
+                # validate_chunk() looked for them: report those rows and
+                # try the rest again.
+                registered = self.registered_emails([data['email'] for _, data, _ in rows])
+                remaining = []
+                for row in rows:
+                    if row[1]['email'].lower() in registered:
+                        self.add_error(row[0], {'email': ["A user with this email already exists."]})
+                    else:
+                        remaining.append(row)
+                if len(remaining) == len(rows):
+                    for row_number, _, _ in rows:
+                        self.add_error(row_number, {'non_field_errors': [f"Could not be saved: {e}"]})
+                    return
+                rows = remaining
+            else:
+                self.created += len(rows)
+                return
+
+    def insert(self, rows):
+        users = []
+        profiles = []
+        for _, data, password in rows:
+            fields = {key: value for key, value in data.items() if key != 'password'}
+            user = User(
+                email=fields.pop('email'),
+                first_name=fields.pop('first_name'),
+                last_name=fields.pop('last_name'),
+                role=UserRole.STUDENT,
+                is_active=True,
+                is_verified=True,
+                password=password,
+            )
+            users.append(user)
+            profiles.append(StudentProfile(user=user, **fields))
+
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            AdmissionSequence.objects.assign(profiles)
+            StudentProfile.objects.bulk_create(profiles)
+
+    def validate_chunk(self, chunk):
+        valid = []
+        for row_number, row in chunk:
+            serializer = StudentImportRowSerializer(data=row)
+            if not serializer.is_valid():
+                self.add_error(row_number, serializer.errors)
+                continue
+
+            data = serializer.validated_data
+            data['email'] = User.objects.normalize_email(data['email'])
+            email = data['email'].lower()
+            if email in self.seen_emails:
+                self.add_error(row_number, {'email': ["This email appears more than once in the file."]})
+                continue
+            self.seen_emails.add(email)
+            valid.append((row_number, data))
+
+        registered = self.registered_emails([data['email'] for _, data in valid])
+        accepted = []
+        for row_number, data in valid:
+            if data['email'].lower() in registered:
+                self.add_error(row_number, {'email': ["A user with this email already exists."]})
+            else:
+                accepted.append((row_number, data))
+        return accepted
+
+    def registered_emails(self, emails):
+        """The lowercased emails among `emails` that already have a user."""
+        return set(
+            User.objects.annotate(email_lower=Lower('email'))
+            .filter(email_lower__in=[email.lower() for email in emails])
+            .values_list('email_lower', flat=True)
+        )
+
+    def hash_passwords(self, passwords, pool):
+        if pool is None or len(passwords) < 2:
+            return iter([make_password(password) for password in passwords])
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return iter(list(pool.map(make_password, passwords, chunksize=chunksize)))
+
+    def add_error(self, row_number, errors):
+        self.errors.append({'row': row_number, 'errors': errors})
+
+
+def import_students(file, filename, **options):
+    return StudentImporter(**options).run(read_rows(file, filename))
+
+
+def queue_import(upload, created_by=None):
+    """Store an uploaded file for the import worker and return its job."""
+    file_format(upload.name)
+    return StudentImportJob.objects.create(filename=upload.name, content=upload.read(), created_by=created_by)
+
+
+def claim_import_job():
+    """
+    Move the oldest pending import, or a running one whose lease has run
+    out, to running and return it, or None. The claim is a conditional
+    UPDATE, so several workers never run the same file.
+    """
+    now = timezone.now()
+    expired = Q(status=StudentImportJobStatus.RUNNING, started_at__lt=now - IMPORT_CLAIM_LEASE)
+    StudentImportJob.objects.filter(expired, attempts__gte=IMPORT_MAX_ATTEMPTS).update(
+        status=StudentImportJobStatus.FAILED, error='The worker stopped while importing this file.', finished_at=now
+    )
+
+    claimable = StudentImportJob.objects.filter(Q(status=StudentImportJobStatus.PENDING) | expired)
+    for job_id in claimable.order_by('id').values_list('id', flat=True):
+        if claimable.filter(pk=job_id).update(
+            status=StudentImportJobStatus.RUNNING, started_at=now, attempts=F('attempts') + 1
+        ):
+            return StudentImportJob.objects.get(pk=job_id)
+    return None
+
+
+def run_import_job(job, workers=1):
+    """Import the job's file and record the outcome on the job."""
+    try:
+        job.result = import_students(io.BytesIO(bytes(job.content)), job.filename, workers=workers)
+        job.status = StudentImportJobStatus.DONE
+        job.error = ''
+    except Exception as e:
+        if not isinstance(e, StudentImportError):
+            logger.exception("Student import %s failed", job.pk)
+        job.status = StudentImportJobStatus.FAILED
+        job.error = str(e)
+    job.finished_at = timezone.now()
+    # The file is not needed once it has been imported.
+    job.content = b''
+    job.save(update_fields=['result', 'status', 'error', 'finished_at', 'content'])
+    return job
+
+
+def process_import_jobs(workers=1):
+    """Run queued imports until there are none and return how many ran."""
+    processed = 0
+    while True:
+        close_old_connections()
+        job = claim_import_job()
+        if job is None:
+            return processed
+        run_import_job(job, workers)
+        processed += 1
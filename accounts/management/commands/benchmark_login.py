@@ -0,0 +1,96 @@
+import statistics
+import time
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from accounts.authentication import invalidate_auth_user
+from accounts.models import User, StudentProfile, UserRole
+from accounts.views import LoginAPIView
+
+PASSWORD = 'benchmark-pass-123'
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Measure login latency and throughput for a burst of student logins"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=200,
+            help='Students created for the run, each logging in once (default: 200)'
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 1:
+            raise CommandError("--users must be at least 1")
+
+        # The run happens inside a transaction that is rolled back, so the
+        # benchmark leaves the database as it found it.
+        try:
+            with transaction.atomic():
+                users = self.create_students(options['users'])
+                timings, queries = self.log_in([user.email for user in users])
+                raise Rollback
+        except Rollback:
+            pass
+        # Logging in cached the users; they no longer exist.
+        for user in users:
+            invalidate_auth_user(user.pk)
+
+        encoded = make_password(PASSWORD)
+        hashing = min(self.time_ms(check_password, PASSWORD, encoded) for _ in range(3))
+
+        mean = statistics.mean(timings)
+        self.stdout.write(
+            f"{'logins':>8} {'queries':>8} {'mean ms':>8} {'p95 ms':>8} {'hash ms':>8} {'logins/s':>9}"
+        )
+        self.stdout.write(
+            f"{len(timings):>8} {queries / len(timings):>8.1f} {mean:>8.1f} "
+            f"{statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else mean:>8.1f} "
+            f"{hashing:>8.1f} {1000 / mean:>9.1f}"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Password hashing is about {min(100, 100 * hashing / mean):.0f}% of each login; "
+            f"logins/s is per worker process."
+        ))
+
+    def time_ms(self, function, *args):
+        started = time.perf_counter()
+        function(*args)
+        return (time.perf_counter() - started) * 1000
+
+    def create_students(self, count):
+        password = make_password(PASSWORD)
+        users = User.objects.bulk_create(
+            User(
+                email=f'benchmark.student{i}@example.com', first_name='Bench', last_name=f'Student{i}',
+                role=UserRole.STUDENT, is_active=True, is_verified=True, password=password,
+            )
+            for i in range(count)
+        )
+        StudentProfile.objects.bulk_create(
+            StudentProfile(user=user, admission_number=f'BENCH{i:06d}', class_level='Benchmark')
+            for i, user in enumerate(users)
+        )
+        return users
+
+    def log_in(self, emails):
+        view = LoginAPIView.as_view()
+        factory = APIRequestFactory()
+        timings = []
+        with CaptureQueriesContext(connection) as context:
+            for email in emails:
+                request = factory.post('/api/accounts/login/', {'email': email, 'password': PASSWORD}, format='json')
+                started = time.perf_counter()
+                response = view(request)
+                timings.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    raise CommandError(f"Login failed for {email}: {response.data}")
+        return timings, len(context.captured_queries)
@@ -0,0 +1,73 @@
+import time
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from accounts.models import User, TeacherProfile, Classes, Subject, Lesson, UserRole
+from assessment.models import Exam, Assignment, Result
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Time TeacherProfile.delete for teachers with growing numbers of results and lessons"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--results',
+            type=int,
+            action='append',
+            help='Results owned by the teacher; repeat for several runs (default: 100, 1000, 10000)'
+        )
+
+    def handle(self, *args, **options):
+        sizes = options['results'] or [100, 1000, 10000]
+        if min(sizes) < 1:
+            raise CommandError("--results must be at least 1")
+
+        self.stdout.write(f"{'results':>8} {'lessons':>8} {'queries':>8} {'delete ms':>10}")
+        for size in sizes:
+            queries, elapsed = self.run(size)
+            self.stdout.write(f"{size:>8} {size // 10:>8} {queries:>8} {elapsed:>10.1f}")
+
+    def run(self, size):
+        # Each run builds its teacher inside a transaction that is rolled back,
+        # so the benchmark leaves the database as it found it.
+        try:
+            with transaction.atomic():
+                teacher = self.create_teacher(size)
+                with CaptureQueriesContext(connection) as context:
+                    started = time.perf_counter()
+                    teacher.delete()
+                    elapsed = (time.perf_counter() - started) * 1000
+                raise Rollback
+        except Rollback:
+            pass
+        return len(context.captured_queries), elapsed
+
+    def create_teacher(self, size):
+        user = User(
+            email='benchmark.teacher@example.com', first_name='Bench', last_name='Teacher',
+            role=UserRole.TEACHER, is_active=True, is_verified=True
+        )
+        user.set_unusable_password()
+        user.save()
+        teacher = TeacherProfile.objects.create(user=user)
+
+        class_ref = Classes.objects.create(name='Benchmark class', teacher=teacher)
+        subject = Subject.objects.create(name='Benchmark subject', assigned_class=class_ref, teacher=teacher)
+        exam = Exam.objects.create(title='Benchmark exam', subject=subject, teacher=teacher, exam_date=date.today())
+        assignment = Assignment.objects.create(
+            title='Benchmark assignment', description='', subject=subject, teacher=teacher, due_date=date.today()
+        )
+
+        Lesson.objects.bulk_create(
+            Lesson(title=f'Lesson {i}', content='', subject=subject, date=date.today()) for i in range(size // 10)
+        )
+        Result.objects.bulk_create(
+            Result(exam=exam if i % 2 else None, assignment=None if i % 2 else assignment, score=50)
+            for i in range(size)
+        )
+        return teacher
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    help = "Delete accounts that were never verified; meant to run from cron or a scheduler"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=24,
+            help='Delete users still unverified this many hours after signing up (default: 24)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Users deleted per transaction (default: 500)'
+        )
+
+    def handle(self, *args, **options):
+        if options['hours'] < 0 or options['batch_size'] < 1:
+            raise CommandError("--hours must be positive and --batch-size at least 1")
+
+        deleted = User.objects.cleanup_unverified_users(
+            hours_old=options['hours'], batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(f"✅ Deleted {deleted} unverified users."))
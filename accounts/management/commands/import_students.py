@@ -0,0 +1,43 @@
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from accounts.imports import import_students, StudentImportError, IMPORT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = "Create students in bulk from a CSV or XLSX file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or XLSX file with one student per row')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=IMPORT_CHUNK_SIZE,
+            help=f'Rows validated and inserted together (default: {IMPORT_CHUNK_SIZE})'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Processes used to hash passwords (default: one per CPU, 1 hashes in-process)'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be at least 1")
+
+        workers = os.cpu_count() if options['workers'] is None else options['workers']
+        started = time.perf_counter()
+        try:
+            with open(options['path'], 'rb') as file:
+                result = import_students(
+                    file, options['path'], chunk_size=options['chunk_size'], workers=workers
+                )
+        except (OSError, StudentImportError) as e:
+            raise CommandError(str(e))
+
+        for error in result['errors']:
+            self.stdout.write(self.style.WARNING(f"Row {error['row']}: {error['errors']}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Imported {result['created']} of {result['rows']} students "
+            f"in {time.perf_counter() - started:.1f}s ({len(result['errors'])} rows skipped)."
+        ))
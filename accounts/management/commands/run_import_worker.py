@@ -0,0 +1,42 @@
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from accounts.imports import process_import_jobs
+
+
+class Command(BaseCommand):
+    help = "Import the student files uploaded through the API"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Processes used to hash passwords (default: one per CPU, 1 hashes in-process)'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5,
+            help='Seconds to wait before checking an empty queue again (default: 5)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit as soon as the queue is empty instead of polling'
+        )
+
+    def handle(self, *args, **options):
+        workers = os.cpu_count() if options['workers'] is None else options['workers']
+        if workers < 1:
+            raise CommandError("--workers must be at least 1")
+
+        while True:
+            started = time.perf_counter()
+            processed = process_import_jobs(workers=workers)
+            if processed:
+                self.stdout.write(self.style.SUCCESS(
+                    f"✅ Ran {processed} student imports in {time.perf_counter() - started:.1f}s."
+                ))
+            if options['once']:
+                return
+            time.sleep(options['poll_interval'])
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-17 18:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0007_socialmedialink"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AdmissionSequence",
+            fields=[
+                (
+                    "year",
+                    models.PositiveIntegerField(primary_key=True, serialize=False),
+                ),
+                ("last_number", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
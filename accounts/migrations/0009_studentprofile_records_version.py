@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-17 18:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0008_admissionsequence"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="studentprofile",
+            name="records_version",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.14 on 2026-10-17 18:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0009_studentprofile_records_version"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["is_verified", "date_joined"],
+                name="accounts_us_is_veri_f07915_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.14 on 2026-10-17 18:55
+
+from django.db import migrations
+from django.db.models import Q
+
+ONBOARDING_FIELDS = (
+    "phone", "address", "gender", "birth_date",
+    "parent_name", "parent_contact", "class_level", "photo",
+)
+
+
+def recompute_is_onboarded(apps, schema_editor):
+    # StudentProfile.save() now derives is_onboarded from these fields on
+    # every save, so the flag is recomputed for every row here. This is a
+    # data change: a student marked onboarded by hand with a field still
+    # empty goes back to not onboarded, just as their next save() would do.
+    StudentProfile = apps.get_model("accounts", "StudentProfile")
+    missing = Q()
+    for field in ONBOARDING_FIELDS:
+        missing |= Q(**{f"{field}__isnull": True})
+        if field != "birth_date":
+            missing |= Q(**{field: ""})
+    StudentProfile.objects.filter(missing).update(is_onboarded=False)
+    StudentProfile.objects.exclude(missing).update(is_onboarded=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0010_user_unverified_cleanup_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(recompute_is_onboarded, migrations.RunPython.noop),
+    ]
@@ -6,7 +6,6 @@ from datetime import timedelta
 from django.conf import settings
 from cloudinary.models import CloudinaryField
 from datetime import date
-from django.utils.crypto import get_random_string
 
 class Gender(models.TextChoices):
     MALE = "M", "Male"
@@ -20,7 +19,19 @@ class UserRole(models.TextChoices):
     TEACHER = "teacher", "Teacher"
     STUDENT = "student", "Student"
 
-class UserManager(BaseUserManager):
+class UserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        # update() sends no post_save, so the cached copies the JWT
+        # authentication keeps of these users are dropped here instead.
+        from .authentication import invalidate_auth_users
+
+        user_ids = list(self.values_list('pk', flat=True))
+        rows = super().update(**kwargs)
+        invalidate_auth_users(user_ids)
+        return rows
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError("Users must have an email address")
@@ -69,19 +80,23 @@ class UserManager(BaseUserManager):
             
         return self.create_user(email, password, **extra_fields)
     
-    def cleanup_unverified_users(self, hours_old=24):
-        
-        from django.utils import timezone
-        from datetime import timedelta
-        
+    def cleanup_unverified_users(self, hours_old=24, batch_size=500):
+        """
+        Delete accounts left unverified for more than hours_old hours, in
+        batches of batch_size so each transaction (and its cascade) stays
+        short. Returns the number of users deleted. Run it on a schedule
+        through the cleanup_unverified_users command, not in a request.
+        """
         cutoff_time = timezone.now() - timedelta(hours=hours_old)
-        unverified_users = self.filter(
-            is_verified=False,
-            date_joined__lt=cutoff_time
-        )
-        count = unverified_users.count()
-        unverified_users.delete()
-        return count
+        stale = self.filter(is_verified=False, date_joined__lt=cutoff_time).order_by('date_joined')
+        deleted = 0
+        while True:
+            batch = list(stale.values_list('pk', flat=True)[:batch_size])
+            if not batch:
+                return deleted
+            with transaction.atomic(using=self.db):
+                _, per_model = self.filter(pk__in=batch, is_verified=False).delete()
+            deleted += per_model.get(self.model._meta.label, 0)
 
 class User(AbstractBaseUser, PermissionsMixin):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -141,6 +156,7 @@ class User(AbstractBaseUser, PermissionsMixin):
         indexes = [
             models.Index(fields=['email']),
             models.Index(fields=['verification_token']),
+            models.Index(fields=['is_verified', 'date_joined']),
         ]
 
     def __str__(self):
@@ -152,6 +168,26 @@ class User(AbstractBaseUser, PermissionsMixin):
     def get_short_name(self):
         return self.first_name
 
+    # Profiles are reachable as <model>_profile (e.g. teacherprofile_profile)
+    # because of the "%(class)s_profile" related_name on ProfileMixin. These
+    # aliases give views the short names they use; a missing profile raises
+    # RelatedObjectDoesNotExist, so hasattr() still works as a role check.
+    @property
+    def admin_profile(self):
+        return self.adminprofile_profile
+
+    @property
+    def parent_profile(self):
+        return self.parentprofile_profile
+
+    @property
+    def teacher_profile(self):
+        return self.teacherprofile_profile
+
+    @property
+    def student_profile(self):
+        return self.studentprofile_profile
+
 class ProfileMixin(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="%(class)s_profile")
     phone = models.CharField(max_length=15, blank=True, null=True)
@@ -185,39 +221,15 @@ class TeacherProfile(ProfileMixin):
     is_principal = models.BooleanField(default=False)
 
     def delete(self, *args, **kwargs):
-        from assessment.models import Exam, Assignment, Result
-        from attendance.models import AttendanceRecord
-        from accounts.models import Classes, Subject, Lesson
-        from announcements.models import AnnouncementAudience
         from events.models import EventParticipant
 
-        with transaction.atomic():  
-            Classes.objects.filter(teacher=self).update(teacher=None)
-            Subject.objects.filter(teacher=self).update(teacher=None)
-            Exam.objects.filter(teacher=self).update(teacher=None)
-            Assignment.objects.filter(teacher=self).update(teacher=None)
-            AttendanceRecord.objects.filter(recorded_by=self).update(recorded_by=None)
-            
-            lessons = Lesson.objects.filter(subject__teacher=self)
-            for lesson in lessons:
-                lesson.subject.teacher = None
-                lesson.subject.save()
-            
-            results = Result.objects.filter(
-                models.Q(exam__teacher=self) | 
-                models.Q(assignment__teacher=self)
-            )
-            for result in results:
-                if result.exam and result.exam.teacher == self:
-                    result.exam.teacher = None
-                    result.exam.save()
-                if result.assignment and result.assignment.teacher == self:
-                    result.assignment.teacher = None
-                    result.assignment.save()
-            
-            AnnouncementAudience.objects.filter(teacher=self).delete()
+        # Classes, subjects, exams, assignments and attendance records keep
+        # their rows: those foreign keys are SET_NULL, which the deletion
+        # collector applies as one UPDATE per relation, so the statement count
+        # does not grow with the teacher's history. Event registrations go.
+        with transaction.atomic():
             EventParticipant.objects.filter(teacher=self).delete()
-            
+
             user = self.user
             super().delete(*args, **kwargs)
             user.delete()
@@ -231,24 +243,85 @@ class StudentProfile(ProfileMixin):
     academic_year = models.CharField(max_length=20, blank=True)
     medical_notes = models.TextField(blank=True)
     is_onboarded = models.BooleanField(default=False)
+    # Bumped whenever the student's results or attendance change; cached
+    # report cards are keyed by it.
+    records_version = models.PositiveIntegerField(default=0, editable=False)
+
+    # Details a student must fill in before onboarding counts as complete.
+    ONBOARDING_FIELDS = (
+        'phone', 'address', 'gender', 'birth_date',
+        'parent_name', 'parent_contact', 'class_level', 'photo',
+    )
 
     
     def save(self, *args, **kwargs):
         if not self.admission_number:
-            year = date.today().year
-            prefix = str(year)[-2:] 
-            random_part = get_random_string(4, allowed_chars="0123456789")
-            admission_number = f"ADM{prefix}{random_part}"
-
-            
-            while StudentProfile.objects.filter(admission_number=admission_number).exists():
-                random_part = get_random_string(4, allowed_chars="0123456789")
-                admission_number = f"ADM{prefix}{random_part}"
+            self.admission_number = AdmissionSequence.objects.reserve()[0]
 
-            self.admission_number = admission_number
+        # Kept in step on every save so login can read it instead of
+        # re-checking the fields.
+        self.is_onboarded = all(getattr(self, field) for field in self.ONBOARDING_FIELDS)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(self.ONBOARDING_FIELDS):
+            kwargs['update_fields'] = {*update_fields, 'is_onboarded'}
 
         super().save(*args, **kwargs)
-   
+
+
+class AdmissionSequenceManager(models.Manager):
+    def reserve(self, count=1, year=None):
+        """
+        Reserve count consecutive admission numbers for the year (default: this
+        year) and return them, e.g. ['ADM250001', 'ADM250002']. The sequence
+        row stays locked until the block is read back, so concurrent signups
+        never get the same number and a whole intake costs one allocation.
+        """
+        year = year or date.today().year
+        sequence = self.filter(year=year)
+        with transaction.atomic(using=self.db):
+            # The UPDATE takes the row lock, so the read below sees our block.
+            if not sequence.update(last_number=models.F('last_number') + count):
+                self.get_or_create(year=year, defaults={'last_number': self.highest_issued(year)})
+                sequence.update(last_number=models.F('last_number') + count)
+            last = sequence.values_list('last_number', flat=True).get()
+        return [AdmissionSequence.format(year, number) for number in range(last - count + 1, last + 1)]
+
+    def assign(self, profiles, year=None):
+        """Give every profile without an admission number the next one in sequence."""
+        pending = [profile for profile in profiles if not profile.admission_number]
+        if pending:
+            for profile, number in zip(pending, self.reserve(len(pending), year)):
+                profile.admission_number = number
+        return profiles
+
+    def highest_issued(self, year):
+        # Numbers issued before the sequence existed (random ADM<yy>NNNN) are
+        # scanned once per year so the sequence starts above all of them.
+        prefix = AdmissionSequence.prefix(year)
+        issued = StudentProfile.objects.filter(admission_number__startswith=prefix).values_list(
+            'admission_number', flat=True
+        )
+        suffixes = [number[len(prefix):] for number in issued]
+        return max((int(suffix) for suffix in suffixes if suffix.isdigit()), default=0)
+
+
+class AdmissionSequence(models.Model):
+    year = models.PositiveIntegerField(primary_key=True)
+    last_number = models.PositiveIntegerField(default=0)
+
+    objects = AdmissionSequenceManager()
+
+    @staticmethod
+    def prefix(year):
+        return f"ADM{str(year)[-2:]}"
+
+    @classmethod
+    def format(cls, year, number):
+        return f"{cls.prefix(year)}{number:04d}"
+
+    def __str__(self):
+        return f"{self.year}: {self.last_number}"
+
 class AcademicYear(models.Model):
     name = models.CharField(max_length=20, unique=True)  
     current = models.BooleanField(default=False)
@@ -326,4 +399,41 @@ class Lesson(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.title} ({self.subject.name})"
\ No newline at end of file
+        return f"{self.title} ({self.subject.name})"
+
+class StudentImportJobStatus(models.TextChoices):
+    PENDING = "pending", "Pending"
+    RUNNING = "running", "Running"
+    DONE = "done", "Done"
+    FAILED = "failed", "Failed"
+
+
+class StudentImportJob(models.Model):
+    """
+    An uploaded student file waiting for the import worker. Hashing the
+    passwords of a real file takes minutes, far longer than a request may.
+    """
+    filename = models.CharField(max_length=255)
+    content = models.BinaryField()
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='student_import_jobs'
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=StudentImportJobStatus.choices,
+        default=StudentImportJobStatus.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id']),
+        ]
+
+    def __str__(self):
+        return f"Student import {self.filename}: {self.status}"
@@ -0,0 +1,36 @@
+from .models import User, UserRole
+
+# Role -> reverse one-to-one holding that role's profile.
+ROLE_PROFILES = {
+    UserRole.ADMIN: "adminprofile_profile",
+    UserRole.PARENT: "parentprofile_profile",
+    UserRole.TEACHER: "teacherprofile_profile",
+    UserRole.STUDENT: "studentprofile_profile",
+}
+
+
+def load_user_with_profile(user_id):
+    """
+    The user with their role profile joined in, in one query, or None. The
+    role isn't known until the row is read, so every profile table is
+    LEFT JOINed; each matches at most one row.
+    """
+    return User.objects.select_related(*ROLE_PROFILES.values()).filter(pk=user_id).first()
+
+
+def role_profile(user):
+    """
+    The profile matching the user's role, or None if they have none. Free
+    when the relation was loaded with the user (see load_user_with_profile
+    and the cached JWT user); otherwise it costs one query.
+    """
+    relation = ROLE_PROFILES.get(user.role)
+    return getattr(user, relation, None) if relation else None
+
+
+def profile_version(user, profile):
+    """What a profile response is built from; the ETag is derived from it."""
+    return (
+        user.pk, user.role, user.last_updated,
+        profile.pk if profile else None, profile.updated_at if profile else None,
+    )
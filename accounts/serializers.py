@@ -1,12 +1,11 @@
 from rest_framework import serializers
 from .models import User, AdminProfile, TeacherProfile, StudentProfile, ParentProfile, SocialMediaLink
-from django.core.mail import send_mail
+from core.mail import queue_mail
 from django.conf import settings
 import uuid
 from django.db import IntegrityError
 from .models import Classes, Subject, Lesson
 from datetime import datetime
-from django.utils.crypto import get_random_string
 from django.db import IntegrityError 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -49,10 +48,6 @@ class UserSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         try:
-          
-            User.objects.cleanup_unverified_users(hours_old=24)
-            
-           
             user = User.objects.create_user(
                 email=validated_data['email'],
                 password=validated_data['password'],
@@ -80,21 +75,14 @@ class UserSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({'error': [str(e)]})
 
     def send_verification_email(self, user):
-       
+        # Queued in the caller's transaction; run_mail_worker does the sending.
         verification_link = f"{settings.FRONTEND_URL}/verify-email?token={user.verification_token}&email={user.email}"
-        try:
-            send_mail(
-                "Verify Your Email Address",
-                f"Please click this link to verify your email: {verification_link}\n\nOr use this verification token: {user.verification_token}",
-                settings.DEFAULT_FROM_EMAIL,
-                [user.email],
-                fail_silently=False,
-            )
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Failed to send verification email: {e}")
-            raise
+        queue_mail(
+            "Verify Your Email Address",
+            f"Please click this link to verify your email: {verification_link}\n\nOr use this verification token: {user.verification_token}",
+            settings.DEFAULT_FROM_EMAIL,
+            [user.email],
+        )
 class AdminProfileSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     
@@ -343,8 +331,9 @@ class StudentProfileSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = StudentProfile
-        fields = "__all__"
-        read_only_fields = ["created_at", "updated_at", "admission_number"]
+        exclude = ["records_version"]
+        # save() derives is_onboarded from the onboarding fields.
+        read_only_fields = ["created_at", "updated_at", "admission_number", "is_onboarded"]
 
     def create(self, validated_data):
         user_data = validated_data.pop("user")
@@ -354,25 +343,7 @@ class StudentProfileSerializer(serializers.ModelSerializer):
             user.set_password(password)
             user.save()
 
-
-        
-        year = datetime.date.today().year
-        prefix = str(year)[-2:]  
-        
-        random_part = get_random_string(4, allowed_chars="0123456789")
-        admission_number = f"ADM{prefix}{random_part}"
-
-       
-        
-        while StudentProfile.objects.filter(admission_number=admission_number).exists():
-            random_part = get_random_string(4, allowed_chars="0123456789")
-            admission_number = f"ADM{prefix}{random_part}"
-
-        student_profile = StudentProfile.objects.create(
-            user=user,
-            admission_number=admission_number,
-            **validated_data
-        )
+        student_profile = StudentProfile.objects.create(user=user, **validated_data)
         return student_profile
     
 class StudentOnboardingSerializer(serializers.ModelSerializer):
@@ -413,14 +384,7 @@ class StudentOnboardingSerializer(serializers.ModelSerializer):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         
-        required_fields = [
-            'phone', 'address', 'gender',
-            'birth_date', 'parent_name', 'parent_contact',
-            'class_level', 'photo'
-        ]
-        if all(getattr(instance, field) for field in required_fields):
-            instance.is_onboarded = True
-        
+        # save() sets is_onboarded once every onboarding field is filled in.
         instance.save()
         return instance
 
@@ -0,0 +1,45 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import User, AdminProfile, TeacherProfile, StudentProfile, ParentProfile
+from .authentication import invalidate_auth_user
+from .stats import invalidate_user_counts
+
+PROFILE_MODELS = (AdminProfile, TeacherProfile, StudentProfile, ParentProfile)
+
+# Only these User fields feed the dashboard statistics.
+COUNTED_USER_FIELDS = {"role", "is_verified"}
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_counts_on_user_save(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields is None or COUNTED_USER_FIELDS & set(update_fields):
+        invalidate_user_counts()
+
+
+@receiver(post_delete, sender=User)
+def invalidate_user_counts_on_user_delete(sender, instance, **kwargs):
+    invalidate_user_counts()
+
+
+def invalidate_user_counts_on_profile_change(sender, instance, **kwargs):
+    invalidate_user_counts()
+
+
+for model in PROFILE_MODELS:
+    post_save.connect(invalidate_user_counts_on_profile_change, sender=model)
+    post_delete.connect(invalidate_user_counts_on_profile_change, sender=model)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_auth_user_on_user_change(sender, instance, **kwargs):
+    invalidate_auth_user(instance.pk)
+
+
+def invalidate_auth_user_on_profile_change(sender, instance, **kwargs):
+    invalidate_auth_user(instance.user_id)
+
+
+for model in PROFILE_MODELS:
+    post_save.connect(invalidate_auth_user_on_profile_change, sender=model)
+    post_delete.connect(invalidate_auth_user_on_profile_change, sender=model)
@@ -0,0 +1,65 @@
+from django.core.cache import cache
+from core.caching import shared_cache_timeout
+from core.timing import cache_get
+from django.db.models import Count, Q
+from .models import User, StudentProfile, Gender
+
+USER_COUNTS_CACHE_KEY = "accounts:user_counts"
+# Saves and deletes drop the entry (see signals), which only reaches every
+# worker through a shared cache; with LocMemCache the counts are kept for
+# LOCAL_CACHE_MAX_TIMEOUT seconds at most.
+USER_COUNTS_TIMEOUT = 60 * 10
+
+
+def compute_user_counts():
+    totals = User.objects.aggregate(
+        students=Count("studentprofile_profile"),
+        teachers=Count("teacherprofile_profile"),
+        parents=Count("parentprofile_profile"),
+        male_students=Count(
+            "studentprofile_profile",
+            filter=Q(studentprofile_profile__gender=Gender.MALE)
+        ),
+        female_students=Count(
+            "studentprofile_profile",
+            filter=Q(studentprofile_profile__gender=Gender.FEMALE)
+        ),
+    )
+
+    by_class = (
+        StudentProfile.objects
+        .values("class_level")
+        .annotate(
+            students=Count("id"),
+            male_students=Count("id", filter=Q(gender=Gender.MALE)),
+            female_students=Count("id", filter=Q(gender=Gender.FEMALE)),
+        )
+        .order_by("class_level")
+    )
+    by_role = (
+        User.objects
+        .values("role")
+        .annotate(
+            users=Count("id"),
+            verified=Count("id", filter=Q(is_verified=True)),
+        )
+        .order_by("role")
+    )
+
+    return {
+        **totals,
+        "by_class": list(by_class),
+        "by_role": list(by_role),
+    }
+
+
+def get_user_counts():
+    counts = cache_get(USER_COUNTS_CACHE_KEY)
+    if counts is None:
+        counts = compute_user_counts()
+        cache.set(USER_COUNTS_CACHE_KEY, counts, shared_cache_timeout(USER_COUNTS_TIMEOUT))
+    return counts
+
+
+def invalidate_user_counts():
+    cache.delete(USER_COUNTS_CACHE_KEY)
@@ -1,10 +1,36 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.test import APIClient
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import RefreshToken
 from django.utils import timezone
 from datetime import timedelta
-from .models import User
+from django.core.cache import cache
+from datetime import date
+import os
+import uuid
+import tempfile
+from unittest import mock
+from io import StringIO
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from core.caching import LOCAL_CACHE_MAX_TIMEOUT
+from .models import (
+    User, StudentProfile, TeacherProfile, AdmissionSequence, Classes, Subject, Lesson,
+    StudentImportJob, StudentImportJobStatus,
+)
+from .authentication import CachedJWTAuthentication, auth_user_cache_key
+from .imports import StudentImporter, process_import_jobs
+from .serializers import StudentProfileSerializer
+
+# The JWT user is only cached in a cache every process shares.
+SHARED_CACHE = {'default': {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': os.path.join(tempfile.gettempdir(), 'school-management-test-cache'),
+}}
 
 
 class EmailVerificationTest(TestCase):
@@ -77,4 +103,579 @@ class EmailVerificationTest(TestCase):
         response = self.client.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertEqual(response.data['error'], 'Token is required')
\ No newline at end of file
+        self.assertEqual(response.data['error'], 'Token is required')
+
+
+class UserCountsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            email='admin@example.com',
+            password='adminpass123',
+            role='admin',
+            is_active=True,
+            is_verified=True
+        )
+        self.client.force_authenticate(user=self.admin)
+
+        for i, gender in enumerate(['M', 'F', 'F']):
+            user = User.objects.create_user(
+                email=f'student{i}@example.com',
+                password='studentpass123',
+                role='student',
+                is_verified=True
+            )
+            StudentProfile.objects.create(user=user, gender=gender, class_level='JSS 1')
+
+    def test_counts_and_breakdowns(self):
+        response = self.client.get(reverse('user-counts'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['students'], 3)
+        self.assertEqual(response.data['teachers'], 0)
+        self.assertEqual(response.data['male_students'], 1)
+        self.assertEqual(response.data['female_students'], 2)
+        self.assertEqual(response.data['by_class'], [
+            {'class_level': 'JSS 1', 'students': 3, 'male_students': 1, 'female_students': 2}
+        ])
+        self.assertIn({'role': 'student', 'users': 3, 'verified': 3}, response.data['by_role'])
+
+    def test_counts_are_cached_until_a_profile_changes(self):
+        with self.assertNumQueries(3):
+            self.client.get(reverse('user-counts'))
+        with self.assertNumQueries(0):
+            self.client.get(reverse('user-counts'))
+
+        user = User.objects.create_user(email='teacher@example.com', password='teacherpass123', role='teacher')
+        TeacherProfile.objects.create(user=user)
+
+        response = self.client.get(reverse('user-counts'))
+        self.assertEqual(response.data['teachers'], 1)
+
+    def test_process_local_cache_keeps_counts_briefly(self):
+        with mock.patch.object(cache, 'set') as cache_set:
+            self.client.get(reverse('user-counts'))
+
+        self.assertEqual(cache_set.call_args.args[2], LOCAL_CACHE_MAX_TIMEOUT)
+
+
+class AdmissionSequenceTest(TestCase):
+    def create_user(self, index):
+        return User.objects.create_user(
+            email=f'student{index}@example.com',
+            password='studentpass123',
+            role='student',
+            is_active=True,
+            is_verified=True
+        )
+
+    def test_students_get_consecutive_numbers(self):
+        prefix = AdmissionSequence.prefix(date.today().year)
+
+        first = StudentProfile.objects.create(user=self.create_user(1))
+        second = StudentProfile.objects.create(user=self.create_user(2))
+
+        self.assertEqual(first.admission_number, f'{prefix}0001')
+        self.assertEqual(second.admission_number, f'{prefix}0002')
+
+    def test_block_reservation_is_one_allocation(self):
+        numbers = AdmissionSequence.objects.reserve(3, year=2031)
+        self.assertEqual(numbers, ['ADM310001', 'ADM310002', 'ADM310003'])
+
+        # Once the year's sequence exists a block is one UPDATE and one read,
+        # inside a savepoint here because the test runs in a transaction.
+        with self.assertNumQueries(4):
+            numbers = AdmissionSequence.objects.reserve(2, year=2031)
+        self.assertEqual(numbers, ['ADM310004', 'ADM310005'])
+
+    def test_assign_fills_only_missing_numbers(self):
+        profiles = [
+            StudentProfile(user=self.create_user(1)),
+            StudentProfile(user=self.create_user(2), admission_number='ADM309999'),
+            StudentProfile(user=self.create_user(3)),
+        ]
+
+        AdmissionSequence.objects.assign(profiles, year=2030)
+
+        self.assertEqual(
+            [profile.admission_number for profile in profiles],
+            ['ADM300001', 'ADM309999', 'ADM300002']
+        )
+
+    def test_sequence_starts_above_existing_numbers(self):
+        prefix = AdmissionSequence.prefix(date.today().year)
+        StudentProfile.objects.create(user=self.create_user(1), admission_number=f'{prefix}0417')
+
+        profile = StudentProfile.objects.create(user=self.create_user(2))
+
+        self.assertEqual(profile.admission_number, f'{prefix}0418')
+
+    def test_serializer_create_assigns_number(self):
+        serializer = StudentProfileSerializer(data={
+            'user': {
+                'email': 'new@example.com',
+                'password': 'studentpass123',
+                'first_name': 'New',
+                'last_name': 'Student',
+                'role': 'student'
+            },
+            'class_level': 'JSS 1'
+        })
+        serializer.is_valid(raise_exception=True)
+
+        profile = serializer.save()
+
+        self.assertEqual(profile.admission_number, AdmissionSequence.prefix(date.today().year) + '0001')
+
+
+class ProfileAliasTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='teacher@example.com', password='teacherpass123', role='teacher', is_active=True, is_verified=True
+        )
+        self.profile = TeacherProfile.objects.create(user=self.user)
+
+    def test_alias_returns_the_profile(self):
+        user = User.objects.get(pk=self.user.pk)
+
+        self.assertEqual(user.teacher_profile, self.profile)
+
+    def test_missing_profile_fails_hasattr(self):
+        user = User.objects.get(pk=self.user.pk)
+
+        self.assertFalse(hasattr(user, 'student_profile'))
+        self.assertFalse(hasattr(user, 'parent_profile'))
+        self.assertFalse(hasattr(user, 'admin_profile'))
+        self.assertTrue(hasattr(user, 'teacher_profile'))
+
+    def test_alias_uses_select_related(self):
+        user = User.objects.select_related('teacherprofile_profile', 'studentprofile_profile').get(pk=self.user.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(user.teacher_profile, self.profile)
+            self.assertFalse(hasattr(user, 'student_profile'))
+
+
+class TeacherDeletionTest(TestCase):
+    def create_teacher(self, email, results):
+        from assessment.models import Exam, Result
+        from events.models import Event, EventParticipant
+
+        user = User.objects.create_user(
+            email=email, password='teacherpass123', role='teacher', is_active=True, is_verified=True
+        )
+        teacher = TeacherProfile.objects.create(user=user)
+        class_ref = Classes.objects.create(name=f'Class of {email}', teacher=teacher)
+        subject = Subject.objects.create(name='Maths', assigned_class=class_ref, teacher=teacher)
+        Lesson.objects.create(title='Intro', content='', subject=subject, date='2025-01-06')
+        exam = Exam.objects.create(title='Test', subject=subject, teacher=teacher, exam_date='2025-01-06')
+        Result.objects.bulk_create(Result(exam=exam, score=50) for _ in range(results))
+        event = Event.objects.create(title='Trip', description='', date=timezone.now(), location='Zoo')
+        EventParticipant.objects.create(event=event, teacher=teacher)
+        return teacher, class_ref, subject, exam
+
+    def test_delete_detaches_teaching_records(self):
+        from assessment.models import Result
+        from events.models import EventParticipant
+
+        teacher, class_ref, subject, exam = self.create_teacher('teacher@example.com', results=3)
+
+        teacher.delete()
+
+        class_ref.refresh_from_db()
+        subject.refresh_from_db()
+        exam.refresh_from_db()
+        self.assertIsNone(class_ref.teacher)
+        self.assertIsNone(subject.teacher)
+        self.assertIsNone(exam.teacher)
+        self.assertEqual(Result.objects.filter(exam=exam).count(), 3)
+        self.assertEqual(Lesson.objects.filter(subject=subject).count(), 1)
+        self.assertFalse(EventParticipant.objects.exists())
+        self.assertFalse(User.objects.filter(email='teacher@example.com').exists())
+
+    def test_delete_query_count_does_not_grow_with_history(self):
+        small, *_ = self.create_teacher('small@example.com', results=1)
+        large, *_ = self.create_teacher('large@example.com', results=50)
+
+        with CaptureQueriesContext(connection) as small_queries:
+            small.delete()
+        with CaptureQueriesContext(connection) as large_queries:
+            large.delete()
+
+        self.assertEqual(len(small_queries.captured_queries), len(large_queries.captured_queries))
+
+
+class StudentImportTest(TestCase):
+    HEADER = 'email,first_name,last_name,password,class_level,gender,birth_date\n'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            email='admin@example.com', password='adminpass123', role='admin', is_active=True, is_verified=True
+        )
+        self.client.force_authenticate(user=self.admin)
+        self.url = reverse('student-import-file')
+
+    def upload(self, body, name='students.csv'):
+        upload = SimpleUploadedFile(name, (self.HEADER + body).encode(), content_type='text/csv')
+        return self.client.post(self.url, {'file': upload}, format='multipart')
+
+    def run_import(self, body):
+        """Upload the rows, run the worker and return the job's state."""
+        response = self.upload(body)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        process_import_jobs()
+        return self.client.get(reverse('student-import-status', args=[response.data['job']])).data
+
+    def test_import_creates_students_and_reports_bad_rows(self):
+        job = self.run_import(
+            'ada@example.com,Ada,Lovelace,secretpass1,JSS 1,F,2012-05-01\n'
+            'not-an-email,Bad,Row,,JSS 1,,\n'
+            'alan@example.com,Alan,Turing,,JSS 2,M,\n'
+            'ADA@example.com,Ada,Again,,JSS 1,,\n'
+            'admin@example.com,Taken,Email,,JSS 1,,\n'
+        )
+
+        self.assertEqual(job['status'], StudentImportJobStatus.DONE)
+        self.assertEqual(job['result']['rows'], 5)
+        self.assertEqual(job['result']['created'], 2)
+        self.assertEqual([error['row'] for error in job['result']['errors']], [3, 5, 6])
+
+        ada = StudentProfile.objects.select_related('user').get(user__email='ada@example.com')
+        self.assertTrue(ada.user.check_password('secretpass1'))
+        self.assertEqual((ada.class_level, ada.gender, str(ada.birth_date)), ('JSS 1', 'F', '2012-05-01'))
+        alan = StudentProfile.objects.select_related('user').get(user__email='alan@example.com')
+        self.assertFalse(alan.user.has_usable_password())
+
+        prefix = AdmissionSequence.prefix(date.today().year)
+        self.assertEqual(
+            sorted(StudentProfile.objects.values_list('admission_number', flat=True)),
+            [f'{prefix}0001', f'{prefix}0002']
+        )
+
+    def test_upload_only_queues_the_file(self):
+        with mock.patch('accounts.imports.make_password') as make_password:
+            response = self.upload('ada@example.com,Ada,Lovelace,secretpass1,JSS 1,,\n')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], StudentImportJobStatus.PENDING)
+        make_password.assert_not_called()
+        self.assertFalse(StudentProfile.objects.exists())
+
+        status_url = reverse('student-import-status', args=[response.data['job']])
+        self.assertEqual(self.client.get(status_url).data['result'], None)
+        call_command('run_import_worker', '--once', '--workers', '1', stdout=StringIO())
+        self.assertEqual(self.client.get(status_url).data['result']['created'], 1)
+        self.assertEqual(bytes(StudentImportJob.objects.get().content), b'')
+
+    def test_import_query_count_does_not_grow_with_rows(self):
+        def rows(start, count):
+            return ''.join(f'student{i}@example.com,Student,{i},,JSS 1,,\n' for i in range(start, start + count))
+
+        # The first import of the year also creates the admission sequence.
+        self.run_import(rows(0, 1))
+        self.upload(rows(10, 2))
+        with CaptureQueriesContext(connection) as small:
+            process_import_jobs()
+        self.upload(rows(100, 40))
+        with CaptureQueriesContext(connection) as large:
+            process_import_jobs()
+
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+        self.assertEqual(StudentProfile.objects.count(), 43)
+
+    def test_email_registered_during_the_import_is_reported(self):
+        validate_chunk = StudentImporter.validate_chunk
+
+        def register_alan_meanwhile(importer, chunk):
+            accepted = validate_chunk(importer, chunk)
+            User.objects.create_user(email='alan@example.com', password='alanpass123')
+            return accepted
+
+        with mock.patch.object(StudentImporter, 'validate_chunk', register_alan_meanwhile):
+            job = self.run_import(
+                'ada@example.com,Ada,Lovelace,,JSS 1,,\n'
+                'alan@example.com,Alan,Turing,,JSS 2,,\n'
+            )
+
+        self.assertEqual(job['result']['created'], 1)
+        self.assertEqual(job['result']['errors'], [
+            {'row': 3, 'errors': {'email': ["A user with this email already exists."]}}
+        ])
+        self.assertTrue(StudentProfile.objects.filter(user__email='ada@example.com').exists())
+        self.assertFalse(StudentProfile.objects.filter(user__email='alan@example.com').exists())
+
+    def test_import_rejects_unsupported_files_and_non_admins(self):
+        response = self.upload('', name='students.txt')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        student = User.objects.create_user(
+            email='student@example.com', password='studentpass123', role='student', is_active=True, is_verified=True
+        )
+        job = StudentImportJob.objects.create(filename='students.csv', content=b'')
+        self.client.force_authenticate(user=student)
+        response = self.upload('ada@example.com,Ada,Lovelace,,JSS 1,,\n')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(reverse('student-import-status', args=[job.pk]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_import_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as file:
+            file.write(self.HEADER + 'ada@example.com,Ada,Lovelace,,JSS 1,,\n')
+        self.addCleanup(os.remove, file.name)
+
+        out = StringIO()
+        call_command('import_students', file.name, '--workers', '1', stdout=out)
+
+        self.assertIn('Imported 1 of 1', out.getvalue())
+        self.assertTrue(StudentProfile.objects.filter(user__email='ada@example.com').exists())
+
+
+class UnverifiedUserCleanupTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        joined = timezone.now() - timedelta(hours=30)
+        for i in range(5):
+            user = User.objects.create_user(
+                email=f'stale{i}@example.com', password='stalepass123', role='student'
+            )
+            User.objects.filter(pk=user.pk).update(date_joined=joined)
+            StudentProfile.objects.create(user=user)
+        User.objects.create_user(email='fresh@example.com', password='freshpass123', role='student')
+        verified = User.objects.create_user(
+            email='verified@example.com', password='verifiedpass123', role='student', is_verified=True
+        )
+        User.objects.filter(pk=verified.pk).update(date_joined=joined)
+
+    def test_signup_leaves_stale_accounts_alone(self):
+        response = self.client.post(reverse('user-list'), {
+            'email': 'new@example.com', 'password': 'newpass1234', 'first_name': 'New',
+            'last_name': 'User', 'role': 'student',
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(User.objects.filter(email__startswith='stale').count(), 5)
+
+    def test_command_deletes_in_batches(self):
+        out = StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command('cleanup_unverified_users', '--batch-size', '2', stdout=out)
+
+        self.assertIn('Deleted 5 unverified users', out.getvalue())
+        self.assertEqual(
+            sorted(User.objects.values_list('email', flat=True)),
+            ['fresh@example.com', 'verified@example.com']
+        )
+        self.assertFalse(StudentProfile.objects.exists())
+        batch_reads = [q for q in queries.captured_queries if 'LIMIT 2' in q['sql']]
+        self.assertEqual(len(batch_reads), 4)  # three batches of at most two, then an empty read
+
+
+@override_settings(CACHES=SHARED_CACHE)
+class CachedJWTAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='ada@example.com', password='adapass123', role='student', is_active=True, is_verified=True
+        )
+        self.profile = StudentProfile.objects.create(user=self.user, class_level='JSS 1')
+        token = RefreshToken.for_user(self.user).access_token
+        self.request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def authenticate(self):
+        user, _ = CachedJWTAuthentication().authenticate(self.request)
+        return user
+
+    def test_cache_hit_needs_no_queries(self):
+        with self.assertNumQueries(1):
+            self.authenticate()
+
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+            self.assertEqual(user.student_profile.class_level, 'JSS 1')
+            self.assertFalse(hasattr(user, 'teacher_profile'))
+
+    def test_secrets_are_not_cached(self):
+        self.user.generate_password_reset_token()
+        self.authenticate()
+
+        cached = cache.get(auth_user_cache_key(self.user.pk))
+        for name in ('password', 'verification_token', 'password_reset_token'):
+            self.assertNotIn(name, cached.__dict__)
+        with self.assertNumQueries(1):
+            self.assertTrue(self.authenticate().check_password('adapass123'))
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_process_local_cache_is_not_used(self):
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                self.authenticate()
+        self.assertIsNone(cache.get(auth_user_cache_key(self.user.pk)))
+
+    def test_saving_user_or_profile_invalidates(self):
+        self.authenticate()
+
+        self.profile.class_level = 'JSS 2'
+        self.profile.save()
+        self.assertEqual(self.authenticate().student_profile.class_level, 'JSS 2')
+
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_queryset_update_invalidates(self):
+        self.authenticate()
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_records_version_is_not_cached(self):
+        from assessment.reportcards import bump_records_version
+
+        self.authenticate()
+        bump_records_version([self.profile.pk])
+
+        profile = self.authenticate().student_profile
+        self.assertEqual(profile.records_version, 1)
+        # Saving the cached profile must not write an old version back.
+        bump_records_version([self.profile.pk])
+        self.authenticate().student_profile.save()
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.records_version, 2)
+
+
+@override_settings(CACHES=SHARED_CACHE)
+class LoginTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='ada@example.com', password='adapass123', role='student', is_active=True, is_verified=True
+        )
+        self.profile = StudentProfile.objects.create(user=self.user, class_level='JSS 1')
+
+    def log_in(self, password='adapass123'):
+        return self.client.post(reverse('login'), {'email': self.user.email, 'password': password}, format='json')
+
+    def test_login_is_one_query_and_primes_the_auth_cache(self):
+        with self.assertNumQueries(1):
+            response = self.log_in()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['user']['onboarding_complete'])
+
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        with self.assertNumQueries(0):
+            CachedJWTAuthentication().authenticate(request)
+        self.assertNotIn('password', cache.get(auth_user_cache_key(self.user.pk)).__dict__)
+
+    def test_onboarding_flag_follows_profile_saves(self):
+        for field, value in [
+            ('phone', '08012345678'), ('address', '1 School Road'), ('gender', 'F'),
+            ('birth_date', date(2010, 5, 1)), ('parent_name', 'Anne'), ('parent_contact', '08087654321'),
+            ('photo', 'profile_photos/ada.png'),
+        ]:
+            setattr(self.profile, field, value)
+        self.profile.save()
+        self.assertTrue(self.log_in().data['user']['onboarding_complete'])
+
+        self.profile.address = ''
+        self.profile.save(update_fields=['address'])
+        self.profile.refresh_from_db()
+        self.assertFalse(self.profile.is_onboarded)
+
+    def test_onboarding_flag_is_read_only(self):
+        serializer = StudentProfileSerializer(self.profile, data={'is_onboarded': True}, partial=True)
+
+        self.assertTrue(serializer.is_valid())
+        self.assertNotIn('is_onboarded', serializer.validated_data)
+
+    def test_wrong_password_and_inactive_users_are_rejected(self):
+        self.assertEqual(self.log_in('wrongpass123').status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.log_in().status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(CACHES=SHARED_CACHE)
+class ProfileEndpointsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='ada@example.com', password='adapass123', first_name='Ada', role='teacher',
+            is_active=True, is_verified=True
+        )
+        self.profile = TeacherProfile.objects.create(user=self.user, subject_specialization='Maths')
+        self.client.force_authenticate(user=User.objects.get(pk=self.user.pk))
+
+    def test_user_details_is_one_query_and_revalidates(self):
+        url = reverse('user-details', args=[self.user.pk])
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.data['first_name'], 'Ada')
+        self.assertIn('profile_image', response.data)
+
+        with self.assertNumQueries(1):
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.profile.subject_specialization = 'Physics'
+        self.profile.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(reverse('user-details', args=[uuid.uuid4()])).status_code, 404)
+
+    def test_current_profile_from_cached_jwt_user_needs_no_queries(self):
+        url = reverse('current-user-profile')
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.data['subject_specialization'], 'Maths')
+
+        self.client.force_authenticate(user=None)
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached['ETag'], response['ETag'])
+
+        self.user.first_name = 'Augusta'
+        self.user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user']['first_name'], 'Augusta')
+
+    def test_profile_list_revalidates_on_user_changes(self):
+        url = reverse('teacher-list')
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.user.first_name = 'Augusta'
+        self.user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['user']['first_name'], 'Augusta')
+
+
+class SignupLoggingTest(TestCase):
+    def test_signup_logs_neither_password_nor_token(self):
+        with self.assertLogs('accounts.views', 'DEBUG') as logs:
+            response = APIClient().post(reverse('user-list'), {
+                'email': 'new@example.com', 'password': 'newpass1234', 'first_name': 'New',
+                'last_name': 'User', 'role': 'student',
+            }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        output = '\n'.join(logs.output)
+        self.assertIn('new@example.com', output)
+        self.assertNotIn('newpass1234', output)
+        self.assertNotIn(response.data['token'], output)
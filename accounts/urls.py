@@ -37,6 +37,7 @@ router.register(r'subjects', SubjectViewSet, basename='subject')
 urlpatterns = [
     
     path('user-counts/', views.user_counts, name='user-counts'),
+    path('user/me/', views.get_current_user_profile, name='current-user-profile'),
     path('user/<uuid:user_id>/', views.get_user_details, name='user-details'),
     path('students/onboarding/', StudentOnboardingView.as_view(), name='student-onboarding'),
     path('students/onboarding/progress/', StudentOnboardingProgressView.as_view(), name='student-onboarding-progress'),
@@ -1,10 +1,11 @@
 from rest_framework import viewsets, status, permissions
-from rest_framework.pagination import PageNumberPagination
+from core.pagination import CursorOptInPagination
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.db import connection
-from .models import User, TeacherProfile, StudentProfile, ParentProfile, AdminProfile, Classes, Subject, Lesson, SocialMediaLink
+from .models import User, TeacherProfile, StudentProfile, ParentProfile, AdminProfile, Classes, Subject, Lesson, SocialMediaLink, StudentImportJob
 from .serializers import (
     UserSerializer, 
     TeacherProfileSerializer, 
@@ -26,10 +27,14 @@ from .serializers import (
 )
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import authenticate_login
 from .permissions import IsAdminOrReadOnly, IsStudentOnboarding
-from django.core.mail import send_mail
+from .profiles import ROLE_PROFILES, load_user_with_profile, role_profile, profile_version
+from core.conditional import ConditionalGetMixin, make_etag, not_modified, add_validators
+from .stats import get_user_counts
+from .imports import queue_import, StudentImportError
+from core.mail import queue_mail
 from django.conf import settings
 from datetime import timedelta
 from rest_framework import viewsets
@@ -51,32 +56,26 @@ from rest_framework.decorators import action
 
 logger = logging.getLogger(__name__)
 
-class TeacherPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+# Profiles are serialized with their user nested inside.
+PROFILE_CONDITIONAL_FIELDS = ('updated_at', 'user__last_updated')
 
-class StudentPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+class TeacherPagination(CursorOptInPagination):
+    cursor_ordering = '-created_at'
 
-class ParentPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+class StudentPagination(CursorOptInPagination):
+    cursor_ordering = '-created_at'
 
-class ClassPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+class ParentPagination(CursorOptInPagination):
+    cursor_ordering = '-created_at'
 
-class SubjectPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+class ClassPagination(CursorOptInPagination):
+    cursor_ordering = '-id'
 
-class TeacherProfileViewSet(viewsets.ModelViewSet):
+class SubjectPagination(CursorOptInPagination):
+    cursor_ordering = '-id'
+
+class TeacherProfileViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    conditional_fields = PROFILE_CONDITIONAL_FIELDS
     queryset = TeacherProfile.objects.all()
     serializer_class = TeacherProfileSerializer
     pagination_class = TeacherPagination
@@ -104,18 +103,8 @@ class TeacherProfileViewSet(viewsets.ModelViewSet):
         
         return queryset.select_related('user')
 
-    def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-        page = self.paginate_queryset(queryset)
-        
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-            
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
-
-class StudentProfileViewSet(viewsets.ModelViewSet):
+class StudentProfileViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    conditional_fields = PROFILE_CONDITIONAL_FIELDS
     queryset = StudentProfile.objects.all()
     serializer_class = StudentProfileSerializer
     permission_classes = [IsAuthenticated, IsAdminOrReadOnly | IsStudentOnboarding]
@@ -139,18 +128,57 @@ class StudentProfileViewSet(viewsets.ModelViewSet):
             return queryset.select_related('user')
         return queryset.filter(user=user).select_related('user')
 
-    def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-        page = self.paginate_queryset(queryset)
-        
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-            
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='import',
+        parser_classes=[MultiPartParser, FormParser],
+        permission_classes=[IsAuthenticated, IsAdminOrReadOnly]
+    )
+    def import_file(self, request):
+        """
+        Queue an uploaded CSV or XLSX file (multipart field "file") for the
+        import worker (run_import_worker) and answer 202 with the job, whose
+        progress is at import/<job id>/. Columns: email, first_name,
+        last_name and optionally password, class_level, academic_year,
+        gender, birth_date, phone, address, parent_name, parent_contact.
+        Rows that fail validation are reported by row number in the job's
+        result; the rest are imported.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "Upload a CSV or XLSX file in the 'file' field."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            job = queue_import(upload, created_by=request.user)
+        except StudentImportError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(import_job_data(job), status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['get'], url_path=r'import/(?P<job_id>[0-9]+)')
+    def import_status(self, request, job_id):
+        """The state of a queued import and, once it has run, its result."""
+        if request.user.role != "admin":
+            return Response({"error": "Only admins can import students."}, status=status.HTTP_403_FORBIDDEN)
+
+        job = get_object_or_404(StudentImportJob.objects.defer('content'), pk=job_id)
+        return Response(import_job_data(job))
+
+
+def import_job_data(job):
+    return {
+        'job': job.id,
+        'filename': job.filename,
+        'status': job.status,
+        'result': job.result,
+        'error': job.error,
+    }
+
 
-class ParentProfileViewSet(viewsets.ModelViewSet):
+class ParentProfileViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    conditional_fields = PROFILE_CONDITIONAL_FIELDS
     queryset = ParentProfile.objects.all()
     serializer_class = ParentProfileSerializer
     permission_classes = [IsAdminOrReadOnly, IsAuthenticated]
@@ -171,17 +199,6 @@ class ParentProfileViewSet(viewsets.ModelViewSet):
         
         return queryset.select_related('user')
 
-    def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-        page = self.paginate_queryset(queryset)
-        
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-            
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
-
 class ClassesViewSet(viewsets.ModelViewSet):
     queryset = Classes.objects.all().select_related('teacher__user')
     permission_classes = [permissions.IsAuthenticated, IsAdminOrReadOnly]
@@ -248,7 +265,7 @@ class SubjectViewSet(viewsets.ModelViewSet):
         
        
         if hasattr(self.request.user, 'student_profile') and self.request.user.student_profile.class_level:
-            return queryset.filter(assigned_class=self.request.user.student_profile.class_level)
+            return queryset.filter(assigned_class__name=self.request.user.student_profile.class_level)
         
         return queryset
 
@@ -300,15 +317,6 @@ class UserViewSet(viewsets.ModelViewSet):
 
     def create(self, request, *args, **kwargs):
         logger.info("UserViewSet.create called")
-        logger.debug("Request data: %s", request.data)
-
-        
-        try:
-            logger.debug("Cleaning up unverified users older than 24 hours")
-            User.objects.cleanup_unverified_users(hours_old=24)
-            logger.debug("cleanup_unverified_users completed")
-        except Exception:
-            logger.exception("Failed while cleaning up unverified users")
 
         serializer = self.get_serializer(data=request.data)
         try:
@@ -333,9 +341,9 @@ class UserViewSet(viewsets.ModelViewSet):
             if existing and not existing.is_verified:
                 logger.info("Existing unverified user detected, regenerating token for email=%s", existing.email)
                 try:
-                    token = existing.generate_verification_token()
-                    existing.verification_token = token
-                    existing.save(update_fields=["verification_token"])
+                    with transaction.atomic():
+                        token = existing.generate_verification_token()
+                        self.send_verification_email(existing)
                     verification_link = f"{settings.FRONTEND_URL}/verify-email?token={token}&email={existing.email}"
                     logger.info("Regenerated token for existing unverified user: %s", existing.email)
                    
@@ -357,13 +365,11 @@ class UserViewSet(viewsets.ModelViewSet):
 
         
         try:
-            token = user.generate_verification_token()
-            user.verification_token = token
-            user.save(update_fields=["verification_token"])
+            with transaction.atomic():
+                token = user.generate_verification_token()
+                self.send_verification_email(user)
             verification_link = f"{settings.FRONTEND_URL}/verify-email?token={token}&email={user.email}"
-            logger.info("Verification token generated for %s: %s", user.email, token)
-            
-            logger.debug("Verification token for %s: %s", user.email, token)
+            logger.info("Verification token generated for %s", user.email)
 
             return Response(
                 {
@@ -385,13 +391,12 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response({"error": "Failed to generate verification token. Please try again."}, status=500)
 
     def send_verification_email(self, user):
-        logger.debug("send_verification_email called but disabled: %s", getattr(user, "email", None))
-       
+        logger.debug("Queueing verification email for %s", user.email)
+        UserSerializer().send_verification_email(user)
 
     @action(detail=False, methods=["post"], permission_classes=[AllowAny], url_path="resend_verification")
     def resend_verification(self, request):
         logger.info("resend_verification called")
-        logger.debug("Request data: %s", request.data)
         email = request.data.get("email")
         if not email:
             logger.warning("resend_verification called without email")
@@ -409,9 +414,9 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response({"error": "User already verified."}, status=400)
 
         try:
-            token = user.generate_verification_token()
-            user.verification_token = token
-            user.save(update_fields=["verification_token"])
+            with transaction.atomic():
+                token = user.generate_verification_token()
+                self.send_verification_email(user)
             verification_link = f"{settings.FRONTEND_URL}/verify-email?token={token}&email={user.email}"
             logger.info("Resent verification token generated for %s", email)
             
@@ -431,7 +436,6 @@ class UserViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'], url_path='verify_email', permission_classes=[AllowAny])
     def verify_email(self, request):
         logger.info("verify_email called")
-        logger.debug("Request data: %s", request.data)
         email = request.data.get("email")
         token = request.data.get("token")
 
@@ -443,12 +447,7 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response({"error": "User not found"}, status=404)
 
         if user.verification_token != token:
-            logger.warning(
-                "verify_email: invalid token for %s (provided=%s expected=%s)",
-                email,
-                token,
-                user.verification_token,
-            )
+            logger.warning("verify_email: invalid token for %s", email)
             return Response({"error": "Invalid token"}, status=400)
 
         if user.is_verification_token_expired:
@@ -544,21 +543,7 @@ class UserViewSet(viewsets.ModelViewSet):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def user_counts(request):
-    students_count = StudentProfile.objects.count()
-    teachers_count = TeacherProfile.objects.count()
-    parents_count = ParentProfile.objects.count()
-
-    male_students = StudentProfile.objects.filter(gender="M").count()
-    female_students = StudentProfile.objects.filter(gender="F").count()
-
-    data = {
-        "students": students_count,
-        "teachers": teachers_count,
-        "parents": parents_count,
-        "male_students": male_students,
-        "female_students": female_students,
-    }
-    return Response(data)
+    return Response(get_user_counts())
 
 class LoginAPIView(APIView):
     permission_classes = [AllowAny]
@@ -570,7 +555,7 @@ class LoginAPIView(APIView):
         if not email or not password:
             return Response({"error": "Email and password required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        user = authenticate(request, email=email, password=password)
+        user = authenticate_login(email, password)
 
         if not user:
             return Response({"error": "Invalid credentials"}, status=status.HTTP_401_UNAUTHORIZED)
@@ -579,21 +564,9 @@ class LoginAPIView(APIView):
         refresh = RefreshToken.for_user(user)
         access_token = str(refresh.access_token)
 
-       
         onboarding_complete = True
         if user.role == 'student':
-            try:
-                profile = StudentProfile.objects.get(user=user)
-                required_fields = [
-                    'phone', 'address', 'gender',
-                    'birth_date', 'parent_name', 'parent_name', 'class_level',
-                    'photo'
-                ]
-                onboarding_complete = all(
-                    getattr(profile, field) for field in required_fields
-                )
-            except StudentProfile.DoesNotExist:
-                onboarding_complete = False
+            onboarding_complete = hasattr(user, 'student_profile') and user.student_profile.is_onboarded
 
         return Response({
             "refresh": str(refresh),
@@ -618,18 +591,18 @@ class PasswordResetView(APIView):
 
         try:
             user = User.objects.get(email=email)
-            token = user.generate_password_reset_token()
+            with transaction.atomic():
+                token = user.generate_password_reset_token()
+                queue_mail(
+                    "Your Password Reset Code",
+                    f"Enter this code to reset your password: {token}",
+                    settings.DEFAULT_FROM_EMAIL,
+                    [email],
+                )
             
             if settings.DEBUG:
                 print(f"Password reset token for {email}: {token}")
 
-            send_mail(
-                "Your Password Reset Code",
-                f"Enter this code to reset your password: {token}",
-                settings.DEFAULT_FROM_EMAIL,
-                [email],
-                fail_silently=False,
-            )
             return Response({"message": "Reset code sent to email"}, status=200)
             
         except User.DoesNotExist:
@@ -680,27 +653,25 @@ class PasswordResetResendView(APIView):
 
         try:
             user = User.objects.get(email=email)
-            user.generate_password_reset_token()
-            user.save()
 
-            
-            frontend_reset_url = f"{settings.FRONTEND_URL}/verify-forgot-password?email={user.email}&token={user.password_reset_token}"
+            with transaction.atomic():
+                user.generate_password_reset_token()
 
-            
-            email_message = (
-                f"Hello {user.first_name},\n\n"
-                f"Click the link below to reset your password:\n{frontend_reset_url}\n\n"
-                f"Or use this token manually in the form: {user.password_reset_token}\n\n"
-                "If you didn't request a password reset, you can ignore this email."
-            )
+                frontend_reset_url = f"{settings.FRONTEND_URL}/verify-forgot-password?email={user.email}&token={user.password_reset_token}"
 
-            send_mail(
-                subject="Reset Your Password",
-                message=email_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[user.email],
-                fail_silently=False,
-            )
+                email_message = (
+                    f"Hello {user.first_name},\n\n"
+                    f"Click the link below to reset your password:\n{frontend_reset_url}\n\n"
+                    f"Or use this token manually in the form: {user.password_reset_token}\n\n"
+                    "If you didn't request a password reset, you can ignore this email."
+                )
+
+                queue_mail(
+                    subject="Reset Your Password",
+                    message=email_message,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    recipient_list=[user.email],
+                )
 
             if settings.DEBUG:
                 print(f"Password reset link for {email}: {frontend_reset_url}")
@@ -767,47 +738,29 @@ class StudentOnboardingProgressView(APIView):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_user_details(request, user_id):
-    try:
-        user = User.objects.get(id=user_id)
-        
-        
-        profile_data = {}
-        if user.role == 'teacher':
-            profile = TeacherProfile.objects.get(user=user)
-            profile_data = {
-                'profile_image': profile.photo.url if profile.photo else None,
-            }
-        elif user.role == 'student':
-            profile = StudentProfile.objects.get(user=user)
-            profile_data = {
-                'profile_image': profile.photo.url if profile.photo else None,
-            }
-        elif user.role == 'parent':
-            profile = ParentProfile.objects.get(user=user)
-            profile_data = {
-                'profile_image': profile.photo.url if profile.photo else None,
-            }
-        elif user.role == 'admin':
-            profile = AdminProfile.objects.get(user=user)
-            profile_data = {
-                'profile_image': profile.photo.url if profile.photo else None,
-            }
-        
-        response_data = {
-            'id': user.id,
-            'email': user.email,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'role': user.role,
-            **profile_data
-        }
-        
-        return Response(response_data)
-        
-    except User.DoesNotExist:
+    user = load_user_with_profile(user_id)
+    if user is None:
         return Response({'error': 'User not found'}, status=404)
+
+    profile = role_profile(user)
+    etag = make_etag('user-details', *profile_version(user, profile))
+    cached = not_modified(request, etag=etag)
+    if cached is not None:
+        return cached
+
+    response_data = {
+        'id': user.id,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'role': user.role,
+    }
+    if profile is not None:
+        response_data['profile_image'] = profile.photo.url if profile.photo else None
+
+    return add_validators(Response(response_data), etag=etag)
 class LessonViewSet(viewsets.ModelViewSet):
-    queryset = Lesson.objects.all()
+    queryset = Lesson.objects.all().select_related('subject')
     permission_classes = [IsAuthenticated]
 
     def get_serializer_class(self):
@@ -822,8 +775,9 @@ class LessonViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(subject_id=subject_id)
         return queryset
     
-class AdminProfileViewSet(viewsets.ModelViewSet):
-    queryset = AdminProfile.objects.all()
+class AdminProfileViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    conditional_fields = PROFILE_CONDITIONAL_FIELDS
+    queryset = AdminProfile.objects.all().select_related('user')
     serializer_class = AdminProfileSerializer
     permission_classes = [IsAuthenticated, IsAdminOrReadOnly]
  
@@ -946,14 +900,13 @@ class IsAdminOrReadOnly(permissions.BasePermission):
             return True
         return request.user and request.user.is_staff
 
-class SocialMediaLinkViewSet(viewsets.ReadOnlyModelViewSet):
+class SocialMediaLinkViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = SocialMediaLink.objects.filter(is_active=True)
     serializer_class = SocialMediaLinkSerializer
     permission_classes = [AllowAny] 
     pagination_class = None  
 
-    def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
+    def list_response(self, request, queryset):
         serializer = self.get_serializer(queryset, many=True)
         
         social_links = {}
@@ -961,23 +914,33 @@ class SocialMediaLinkViewSet(viewsets.ReadOnlyModelViewSet):
             social_links[item['platform']] = item['url']
         
         return Response(social_links)
+PROFILE_SERIALIZERS = {
+    'admin': AdminProfileSerializer,
+    'parent': ParentProfileSerializer,
+    'teacher': TeacherProfileSerializer,
+    'student': StudentProfileSerializer,
+}
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_current_user_profile(request):
     user = request.user
-    if user.role == 'student':
-        profile = StudentProfile.objects.get(user=user)
-        serializer = StudentProfileSerializer(profile)
-    elif user.role == 'teacher':
-        profile = TeacherProfile.objects.get(user=user)
-        serializer = TeacherProfileSerializer(profile)
-    elif user.role == 'parent':
-        profile = ParentProfile.objects.get(user=user)
-        serializer = ParentProfileSerializer(profile)
-    elif user.role == 'admin':
-        profile = AdminProfile.objects.get(user=user)
-        serializer = AdminProfileSerializer(profile)
-    else:
+    if user.role not in PROFILE_SERIALIZERS:
         return Response({"error": "Unknown user role"}, status=400)
-    
-    return Response(serializer.data)
\ No newline at end of file
+
+    # The cached JWT user arrives with its profile loaded; anyone else is
+    # fetched together with theirs.
+    if not getattr(User, ROLE_PROFILES[user.role]).is_cached(user):
+        user = load_user_with_profile(user.pk)
+    profile = role_profile(user)
+    if profile is None:
+        return Response({"error": "Profile not found"}, status=404)
+
+    etag = make_etag('current-user-profile', *profile_version(user, profile))
+    cached = not_modified(request, etag=etag)
+    if cached is not None:
+        return cached
+
+    serializer = PROFILE_SERIALIZERS[user.role](profile)
+    return add_validators(Response(serializer.data), etag=etag)
\ No newline at end of file
@@ -1,4 +1,7 @@
 from django.contrib import admin
+from django.db import transaction
+from django.utils import timezone
+from .feeds import rebuild_feeds
 from .models import Announcement
 
 @admin.register(Announcement)
@@ -26,10 +29,16 @@ class AnnouncementAdmin(admin.ModelAdmin):
         return ", ".join(obj.target_roles) if obj.target_roles else "No audience"
     get_target_roles.short_description = "Target Roles"
 
+    def set_active(self, queryset, is_active):
+        # update() skips auto_now and the post_save signal that rebuilds the
+        # cached feeds, so both are done here.
+        queryset.update(is_active=is_active, updated_at=timezone.now())
+        transaction.on_commit(rebuild_feeds)
+
     def make_active(self, request, queryset):
-        queryset.update(is_active=True)
+        self.set_active(queryset, True)
     make_active.short_description = "Mark selected announcements as active"
 
     def make_inactive(self, request, queryset):
-        queryset.update(is_active=False)
-    make_inactive.short_description = "Mark selected announcements as inactive"
\ No newline at end of file
+        self.set_active(queryset, False)
+    make_inactive.short_description = "Mark selected announcements as inactive"
@@ -0,0 +1,80 @@
+import math
+from django.core.cache import cache
+from core.caching import shared_cache_timeout
+from core.timing import cache_get
+from django.db.models import Q, Min
+from django.utils import timezone
+from .models import Announcement
+from .serializers import AnnouncementSerializer
+
+# Audience -> Announcement flag. Users with any other role (admins) see every
+# active announcement, which is the "all" feed.
+ROLE_TARGETS = {
+    'student': 'target_students',
+    'teacher': 'target_teachers',
+    'parent': 'target_parents',
+}
+ALL_AUDIENCES = 'all'
+AUDIENCES = [*ROLE_TARGETS, ALL_AUDIENCES]
+
+FEED_CACHE_KEY = 'announcements:feed:{}'
+FEED_MAX_TIMEOUT = 60 * 60
+
+
+def feed_audience(user):
+    role = getattr(user, 'role', None)
+    return role if role in ROLE_TARGETS else ALL_AUDIENCES
+
+
+def audience_queryset(audience):
+    queryset = Announcement.objects.filter(is_active=True)
+    if audience in ROLE_TARGETS:
+        queryset = queryset.filter(**{ROLE_TARGETS[audience]: True})
+    return queryset
+
+
+def active_announcements(audience, now=None):
+    now = now or timezone.now()
+    return audience_queryset(audience).filter(
+        Q(start_date__lte=now) &
+        (Q(end_date__gte=now) | Q(end_date__isnull=True))
+    ).order_by('-start_date')
+
+
+def feed_timeout(audience, now):
+    """
+    Seconds until an announcement in this audience starts or ends, at most
+    an hour, or LOCAL_CACHE_MAX_TIMEOUT when other processes cannot see the
+    rebuilt feed (see core.caching).
+    """
+    longest = shared_cache_timeout(FEED_MAX_TIMEOUT)
+    boundaries = audience_queryset(audience).aggregate(
+        next_start=Min('start_date', filter=Q(start_date__gt=now)),
+        next_end=Min('end_date', filter=Q(end_date__gte=now)),
+    )
+    upcoming = [boundary for boundary in boundaries.values() if boundary is not None]
+    if not upcoming:
+        return longest
+
+    # An announcement leaves the feed just after its end_date, hence the +1.
+    seconds = math.ceil((min(upcoming) - now).total_seconds()) + 1
+    return max(1, min(seconds, longest))
+
+
+def build_feed(audience):
+    now = timezone.now()
+    feed = list(AnnouncementSerializer(active_announcements(audience, now), many=True).data)
+    cache.set(FEED_CACHE_KEY.format(audience), feed, feed_timeout(audience, now))
+    return feed
+
+
+def get_feed(audience):
+    feed = cache_get(FEED_CACHE_KEY.format(audience))
+    if feed is None:
+        feed = build_feed(audience)
+    return feed
+
+
+def rebuild_feeds():
+    for audience in AUDIENCES:
+        build_feed(audience)
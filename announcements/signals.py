@@ -0,0 +1,11 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .feeds import rebuild_feeds
+from .models import Announcement
+
+
+@receiver(post_save, sender=Announcement)
+@receiver(post_delete, sender=Announcement)
+def rebuild_feeds_on_change(sender, instance, **kwargs):
+    transaction.on_commit(rebuild_feeds)
@@ -1,3 +1,116 @@
-from django.test import TestCase
+from datetime import timedelta
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from accounts.models import User
+from core.caching import LOCAL_CACHE_MAX_TIMEOUT
+from .feeds import FEED_CACHE_KEY, FEED_MAX_TIMEOUT, feed_timeout
+from .models import Announcement
 
-# Create your tests here.
+# Stands in for Redis or memcached: any backend every process shares.
+SHARED_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+class AnnouncementFeedTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.student = User.objects.create_user(
+            email='student@example.com',
+            password='studentpass123',
+            role='student',
+            is_active=True,
+            is_verified=True
+        )
+        self.client.force_authenticate(user=self.student)
+        self.url = reverse('announcements-list')
+
+        now = timezone.now()
+        Announcement.objects.create(title='For students', message='Hi', target_students=True,
+                                    start_date=now - timedelta(days=1))
+        Announcement.objects.create(title='For teachers', message='Hi', target_teachers=True,
+                                    start_date=now - timedelta(days=1))
+        Announcement.objects.create(title='Expired', message='Hi', target_students=True,
+                                    start_date=now - timedelta(days=5), end_date=now - timedelta(days=1))
+
+    def titles(self, response):
+        return [announcement['title'] for announcement in response.data['results']]
+
+    def test_feed_is_served_from_cache(self):
+        response = self.client.get(self.url)
+        self.assertEqual(self.titles(response), ['For students'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.titles(response), ['For students'])
+
+    def test_feed_is_rebuilt_when_an_announcement_changes(self):
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Announcement.objects.create(title='New notice', message='Hi', target_students=True,
+                                        start_date=timezone.now() - timedelta(minutes=1))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(self.titles(response), ['New notice', 'For students'])
+
+    def test_feed_expires_when_the_next_announcement_starts(self):
+        now = timezone.now()
+        Announcement.objects.create(title='Tomorrow', message='Hi', target_students=True,
+                                    start_date=now + timedelta(seconds=90))
+
+        with override_settings(CACHES=SHARED_CACHE):
+            timeout = feed_timeout('student', now)
+            self.assertGreater(timeout, 60)
+            self.assertLessEqual(timeout, 92)
+            self.assertEqual(feed_timeout('parent', now), FEED_MAX_TIMEOUT)
+
+        # Other workers cannot see a rebuild in a process-local cache.
+        self.assertEqual(feed_timeout('student', now), LOCAL_CACHE_MAX_TIMEOUT)
+        self.assertEqual(feed_timeout('parent', now), LOCAL_CACHE_MAX_TIMEOUT)
+
+    def test_search_bypasses_feed(self):
+        response = self.client.get(self.url, {'search': 'students'})
+
+        self.assertEqual(self.titles(response), ['For students'])
+        self.assertIsNone(cache.get(FEED_CACHE_KEY.format('student')))
+
+    def test_unchanged_feed_is_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Announcement.objects.filter(title='For students').get().save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_admin_actions_rebuild_feed_and_bump_updated_at(self):
+        admin_user = User.objects.create_superuser(email='admin@example.com', password='adminpass123')
+        self.client.force_login(admin_user)
+        etag = self.client.get(self.url)['ETag']
+        announcement = Announcement.objects.get(title='For students')
+        updated_at = announcement.updated_at
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('admin:announcements_announcement_changelist'), {
+                'action': 'make_inactive', '_selected_action': [announcement.pk],
+            })
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+
+        announcement.refresh_from_db()
+        self.assertFalse(announcement.is_active)
+        self.assertGreater(announcement.updated_at, updated_at)
+        self.client.force_authenticate(user=self.student)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.titles(response), [])
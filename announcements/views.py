@@ -1,5 +1,7 @@
 from rest_framework import viewsets
-from rest_framework.pagination import PageNumberPagination
+from core.conditional import ConditionalGetMixin, make_etag
+from core.pagination import CursorOptInPagination
+from core.search import search as search_queryset
 from rest_framework.response import Response
 from .models import Announcement
 from .serializers import (
@@ -8,15 +10,15 @@ from .serializers import (
 )
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.db.models import Q
 from accounts.permissions import IsAdminOrReadOnly
+from .feeds import feed_audience, get_feed
 
-class AnnouncementPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+class AnnouncementPagination(CursorOptInPagination):
+    cursor_ordering = '-start_date'
 
-class AnnouncementViewSet(viewsets.ModelViewSet):
+class AnnouncementViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = AnnouncementSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = AnnouncementPagination
@@ -52,23 +54,39 @@ class AnnouncementViewSet(viewsets.ModelViewSet):
                 elif user_role == 'parent':
                     queryset = queryset.filter(target_parents=True)
 
-        
+        queryset = queryset.order_by('-start_date')
+
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(message__icontains=search)
-            ).distinct()
+            queryset = search_queryset(queryset, search)
 
-        return queryset.order_by('-start_date')
+        return queryset
 
-    def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-        page = self.paginate_queryset(queryset)
-        
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-            
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+    def can_serve_from_feed(self, request):
+        """The plain active-window listing is precomputed per audience; anything else goes to the database"""
+        if request.query_params.get('search'):
+            return False
+        if request.query_params.get('all') == 'true' and request.user.is_staff:
+            return False
+        return not (self.paginator and self.paginator.use_cursor(request))
+
+    def list_validators(self, request, queryset):
+        if not self.can_serve_from_feed(request):
+            return super().list_validators(request, queryset)
+
+        # The cached feed is exactly what would be sent, so validate against it
+        # and keep feed polls free of queries.
+        feed = get_feed(feed_audience(request.user))
+        latest = max((parse_datetime(announcement['updated_at']) for announcement in feed), default=None)
+        etag = make_etag('feed', request.get_full_path(), [announcement['id'] for announcement in feed], latest)
+        return etag, latest
+
+    def list_response(self, request, queryset):
+        if self.can_serve_from_feed(request):
+            feed = get_feed(feed_audience(request.user))
+            page = self.paginate_queryset(feed)
+            if page is not None:
+                return self.get_paginated_response(page)
+            return Response(feed)
+
+        return super().list_response(request, queryset)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Exam, Assignment, Grade, Result
+from .models import Exam, Assignment, Grade, Result, ReportCardJob
 
 @admin.register(Grade)
 class GradeAdmin(admin.ModelAdmin):
@@ -60,4 +60,10 @@ class ResultAdmin(admin.ModelAdmin):
 
     def assessment_title(self, obj):
         return obj.exam.title if obj.exam else obj.assignment.title
-    assessment_title.short_description = 'Assessment'
\ No newline at end of file
+    assessment_title.short_description = 'Assessment'
+@admin.register(ReportCardJob)
+class ReportCardJobAdmin(admin.ModelAdmin):
+    list_display = ('student', 'term_start', 'term_end', 'status', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status', 'term_start')
+    raw_id_fields = ('student',)
+    readonly_fields = ('error',)
@@ -0,0 +1,70 @@
+from django.db.models import F, Avg, Count, Value, Window
+from django.db.models.functions import Coalesce, Concat, RowNumber, FirstValue
+from accounts.models import StudentProfile, Subject
+from .models import Result
+
+
+def build_gradebook(class_ref):
+    """
+    Student x subject matrix of average score, number of results and latest
+    score for one class, in three queries: subjects, students, and one pass
+    over the results that computes every cell with window functions.
+
+    The layout is columnar: "subjects" heads the columns, "students" heads
+    the rows (as parallel arrays), and each metric is a list of rows aligned
+    with both. Cells without results are null.
+    """
+    subjects = list(
+        Subject.objects.filter(assigned_class=class_ref).order_by('name', 'id').values_list('id', 'name')
+    )
+    students = list(
+        StudentProfile.objects
+        .filter(class_level=class_ref.name)
+        .order_by('user__last_name', 'user__first_name', 'id')
+        .values_list('id', 'admission_number', Concat('user__first_name', Value(' '), 'user__last_name'))
+    )
+
+    cell = [F('student_id'), F('subject_id')]
+    latest_first = [F('graded_on').desc(), F('id').desc()]
+    # A result's subject is its exam's or, failing that, its assignment's.
+    cells = (
+        Result.objects
+        .filter(student__class_level=class_ref.name)
+        .annotate(subject_id=Coalesce('exam__subject_id', 'assignment__subject_id'))
+        .filter(subject_id__in=[subject_id for subject_id, _ in subjects])
+        .annotate(
+            position=Window(RowNumber(), partition_by=cell, order_by=latest_first),
+            average=Window(Avg('score'), partition_by=cell),
+            results=Window(Count('id'), partition_by=cell),
+            latest=Window(FirstValue('score'), partition_by=cell, order_by=latest_first),
+        )
+        .filter(position=1)
+        .values_list('student_id', 'subject_id', 'average', 'results', 'latest')
+    )
+
+    column = {subject_id: index for index, (subject_id, _) in enumerate(subjects)}
+    row = {student_id: index for index, (student_id, _, _) in enumerate(students)}
+    averages = [[None] * len(subjects) for _ in students]
+    counts = [[0] * len(subjects) for _ in students]
+    latest_scores = [[None] * len(subjects) for _ in students]
+    for student_id, subject_id, average, results, latest in cells:
+        i, j = row[student_id], column[subject_id]
+        averages[i][j] = round(float(average), 2)
+        counts[i][j] = results
+        latest_scores[i][j] = float(latest)
+
+    return {
+        'class': {'id': class_ref.id, 'name': class_ref.name},
+        'subjects': {
+            'id': [subject_id for subject_id, _ in subjects],
+            'name': [name for _, name in subjects],
+        },
+        'students': {
+            'id': [student_id for student_id, _, _ in students],
+            'admission_number': [number for _, number, _ in students],
+            'name': [name for _, _, name in students],
+        },
+        'average': averages,
+        'count': counts,
+        'latest_score': latest_scores,
+    }
@@ -0,0 +1,49 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from assessment.reportcards import process_jobs, REPORT_CARD_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "Render queued report cards"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Threads rendering report cards (default: 4)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=REPORT_CARD_BATCH_SIZE,
+            help=f'Jobs claimed at a time (default: {REPORT_CARD_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5,
+            help='Seconds to wait before checking an empty queue again (default: 5)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit as soon as the queue is empty instead of polling'
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['batch_size'] < 1:
+            raise CommandError("--workers and --batch-size must be at least 1")
+
+        self.stdout.write(f"🔍 Rendering report cards with {options['workers']} workers...")
+        while True:
+            started = time.perf_counter()
+            done, failed = process_jobs(workers=options['workers'], batch_size=options['batch_size'])
+            if done or failed:
+                self.stdout.write(self.style.SUCCESS(
+                    f"✅ Rendered {done} report cards in {time.perf_counter() - started:.1f}s "
+                    f"({failed} failed attempts)."
+                ))
+            if options['once']:
+                return
+            time.sleep(options['poll_interval'])
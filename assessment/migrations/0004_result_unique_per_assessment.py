@@ -0,0 +1,48 @@
+# Generated by Django 5.0.14 on 2026-10-17 18:27
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicate_results(apps, schema_editor):
+    # Keep the most recent result for each (student, exam) and
+    # (student, assignment) pair so the unique constraints can be added.
+    Result = apps.get_model("assessment", "Result")
+    for field in ("exam", "assignment"):
+        duplicates = (
+            Result.objects.filter(student__isnull=False, **{f"{field}__isnull": False})
+            .values("student", field)
+            .annotate(rows=Count("id"), keep=Max("id"))
+            .filter(rows__gt=1)
+        )
+        for group in duplicates:
+            Result.objects.filter(student=group["student"], **{field: group[field]}).exclude(
+                id=group["keep"]
+            ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0008_admissionsequence"),
+        (
+            "assessment",
+            "0003_exam_description_exam_duration_minutes_exam_end_time_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_results, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="result",
+            constraint=models.UniqueConstraint(
+                fields=("student", "exam"), name="unique_result_per_exam"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="result",
+            constraint=models.UniqueConstraint(
+                fields=("student", "assignment"), name="unique_result_per_assignment"
+            ),
+        ),
+    ]
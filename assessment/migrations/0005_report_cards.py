@@ -0,0 +1,105 @@
+# Generated by Django 5.0.14 on 2026-10-17 18:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0009_studentprofile_records_version"),
+        ("assessment", "0004_result_unique_per_assessment"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReportCard",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("term_start", models.DateField()),
+                ("term_end", models.DateField()),
+                ("data_version", models.PositiveIntegerField()),
+                ("document", models.JSONField()),
+                ("generated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="report_cards",
+                        to="accounts.studentprofile",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ReportCardJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("term_start", models.DateField()),
+                ("term_end", models.DateField()),
+                ("data_version", models.PositiveIntegerField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="report_card_jobs",
+                        to="accounts.studentprofile",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="reportcard",
+            constraint=models.UniqueConstraint(
+                fields=("student", "term_start", "term_end", "data_version"),
+                name="unique_report_card",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reportcardjob",
+            index=models.Index(
+                fields=["status", "id"], name="assessment__status_310f79_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="reportcardjob",
+            constraint=models.UniqueConstraint(
+                fields=("student", "term_start", "term_end", "data_version"),
+                name="unique_report_card_job",
+            ),
+        ),
+    ]
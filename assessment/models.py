@@ -59,9 +59,73 @@ class Result(models.Model):
     score = models.DecimalField(max_digits=5, decimal_places=2)  # allows scores like 98.50
     graded_on = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # NULLs never collide, so an assignment result (exam is NULL) is not
+        # caught by the exam constraint and vice versa.
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'exam'], name='unique_result_per_exam'),
+            models.UniqueConstraint(fields=['student', 'assignment'], name='unique_result_per_assignment'),
+        ]
+
     def __str__(self):
         if self.exam:
             return f"{self.student.user.first_name} - {self.exam.title}"
         elif self.assignment:
             return f"{self.student.user.first_name} - {self.assignment.title}"
         return f"{self.student.user.first_name} - No assessment"
+
+
+class ReportCardJobStatus(models.TextChoices):
+    PENDING = "pending", "Pending"
+    RUNNING = "running", "Running"
+    DONE = "done", "Done"
+    FAILED = "failed", "Failed"
+
+
+class ReportCardJob(models.Model):
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name='report_card_jobs')
+    term_start = models.DateField()
+    term_end = models.DateField()
+    data_version = models.PositiveIntegerField()
+    status = models.CharField(
+        max_length=10,
+        choices=ReportCardJobStatus.choices,
+        default=ReportCardJobStatus.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student', 'term_start', 'term_end', 'data_version'], name='unique_report_card_job'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'id']),
+        ]
+
+    def __str__(self):
+        return f"Report card for student {self.student_id} ({self.term_start} - {self.term_end}): {self.status}"
+
+
+class ReportCard(models.Model):
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name='report_cards')
+    term_start = models.DateField()
+    term_end = models.DateField()
+    data_version = models.PositiveIntegerField()
+    document = models.JSONField()
+    generated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student', 'term_start', 'term_end', 'data_version'], name='unique_report_card'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Report card for student {self.student_id} ({self.term_start} - {self.term_end})"
@@ -0,0 +1,227 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce, Concat
+from django.utils import timezone
+from accounts.models import StudentProfile
+from attendance.models import AttendanceRecord, AttendanceStatus, STATUS_COUNTS
+from .models import Result, ReportCard, ReportCardJob, ReportCardJobStatus
+
+REPORT_CARD_BATCH_SIZE = 50
+REPORT_CARD_MAX_ATTEMPTS = 3
+# A running job is left to its worker for this long; if the worker dies
+# mid-batch the job is claimed again once the lease runs out.
+REPORT_CARD_CLAIM_LEASE = timedelta(minutes=10)
+
+
+def bump_records_version(student_ids):
+    """
+    Mark the students' report cards as stale. Cached cards are keyed by the
+    version they were built from, so they simply stop matching.
+    """
+    student_ids = {student_id for student_id in student_ids if student_id is not None}
+    if student_ids:
+        StudentProfile.objects.filter(id__in=student_ids).update(records_version=F('records_version') + 1)
+
+
+def build_report_card(student_id, term_start, term_end):
+    """
+    One student's report card for a term: per-subject scores and averages for
+    the exams and assignments dated inside the term, plus attendance totals.
+    Three queries: the profile, the results and the attendance counts.
+    """
+    student = (
+        StudentProfile.objects
+        .filter(pk=student_id)
+        .values(
+            'id', 'admission_number', 'class_level', 'academic_year', 'records_version',
+            name=Concat('user__first_name', Value(' '), 'user__last_name'),
+        )
+        .get()
+    )
+
+    results = (
+        Result.objects
+        .filter(student_id=student_id)
+        .annotate(
+            assessed_on=Coalesce('exam__exam_date', 'assignment__due_date'),
+            subject_name=Coalesce('exam__subject__name', 'assignment__subject__name'),
+            title=Coalesce('exam__title', 'assignment__title'),
+        )
+        .filter(assessed_on__range=[term_start, term_end])
+        .order_by('subject_name', 'assessed_on', 'id')
+        .values_list('subject_name', 'title', 'exam_id', 'assessed_on', 'score')
+    )
+    subjects = {}
+    for subject_name, title, exam_id, assessed_on, score in results:
+        subjects.setdefault(subject_name or 'General', []).append({
+            'title': title,
+            'type': 'exam' if exam_id else 'assignment',
+            'date': assessed_on.isoformat(),
+            'score': float(score),
+        })
+
+    scores = [entry['score'] for entries in subjects.values() for entry in entries]
+    attendance = AttendanceRecord.objects.filter(
+        student_id=student_id, date__range=[term_start, term_end]
+    ).aggregate(**STATUS_COUNTS)
+    days = sum(attendance.values())
+    attended = attendance[AttendanceStatus.PRESENT] + attendance[AttendanceStatus.LATE]
+
+    return {
+        'student': {key: value for key, value in student.items() if key != 'records_version'},
+        'term': {'start_date': term_start.isoformat(), 'end_date': term_end.isoformat()},
+        'subjects': [
+            {
+                'name': name,
+                'average': round(sum(entry['score'] for entry in entries) / len(entries), 2),
+                'results': entries,
+            }
+            for name, entries in subjects.items()
+        ],
+        'overall_average': round(sum(scores) / len(scores), 2) if scores else None,
+        'attendance': {
+            **attendance,
+            'days': days,
+            'rate': round(100 * attended / days, 1) if days else None,
+        },
+        'data_version': student['records_version'],
+    }
+
+
+def get_report_card(student, term_start, term_end):
+    """The cached card for the student's current data, or None if there is none yet."""
+    return ReportCard.objects.filter(
+        student=student, term_start=term_start, term_end=term_end, data_version=student.records_version
+    ).first()
+
+
+def enqueue_report_cards(students, term_start, term_end):
+    """
+    Queue a job for every student in the queryset whose card for the term is
+    missing or stale, and return how many students that covers. Re-queuing a
+    student whose job is already waiting is a no-op, and a job that failed
+    for the same data is given another try.
+    """
+    current = dict(students.order_by().values_list('id', 'records_version'))
+    cached = set(
+        ReportCard.objects
+        .filter(student_id__in=current, term_start=term_start, term_end=term_end)
+        .values_list('student_id', 'data_version')
+    )
+    stale = {student_id: version for student_id, version in current.items() if (student_id, version) not in cached}
+    if not stale:
+        return 0
+
+    term = {'term_start': term_start, 'term_end': term_end}
+    with transaction.atomic():
+        ReportCardJob.objects.bulk_create(
+            [ReportCardJob(student_id=student_id, data_version=version, **term) for student_id, version in stale.items()],
+            ignore_conflicts=True,
+        )
+        ReportCardJob.objects.filter(
+            student_id__in=stale, status=ReportCardJobStatus.FAILED, **term
+        ).update(status=ReportCardJobStatus.PENDING, attempts=0, error='')
+    return len(stale)
+
+
+def claim_jobs(limit=REPORT_CARD_BATCH_SIZE):
+    """
+    Move up to `limit` pending jobs, and running jobs whose lease has run
+    out, to running and return them. Each job is claimed with a conditional
+    UPDATE, so several workers can share the table without taking the same
+    job twice.
+    """
+    now = timezone.now()
+    expired = Q(status=ReportCardJobStatus.RUNNING, started_at__lt=now - REPORT_CARD_CLAIM_LEASE)
+    # A job whose worker died on every attempt is given up on, not retried forever.
+    ReportCardJob.objects.filter(expired, attempts__gte=REPORT_CARD_MAX_ATTEMPTS).update(
+        status=ReportCardJobStatus.FAILED, error='The worker stopped while rendering this card.', finished_at=now
+    )
+
+    claimable = ReportCardJob.objects.filter(Q(status=ReportCardJobStatus.PENDING) | expired)
+    claimed = []
+    for job_id in claimable.order_by('id').values_list('id', flat=True)[:limit]:
+        if claimable.filter(pk=job_id).update(
+            status=ReportCardJobStatus.RUNNING, started_at=now, attempts=F('attempts') + 1
+        ):
+            claimed.append(job_id)
+    return list(ReportCardJob.objects.filter(pk__in=claimed).order_by('id'))
+
+
+def render_job(job):
+    """Return (document, None) for the job, or (None, error) if rendering failed."""
+    try:
+        return build_report_card(job.student_id, job.term_start, job.term_end), None
+    except Exception as e:
+        return None, e
+
+
+def render_job_in_thread(job):
+    # Pool threads get their own connection; close it once the job is done.
+    try:
+        return render_job(job)
+    finally:
+        connection.close()
+
+
+def store_rendered(jobs, outcomes):
+    """
+    Save a batch of rendered cards and finish their jobs in one transaction.
+    A card is keyed by the version read before its data, so a change made
+    while it was rendering leaves it stale rather than wrongly current.
+    Failed jobs go back to the queue until they run out of attempts.
+    """
+    finished_at = timezone.now()
+    cards = []
+    replaced = Q(pk__in=[])
+    for job, (document, error) in zip(jobs, outcomes):
+        job.finished_at = finished_at
+        if error is None:
+            job.status = ReportCardJobStatus.DONE
+            job.error = ''
+            term = {'student_id': job.student_id, 'term_start': job.term_start, 'term_end': job.term_end}
+            cards.append(ReportCard(data_version=document['data_version'], document=document, **term))
+            replaced |= Q(data_version__lt=document['data_version'], **term)
+        elif job.attempts < REPORT_CARD_MAX_ATTEMPTS:
+            job.status = ReportCardJobStatus.PENDING
+            job.error = str(error)
+        else:
+            job.status = ReportCardJobStatus.FAILED
+            job.error = str(error)
+
+    with transaction.atomic():
+        if cards:
+            ReportCard.objects.bulk_create(
+                cards,
+                update_conflicts=True,
+                unique_fields=['student', 'term_start', 'term_end', 'data_version'],
+                update_fields=['document', 'generated_at'],
+            )
+            ReportCard.objects.filter(replaced).delete()
+        ReportCardJob.objects.bulk_update(jobs, ['status', 'error', 'finished_at'])
+    return len(cards)
+
+
+def process_jobs(workers=1, batch_size=REPORT_CARD_BATCH_SIZE):
+    """
+    Claim and render batches until the queue is empty and return the number
+    of jobs that succeeded and failed. With more than one worker each batch
+    is rendered on a thread pool; claiming and storing stay on this thread,
+    so the pool only ever reads.
+    """
+    done = failed = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='report-cards') as pool:
+        while True:
+            close_old_connections()
+            jobs = claim_jobs(batch_size)
+            if not jobs:
+                return done, failed
+            if workers > 1:
+                outcomes = list(pool.map(render_job_in_thread, jobs))
+            else:
+                outcomes = [render_job(job) for job in jobs]
+            stored = store_rendered(jobs, outcomes)
+            done += stored
+            failed += len(jobs) - stored
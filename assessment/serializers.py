@@ -1,7 +1,10 @@
 
 from rest_framework import serializers
+from django.db import transaction
 from .models import Grade, Exam, Assignment, Result
-from accounts.models import TeacherProfile, Subject
+from accounts.models import TeacherProfile, Subject, StudentProfile
+from core.search import index_objects
+from .reportcards import bump_records_version
 from accounts.serializers import SubjectWriteSerializer
 from accounts.serializers import TeacherProfileSerializer, StudentProfileSerializer, SubjectWriteSerializer
 
@@ -62,4 +65,64 @@ class ResultSerializer(serializers.ModelSerializer):
         fields = '__all__'
         extra_kwargs = {
             'student': {'required': True}
-        }
\ No newline at end of file
+        }
+
+
+class ResultBulkEntrySerializer(serializers.Serializer):
+    student = serializers.IntegerField()
+    score = serializers.DecimalField(max_digits=5, decimal_places=2, min_value=0)
+
+
+class ResultBulkSerializer(serializers.Serializer):
+    """Validates a whole exam's (or assignment's) scores in a fixed number of queries."""
+    exam = serializers.PrimaryKeyRelatedField(queryset=Exam.objects.all(), required=False)
+    assignment = serializers.PrimaryKeyRelatedField(queryset=Assignment.objects.all(), required=False)
+    scores = ResultBulkEntrySerializer(many=True, allow_empty=False)
+
+    def validate_scores(self, value):
+        student_ids = [entry['student'] for entry in value]
+        if len(student_ids) != len(set(student_ids)):
+            raise serializers.ValidationError("Each student can only appear once per submission.")
+
+        found = set(
+            StudentProfile.objects.filter(id__in=student_ids).order_by().values_list('id', flat=True)
+        )
+        missing = [student_id for student_id in student_ids if student_id not in found]
+        if missing:
+            raise serializers.ValidationError(
+                f"Students with IDs {missing} do not exist."
+            )
+        return value
+
+    def validate(self, data):
+        if bool(data.get('exam')) == bool(data.get('assignment')):
+            raise serializers.ValidationError("Provide either an exam or an assignment, not both.")
+
+        assessment = data.get('exam') or data.get('assignment')
+        teacher = self.context.get('teacher')
+        if teacher is not None and assessment.teacher_id not in (None, teacher.id):
+            raise serializers.ValidationError("You can only grade your own exams and assignments.")
+        return data
+
+    def create(self, validated_data):
+        field = 'exam' if validated_data.get('exam') else 'assignment'
+        assessment = validated_data[field]
+
+        results = [
+            Result(student_id=entry['student'], score=entry['score'], **{field: assessment})
+            for entry in validated_data['scores']
+        ]
+        with transaction.atomic():
+            results = Result.objects.bulk_create(
+                results,
+                update_conflicts=True,
+                unique_fields=['student', field],
+                update_fields=['score', 'graded_on'],
+            )
+            # bulk_create skips the search and report card signals; do their work here.
+            student_ids = [result.student_id for result in results]
+            index_objects(Result, Result.objects.filter(
+                **{field: assessment, 'student_id__in': student_ids}
+            ).values('pk'))
+            bump_records_version(student_ids)
+        return results
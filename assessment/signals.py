@@ -0,0 +1,36 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Result, Exam, Assignment
+from .reportcards import bump_records_version
+
+
+@receiver(pre_save, sender=Result)
+def remember_previous_student(sender, instance, raw=False, **kwargs):
+    # A result moved to another student changes both students' report cards.
+    instance._previous_student_id = None
+    if instance.pk and not raw:
+        instance._previous_student_id = (
+            Result.objects.filter(pk=instance.pk).values_list("student_id", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Result)
+def mark_report_cards_stale_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    bump_records_version({instance.student_id, getattr(instance, "_previous_student_id", None)})
+
+
+@receiver(post_delete, sender=Result)
+def mark_report_cards_stale_on_delete(sender, instance, **kwargs):
+    bump_records_version({instance.student_id})
+
+
+@receiver(post_save, sender=Exam)
+@receiver(post_save, sender=Assignment)
+def mark_report_cards_stale_on_assessment_save(sender, instance, created=False, raw=False, **kwargs):
+    # Cards show the exam or assignment's title, date and subject.
+    if raw or created:
+        return
+    lookup = "exam" if sender is Exam else "assignment"
+    bump_records_version(Result.objects.filter(**{lookup: instance}).values_list("student_id", flat=True))
@@ -1,3 +1,362 @@
+from io import StringIO
+from datetime import date, timedelta
+from django.core.management import call_command
+from django.db import IntegrityError
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from accounts.authentication import PROFILE_RELATIONS
+from accounts.models import User, StudentProfile, TeacherProfile, Classes, Subject
+from attendance.models import AttendanceRecord
+from core.search import search
+from .models import Exam, Assignment, Result, ReportCard, ReportCardJob, ReportCardJobStatus
+from .reportcards import REPORT_CARD_CLAIM_LEASE, REPORT_CARD_MAX_ATTEMPTS, claim_jobs, process_jobs
 
-# Create your tests here.
+
+class GradebookTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(
+            email='teacher@example.com', password='teacherpass123', role='teacher', is_active=True, is_verified=True
+        )
+        self.teacher_profile = TeacherProfile.objects.create(user=self.teacher)
+        self.client.force_authenticate(user=self.teacher)
+
+        self.class_ref = Classes.objects.create(name='JSS 1')
+        self.english = Subject.objects.create(name='English', assigned_class=self.class_ref)
+        self.maths = Subject.objects.create(
+            name='Mathematics', assigned_class=self.class_ref, teacher=self.teacher_profile
+        )
+        self.ada = self.create_student('Ada', 'Lovelace')
+        self.alan = self.create_student('Alan', 'Turing')
+        self.url = reverse('class-gradebook', args=[self.class_ref.id])
+
+    def create_student(self, first_name, last_name):
+        user = User.objects.create_user(
+            email=f'{first_name.lower()}@example.com', password='studentpass123', first_name=first_name,
+            last_name=last_name, role='student', is_active=True, is_verified=True
+        )
+        return StudentProfile.objects.create(user=user, class_level=self.class_ref.name)
+
+    def record(self, student, subject, score, days_ago, assignment=False):
+        if assignment:
+            assessment = {'assignment': Assignment.objects.create(
+                title='Homework', description='', subject=subject, due_date='2025-01-06'
+            )}
+        else:
+            assessment = {'exam': Exam.objects.create(title='Test', subject=subject, exam_date='2025-01-06')}
+        result = Result.objects.create(student=student, score=score, **assessment)
+        Result.objects.filter(pk=result.pk).update(graded_on=timezone.now() - timedelta(days=days_ago))
+
+    def test_gradebook_matrix(self):
+        self.record(self.ada, self.maths, 60, days_ago=3)
+        self.record(self.ada, self.maths, 90, days_ago=1, assignment=True)
+        self.record(self.ada, self.english, 75, days_ago=2)
+        self.record(self.alan, self.maths, 80, days_ago=1)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['subjects']['name'], ['English', 'Mathematics'])
+        self.assertEqual(response.data['students']['name'], ['Ada Lovelace', 'Alan Turing'])
+        self.assertEqual(response.data['average'], [[75.0, 75.0], [None, 80.0]])
+        self.assertEqual(response.data['count'], [[1, 2], [0, 1]])
+        self.assertEqual(response.data['latest_score'], [[75.0, 90.0], [None, 80.0]])
+
+    def test_gradebook_query_count_is_fixed(self):
+        # Loaded the way the JWT authentication loads it, with the profiles joined.
+        teacher = User.objects.select_related(*PROFILE_RELATIONS)
+        self.record(self.ada, self.maths, 60, days_ago=1)
+        self.client.force_authenticate(user=teacher.get(pk=self.teacher.pk))
+        with self.assertNumQueries(5):
+            self.client.get(self.url)
+
+        for i in range(5):
+            self.record(self.create_student(f'Student{i}', 'Pupil'), self.english, 50 + i, days_ago=i)
+        self.client.force_authenticate(user=teacher.get(pk=self.teacher.pk))
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data['students']['id']), 7)
+
+    def test_gradebook_is_for_staff_only(self):
+        self.client.force_authenticate(user=self.ada.user)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.teacher)
+        missing = reverse('class-gradebook', args=[self.class_ref.id + 100])
+        self.assertEqual(self.client.get(missing).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_gradebook_is_for_teachers_of_the_class(self):
+        other = User.objects.create_user(
+            email='other@example.com', password='teacherpass123', role='teacher', is_active=True, is_verified=True
+        )
+        other_profile = TeacherProfile.objects.create(user=other)
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+        # The class teacher may read it without teaching any of its subjects.
+        Classes.objects.filter(pk=self.class_ref.pk).update(teacher=other_profile)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+        admin = User.objects.create_user(
+            email='admin@example.com', password='adminpass123', role='admin', is_active=True, is_verified=True
+        )
+        self.client.force_authenticate(user=admin)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+
+class ResultBulkTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher_user = User.objects.create_user(
+            email='teacher@example.com', password='teacherpass123', role='teacher', is_active=True, is_verified=True
+        )
+        self.teacher = TeacherProfile.objects.create(user=self.teacher_user)
+        self.authenticate()
+
+        self.exam = Exam.objects.create(title='Mid-term', teacher=self.teacher, exam_date='2025-03-01')
+        self.students = []
+        for i in range(4):
+            user = User.objects.create_user(
+                email=f'student{i}@example.com', password='studentpass123', first_name=f'Student{i}',
+                last_name='Pupil', role='student', is_active=True, is_verified=True
+            )
+            self.students.append(StudentProfile.objects.create(user=user, class_level='JSS 1'))
+        self.url = reverse('result-bulk')
+
+    def authenticate(self):
+        self.client.force_authenticate(user=User.objects.get(pk=self.teacher_user.pk))
+
+    def submission(self, scores, **assessment):
+        assessment = assessment or {'exam': self.exam.id}
+        return {
+            **assessment,
+            'scores': [{'student': student.id, 'score': score} for student, score in zip(self.students, scores)]
+        }
+
+    def test_bulk_records_and_corrects_scores(self):
+        response = self.client.post(self.url, self.submission([50, 60, 70, 80]), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, {'exam': self.exam.id, 'count': 4})
+
+        self.client.post(self.url, self.submission([55, 65]), format='json')
+
+        scores = dict(Result.objects.filter(exam=self.exam).values_list('student_id', 'score'))
+        self.assertEqual(len(scores), 4)
+        self.assertEqual([scores[student.id] for student in self.students], [55, 65, 70, 80])
+        self.assertEqual(list(search(Result.objects.all(), 'student2')), [Result.objects.get(student=self.students[2])])
+
+    def test_bulk_assignment_scores(self):
+        assignment = Assignment.objects.create(
+            title='Essay', description='', teacher=self.teacher, due_date='2025-03-01'
+        )
+
+        response = self.client.post(self.url, self.submission([90, 95], assignment=assignment.id), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Result.objects.filter(assignment=assignment).count(), 2)
+
+    def test_bulk_query_count_is_independent_of_class_size(self):
+        self.client.post(self.url, self.submission([50]), format='json')
+
+        self.authenticate()
+        with self.assertNumQueries(9):
+            self.client.post(self.url, self.submission([50, 60]), format='json')
+        self.authenticate()
+        with self.assertNumQueries(9):
+            self.client.post(self.url, self.submission([50, 60, 70, 80]), format='json')
+
+    def test_bulk_rejects_invalid_submissions(self):
+        other_teacher = TeacherProfile.objects.create(user=User.objects.create_user(
+            email='other@example.com', password='teacherpass123', role='teacher', is_active=True, is_verified=True
+        ))
+        other_exam = Exam.objects.create(title='Final', teacher=other_teacher, exam_date='2025-03-01')
+        assignment = Assignment.objects.create(title='Essay', description='', due_date='2025-03-01')
+
+        unknown = self.submission([50])
+        unknown['scores'].append({'student': 99999, 'score': 40})
+        duplicate = self.submission([50])
+        duplicate['scores'].append({'student': self.students[0].id, 'score': 40})
+
+        for payload in [
+            unknown,
+            duplicate,
+            self.submission([50], exam=self.exam.id, assignment=assignment.id),
+            self.submission([50], exam=other_exam.id),
+            self.submission([-5]),
+        ]:
+            with self.subTest(payload=payload):
+                response = self.client.post(self.url, payload, format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Result.objects.exists())
+
+        self.client.force_authenticate(user=self.students[0].user)
+        response = self.client.post(self.url, self.submission([100]), format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_duplicate_results_are_rejected_by_the_database(self):
+        Result.objects.create(student=self.students[0], exam=self.exam, score=50)
+
+        with self.assertRaises(IntegrityError):
+            Result.objects.create(student=self.students[0], exam=self.exam, score=60)
+
+
+class ReportCardTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            email='admin@example.com', password='adminpass123', role='admin', is_active=True, is_verified=True
+        )
+        self.teacher = TeacherProfile.objects.create(user=User.objects.create_user(
+            email='teacher@example.com', password='teacherpass123', role='teacher', is_active=True, is_verified=True
+        ))
+        self.class_ref = Classes.objects.create(name='JSS 1')
+        self.maths = Subject.objects.create(name='Mathematics', assigned_class=self.class_ref, teacher=self.teacher)
+        self.student = StudentProfile.objects.create(user=User.objects.create_user(
+            email='ada@example.com', password='studentpass123', first_name='Ada', last_name='Lovelace',
+            role='student', is_active=True, is_verified=True
+        ), class_level='JSS 1')
+
+        self.exam = Exam.objects.create(title='Mid-term', subject=self.maths, teacher=self.teacher, exam_date='2025-02-10')
+        self.result = Result.objects.create(student=self.student, exam=self.exam, score=70)
+        homework = Assignment.objects.create(
+            title='Homework', description='', subject=self.maths, teacher=self.teacher, due_date='2025-02-20'
+        )
+        Result.objects.create(student=self.student, assignment=homework, score=90)
+        outside_term = Exam.objects.create(title='Old', subject=self.maths, exam_date='2024-11-01')
+        Result.objects.create(student=self.student, exam=outside_term, score=10)
+        for day, record_status in [(3, 'present'), (4, 'late'), (5, 'absent'), (6, 'present')]:
+            AttendanceRecord.objects.create(
+                student=self.student, class_ref=self.class_ref, date=date(2025, 2, day), status=record_status
+            )
+
+        self.url = reverse('student-report-card', args=[self.student.id])
+        self.term = {'start_date': '2025-01-06', 'end_date': '2025-03-28'}
+
+    def test_card_is_rendered_in_the_background_and_served_from_cache(self):
+        self.client.force_authenticate(user=self.student.user)
+
+        response = self.client.get(self.url, self.term)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.client.get(self.url, self.term)
+        self.assertEqual(ReportCardJob.objects.count(), 1)
+
+        call_command('run_report_card_worker', '--once', '--workers', '1', stdout=StringIO())
+
+        response = self.client.get(self.url, self.term)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['student']['name'], 'Ada Lovelace')
+        self.assertEqual(response.data['subjects'][0]['name'], 'Mathematics')
+        self.assertEqual([entry['score'] for entry in response.data['subjects'][0]['results']], [70.0, 90.0])
+        self.assertEqual(response.data['overall_average'], 80.0)
+        self.assertEqual(response.data['attendance']['days'], 4)
+        self.assertEqual(response.data['attendance']['rate'], 75.0)
+        self.assertEqual(ReportCardJob.objects.get().status, ReportCardJobStatus.DONE)
+
+    def test_result_and_attendance_changes_make_the_card_stale(self):
+        self.client.force_authenticate(user=self.admin)
+        self.client.get(self.url, self.term)
+        process_jobs()
+
+        self.result.score = 50
+        self.result.save()
+        self.assertEqual(self.client.get(self.url, self.term).status_code, status.HTTP_202_ACCEPTED)
+        process_jobs()
+        response = self.client.get(self.url, self.term)
+        self.assertEqual(response.data['overall_average'], 70.0)
+        # Only the card for the current data is kept.
+        self.assertEqual(ReportCard.objects.count(), 1)
+
+        self.client.post(reverse('attendance-bulk'), {
+            'class_ref': self.class_ref.id,
+            'date': '2025-02-07',
+            'records': [{'student': self.student.id, 'status': 'absent'}],
+        }, format='json')
+        self.assertEqual(self.client.get(self.url, self.term).status_code, status.HTTP_202_ACCEPTED)
+
+        process_jobs()
+        self.client.force_authenticate(user=self.teacher.user)
+        self.client.post(reverse('result-bulk'), {
+            'exam': self.exam.id, 'scores': [{'student': self.student.id, 'score': 100}]
+        }, format='json')
+        self.assertEqual(self.client.get(self.url, self.term).status_code, status.HTTP_202_ACCEPTED)
+
+    def test_renaming_an_exam_makes_the_card_stale(self):
+        self.client.force_authenticate(user=self.admin)
+        self.client.get(self.url, self.term)
+        process_jobs()
+
+        self.exam.title = 'Half-term'
+        self.exam.save()
+        self.assertEqual(self.client.get(self.url, self.term).status_code, status.HTTP_202_ACCEPTED)
+        process_jobs()
+        titles = [entry['title'] for entry in self.client.get(self.url, self.term).data['subjects'][0]['results']]
+        self.assertIn('Half-term', titles)
+
+    def test_generate_queues_only_missing_cards(self):
+        self.client.force_authenticate(user=self.admin)
+        url = reverse('generate-report-cards')
+        payload = {**self.term, 'class_id': self.class_ref.id}
+
+        response = self.client.post(url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data, {'queued': 1})
+        self.client.post(url, payload, format='json')
+        self.assertEqual(ReportCardJob.objects.count(), 1)
+
+        self.assertEqual(process_jobs(), (1, 0))
+        self.assertEqual(self.client.post(url, payload, format='json').data, {'queued': 0})
+
+        response = self.client.post(url, {**self.term, 'class_id': 'JSS 1'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_jobs_of_a_dead_worker_are_claimed_again(self):
+        self.client.force_authenticate(user=self.admin)
+        self.client.get(self.url, self.term)
+        job, = claim_jobs()
+        # The worker dies here, leaving the job running.
+        self.assertEqual(claim_jobs(), [])
+
+        ReportCardJob.objects.filter(pk=job.pk).update(
+            started_at=timezone.now() - REPORT_CARD_CLAIM_LEASE - timedelta(seconds=1)
+        )
+        self.assertEqual(process_jobs(), (1, 0))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (ReportCardJobStatus.DONE, 2))
+        self.assertEqual(self.client.get(self.url, self.term).status_code, status.HTTP_200_OK)
+
+    def test_job_that_keeps_killing_its_worker_fails(self):
+        self.client.force_authenticate(user=self.admin)
+        self.client.get(self.url, self.term)
+        ReportCardJob.objects.update(
+            status=ReportCardJobStatus.RUNNING, attempts=REPORT_CARD_MAX_ATTEMPTS,
+            started_at=timezone.now() - REPORT_CARD_CLAIM_LEASE - timedelta(seconds=1),
+        )
+
+        self.assertEqual(claim_jobs(), [])
+        self.assertEqual(ReportCardJob.objects.get().status, ReportCardJobStatus.FAILED)
+
+    def test_report_cards_are_private(self):
+        other = User.objects.create_user(
+            email='alan@example.com', password='studentpass123', role='student', is_active=True, is_verified=True
+        )
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(self.url, self.term).status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.post(reverse('generate-report-cards'), self.term, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        other_teacher = TeacherProfile.objects.create(user=User.objects.create_user(
+            email='grace@example.com', password='teacherpass123', role='teacher', is_active=True, is_verified=True
+        ))
+        self.client.force_authenticate(user=other_teacher.user)
+        self.assertEqual(self.client.get(self.url, self.term).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(user=self.teacher.user)
+        self.assertEqual(self.client.get(self.url, self.term).status_code, status.HTTP_202_ACCEPTED)
+
+        self.client.force_authenticate(user=self.student.user)
+        response = self.client.get(self.url, {'start_date': '2025-03-28', 'end_date': '2025-01-06'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'start_date': '2025-02-30', 'end_date': '2025-03-28'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
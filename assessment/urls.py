@@ -4,7 +4,10 @@ from .views import (
     GradeViewSet,
     ExamViewSet,
     AssignmentViewSet,
-    ResultViewSet
+    ResultViewSet,
+    class_gradebook,
+    student_report_card,
+    generate_report_cards
 )
 
 
@@ -17,7 +20,9 @@ router.register(r'results', ResultViewSet, basename='result')
 
 
 custom_urlpatterns = [
-   
+    path('gradebook/<int:class_id>/', class_gradebook, name='class-gradebook'),
+    path('report-cards/generate/', generate_report_cards, name='generate-report-cards'),
+    path('report-cards/<int:student_id>/', student_report_card, name='student-report-card'),
 ]
 
 urlpatterns = [
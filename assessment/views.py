@@ -1,17 +1,22 @@
 
 from rest_framework import viewsets, permissions, status
-from rest_framework.pagination import PageNumberPagination
+from core.pagination import CursorOptInPagination
+from core.search import search as search_queryset
 from rest_framework.response import Response
+from rest_framework.decorators import action, api_view, permission_classes
+from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_date
+from accounts.models import Classes, StudentProfile
+from .gradebook import build_gradebook
+from .reportcards import enqueue_report_cards, get_report_card
 from django.db.models import Q
 from .models import Grade, Exam, Assignment, Result
-from .serializers import GradeSerializer, ExamReadSerializer, AssignmentSerializer, ResultSerializer, ExamWriteSerializer
+from .serializers import GradeSerializer, ExamReadSerializer, AssignmentSerializer, ResultSerializer, ExamWriteSerializer, ResultBulkSerializer
 from accounts.permissions import IsAdminOrReadOnly, RolePermission
 from datetime import datetime, timedelta
 
-class GradePagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+class GradePagination(CursorOptInPagination):
+    cursor_ordering = '-id'
 
 class GradeViewSet(viewsets.ModelViewSet):
     queryset = Grade.objects.all()
@@ -30,10 +35,8 @@ class GradeViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
-class ExamPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+class ExamPagination(CursorOptInPagination):
+    cursor_ordering = '-id'
 
 class ExamViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
@@ -52,20 +55,17 @@ class ExamViewSet(viewsets.ModelViewSet):
         return ExamWriteSerializer
 
     def get_queryset(self):
-        queryset = Exam.objects.all().select_related("teacher", "subject")
-        
-    
-        search = self.request.query_params.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(subject__name__icontains=search)
-            )
+        queryset = Exam.objects.all().select_related("teacher__user", "subject", "grade")
 
         if hasattr(self.request.user, 'teacher_profile'):
             queryset = queryset.filter(teacher=self.request.user.teacher_profile)
+        queryset = queryset.order_by("-id")
+
+        search = self.request.query_params.get('search')
+        if search:
+            queryset = search_queryset(queryset, search)
             
-        return queryset.order_by("-id")
+        return queryset
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
@@ -118,10 +118,8 @@ class ExamViewSet(viewsets.ModelViewSet):
 
         serializer.save()
 
-class AssignmentPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+class AssignmentPagination(CursorOptInPagination):
+    cursor_ordering = '-id'
 
 class AssignmentViewSet(viewsets.ModelViewSet):
     serializer_class = AssignmentSerializer
@@ -131,18 +129,14 @@ class AssignmentViewSet(viewsets.ModelViewSet):
     required_roles = ["teacher"]  
 
     def get_queryset(self):
-        queryset = Assignment.objects.all()
-        
-      
-        search = self.request.query_params.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(subject__name__icontains=search)
-            )
+        queryset = Assignment.objects.all().select_related('subject', 'teacher__user', 'grade')
 
         if hasattr(self.request.user, 'teacher_profile'):
             queryset = queryset.filter(teacher=self.request.user.teacher_profile)
+
+        search = self.request.query_params.get('search')
+        if search:
+            queryset = search_queryset(queryset, search)
         return queryset
 
     def list(self, request, *args, **kwargs):
@@ -159,10 +153,8 @@ class AssignmentViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(teacher=self.request.user.teacher_profile)
 
-class ResultPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+class ResultPagination(CursorOptInPagination):
+    cursor_ordering = '-id'
 
 class ResultViewSet(viewsets.ModelViewSet):
     serializer_class = ResultSerializer
@@ -172,17 +164,13 @@ class ResultViewSet(viewsets.ModelViewSet):
     required_roles = ["teacher", "student"]  
 
     def get_queryset(self):
-        queryset = Result.objects.all()
-        
-     
-        search = self.request.query_params.get('search')
-        if search and hasattr(self.request.user, 'teacher_profile'):
-            queryset = queryset.filter(
-                Q(student__user__first_name__icontains=search) |
-                Q(student__user__last_name__icontains=search) |
-                Q(exam__title__icontains=search) |
-                Q(assignment__title__icontains=search)
-            )
+        queryset = Result.objects.all().select_related(
+            'student__user',
+            'exam',
+            'assignment__subject',
+            'assignment__teacher__user',
+            'assignment__grade'
+        )
 
       
         if hasattr(self.request.user, 'student_profile'):
@@ -190,10 +178,15 @@ class ResultViewSet(viewsets.ModelViewSet):
             
     
         elif hasattr(self.request.user, 'teacher_profile'):
-            return queryset.filter(
+            queryset = queryset.filter(
                 Q(exam__teacher=self.request.user.teacher_profile) |
                 Q(assignment__teacher=self.request.user.teacher_profile)
             )
+
+            search = self.request.query_params.get('search')
+            if search:
+                queryset = search_queryset(queryset, search)
+            return queryset
             
         return queryset.none()
 
@@ -206,4 +199,122 @@ class ResultViewSet(viewsets.ModelViewSet):
             return self.get_paginated_response(serializer.data)
             
         serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Record or correct a whole exam's (or assignment's) scores at once:
+        {"exam": 1, "scores": [{"student": 5, "score": 78.5}, ...]}.
+        A student who already has a result for it gets the new score.
+        """
+        if not hasattr(request.user, 'teacher_profile'):
+            return Response({"error": "Only teachers can submit scores."}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = ResultBulkSerializer(data=request.data, context={'teacher': request.user.teacher_profile})
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+
+        field = 'exam' if serializer.validated_data.get('exam') else 'assignment'
+        return Response(
+            {field: serializer.validated_data[field].id, 'count': len(results)},
+            status=status.HTTP_201_CREATED
+        )
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def class_gradebook(request, class_id):
+    if request.user.role not in ("admin", "teacher"):
+        return Response({"error": "Only teachers and admins can view gradebooks."},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    class_ref = get_object_or_404(Classes, pk=class_id)
+    if request.user.role == "teacher" and not teaches_class(request.user, class_ref):
+        return Response({"error": "You can only view gradebooks of classes you teach."},
+                        status=status.HTTP_403_FORBIDDEN)
+    return Response(build_gradebook(class_ref))
+
+
+def teaches_class(user, class_ref):
+    """Whether the user is the class teacher or teaches one of its subjects."""
+    teacher = getattr(user, 'teacher_profile', None)
+    if teacher is None:
+        return False
+    return class_ref.teacher_id == teacher.id or class_ref.subjects.filter(teacher=teacher).exists()
+
+
+def teaches_student(user, student):
+    """Whether the user teaches the class the student is in (class_level holds its name)."""
+    class_ref = Classes.objects.filter(name=student.class_level).first()
+    return class_ref is not None and teaches_class(user, class_ref)
+
+
+def term_dates(params):
+    try:
+        term_start = parse_date(params.get('start_date') or '')
+        term_end = parse_date(params.get('end_date') or '')
+    except ValueError:
+        # Well formed but impossible, e.g. 2025-02-30.
+        return None
+    if not term_start or not term_end or term_start > term_end:
+        return None
+    return term_start, term_end
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def student_report_card(request, student_id):
+    """
+    The student's report card for ?start_date=&end_date=. A card rendered
+    from the student's current results and attendance is returned as is;
+    otherwise one is queued and the response is 202 until a worker has
+    rendered it.
+    """
+    student = get_object_or_404(StudentProfile, pk=student_id)
+    if request.user.role not in ("admin", "teacher") and student.user_id != request.user.id:
+        return Response({"error": "You can only view your own report card."},
+                        status=status.HTTP_403_FORBIDDEN)
+    if request.user.role == "teacher" and not teaches_student(request.user, student):
+        return Response({"error": "You can only view report cards of students in classes you teach."},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    term = term_dates(request.query_params)
+    if term is None:
+        return Response({'error': 'start_date and end_date (YYYY-MM-DD) are required'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    card = get_report_card(student, *term)
+    if card is not None:
+        return Response(card.document)
+
+    enqueue_report_cards(StudentProfile.objects.filter(pk=student.pk), *term)
+    return Response({'status': 'pending'}, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def generate_report_cards(request):
+    """
+    Queue report cards for a term, for one class ({"class_id": 1}) or the
+    whole school. Students whose card is already current are skipped.
+    """
+    if request.user.role != "admin":
+        return Response({"error": "Only admins can generate report cards."},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    term = term_dates(request.data)
+    if term is None:
+        return Response({'error': 'start_date and end_date (YYYY-MM-DD) are required'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    students = StudentProfile.objects.all()
+    class_id = request.data.get('class_id')
+    if class_id not in (None, ''):
+        try:
+            class_id = int(class_id)
+        except (TypeError, ValueError):
+            return Response({'error': 'class_id must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        students = students.filter(class_level=get_object_or_404(Classes, pk=class_id).name)
+
+    return Response({'queued': enqueue_report_cards(students, *term)}, status=status.HTTP_202_ACCEPTED)
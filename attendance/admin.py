@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import AttendanceRecord
+from .models import AttendanceRecord, DailyAttendanceSummary
 
 @admin.register(AttendanceRecord)
 class AttendanceRecordAdmin(admin.ModelAdmin):
@@ -33,4 +33,12 @@ class AttendanceRecordAdmin(admin.ModelAdmin):
 
     def recorded_by_name(self, obj):
         return obj.recorded_by.user.get_full_name() if obj.recorded_by else "System"
-    recorded_by_name.short_description = 'Recorded By'
\ No newline at end of file
+    recorded_by_name.short_description = 'Recorded By'
+
+@admin.register(DailyAttendanceSummary)
+class DailyAttendanceSummaryAdmin(admin.ModelAdmin):
+    list_display = ('date', 'class_ref', 'present', 'absent', 'late', 'excused')
+    list_filter = ('class_ref',)
+    date_hierarchy = 'date'
+    ordering = ('-date', 'class_ref')
+    readonly_fields = ('date', 'class_ref', 'present', 'absent', 'late', 'excused')
@@ -0,0 +1,46 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from attendance.models import DailyAttendanceSummary
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily attendance rollup from the raw attendance records"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start-date',
+            type=str,
+            default=None,
+            help='Only rebuild from this date (format: YYYY-MM-DD)'
+        )
+        parser.add_argument(
+            '--end-date',
+            type=str,
+            default=None,
+            help='Only rebuild up to this date (format: YYYY-MM-DD)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rollup rows written per insert (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        start_date = self.parse_date(options['start_date'])
+        end_date = self.parse_date(options['end_date'])
+
+        created = DailyAttendanceSummary.objects.rebuild(
+            start_date=start_date,
+            end_date=end_date,
+            batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt {created} daily attendance summaries."))
+
+    def parse_date(self, value):
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD")
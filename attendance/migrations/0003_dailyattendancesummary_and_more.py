@@ -0,0 +1,82 @@
+# Generated by Django 5.0.14 on 2026-10-17 17:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def populate_summaries(apps, schema_editor):
+    AttendanceRecord = apps.get_model("attendance", "AttendanceRecord")
+    DailyAttendanceSummary = apps.get_model("attendance", "DailyAttendanceSummary")
+    statuses = ["present", "absent", "late", "excused"]
+
+    rows = (
+        AttendanceRecord.objects
+        .values("date", "class_ref")
+        .annotate(**{status: Count("id", filter=Q(status=status)) for status in statuses})
+        .order_by()
+    )
+    DailyAttendanceSummary.objects.bulk_create(
+        [
+            DailyAttendanceSummary(
+                date=row["date"],
+                class_ref_id=row["class_ref"],
+                **{status: row[status] for status in statuses}
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0007_socialmedialink"),
+        ("attendance", "0002_alter_attendancerecord_recorded_by"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyAttendanceSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("present", models.PositiveIntegerField(default=0)),
+                ("absent", models.PositiveIntegerField(default=0)),
+                ("late", models.PositiveIntegerField(default=0)),
+                ("excused", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name_plural": "Daily attendance summaries",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="attendancerecord",
+            index=models.Index(
+                fields=["date", "class_ref"], name="attendance__date_18844e_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="dailyattendancesummary",
+            name="class_ref",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="attendance_summaries",
+                to="accounts.classes",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="dailyattendancesummary",
+            unique_together={("date", "class_ref")},
+        ),
+        migrations.RunPython(populate_summaries, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, Q
 from accounts.models import StudentProfile, TeacherProfile
 from accounts.models import Classes
 
@@ -23,6 +24,118 @@ class AttendanceRecord(models.Model):
 
     class Meta:
         unique_together = ("student", "date")  
+        indexes = [
+            models.Index(fields=["date", "class_ref"]),
+        ]
 
     def __str__(self):
         return f"{self.student.user.first_name} - {self.date} - {self.status}"
+
+
+STATUS_COUNTS = {
+    status: Count("id", filter=Q(status=status))
+    for status in AttendanceStatus.values
+}
+
+
+class DailyAttendanceSummaryManager(models.Manager):
+    def refresh(self, keys):
+        """
+        Recompute the rollup rows for the given (date, class_ref_id) keys from
+        the raw records: one grouped aggregate, one upsert and, for keys with
+        no records left, one delete.
+        """
+        date_field = AttendanceRecord._meta.get_field("date")
+        keys = {(date_field.to_python(date), class_id) for date, class_id in keys}
+        if not keys:
+            return
+
+        counts = (
+            AttendanceRecord.objects
+            .filter(
+                date__in={date for date, _ in keys},
+                class_ref_id__in={class_id for _, class_id in keys},
+            )
+            .values("date", "class_ref")
+            .annotate(**STATUS_COUNTS)
+            .order_by()
+        )
+        summaries = [
+            self.model(
+                date=row["date"],
+                class_ref_id=row["class_ref"],
+                **{status: row[status] for status in AttendanceStatus.values}
+            )
+            for row in counts
+            if (row["date"], row["class_ref"]) in keys
+        ]
+        if summaries:
+            self.bulk_create(
+                summaries,
+                update_conflicts=True,
+                unique_fields=["date", "class_ref"],
+                update_fields=AttendanceStatus.values,
+            )
+
+        stale = keys - {(summary.date, summary.class_ref_id) for summary in summaries}
+        if stale:
+            condition = Q()
+            for date, class_id in stale:
+                condition |= Q(date=date, class_ref_id=class_id)
+            self.filter(condition).delete()
+
+    def rebuild(self, start_date=None, end_date=None, batch_size=1000):
+        """Recompute the whole rollup (or a date range of it) from the raw records."""
+        records = AttendanceRecord.objects.all()
+        summaries = self.all()
+        if start_date:
+            records = records.filter(date__gte=start_date)
+            summaries = summaries.filter(date__gte=start_date)
+        if end_date:
+            records = records.filter(date__lte=end_date)
+            summaries = summaries.filter(date__lte=end_date)
+
+        counts = (
+            records
+            .values("date", "class_ref")
+            .annotate(**STATUS_COUNTS)
+            .order_by()
+        )
+
+        created = 0
+        with transaction.atomic():
+            summaries.delete()
+            batch = []
+            for row in counts.iterator(chunk_size=batch_size):
+                batch.append(self.model(
+                    date=row["date"],
+                    class_ref_id=row["class_ref"],
+                    **{status: row[status] for status in AttendanceStatus.values}
+                ))
+                if len(batch) >= batch_size:
+                    self.bulk_create(batch)
+                    created += len(batch)
+                    batch = []
+            if batch:
+                self.bulk_create(batch)
+                created += len(batch)
+        return created
+
+
+class DailyAttendanceSummary(models.Model):
+    """Per-class daily status counts, kept in step with AttendanceRecord by signals."""
+    date = models.DateField()
+    class_ref = models.ForeignKey(Classes, on_delete=models.CASCADE, related_name="attendance_summaries")
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    late = models.PositiveIntegerField(default=0)
+    excused = models.PositiveIntegerField(default=0)
+
+    objects = DailyAttendanceSummaryManager()
+
+    class Meta:
+        unique_together = ("date", "class_ref")
+        verbose_name_plural = "Daily attendance summaries"
+
+    def __str__(self):
+        return f"{self.class_ref} - {self.date}"
@@ -1,7 +1,10 @@
 from rest_framework import serializers
-from .models import AttendanceRecord, AttendanceStatus
+from django.db import transaction
+from .models import AttendanceRecord, AttendanceStatus, DailyAttendanceSummary
 from accounts.serializers import StudentProfileSerializer, TeacherProfileSerializer
 from accounts.serializers import ClassesReadSerializer
+from accounts.models import Classes, StudentProfile
+from assessment.reportcards import bump_records_version
 
 class AttendanceRecordSerializer(serializers.ModelSerializer):
     student = StudentProfileSerializer(read_only=True)
@@ -21,4 +24,73 @@ class AttendanceRecordSerializer(serializers.ModelSerializer):
 class AttendanceCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = AttendanceRecord
-        fields = ['student', 'class_ref', 'date', 'status']
\ No newline at end of file
+        fields = ['student', 'class_ref', 'date', 'status']
+
+class AttendanceBulkEntrySerializer(serializers.Serializer):
+    student = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=AttendanceStatus.choices, default=AttendanceStatus.PRESENT)
+
+class AttendanceBulkSerializer(serializers.Serializer):
+    """Validates a whole class register (one class, one day) in a fixed number of queries."""
+    class_ref = serializers.PrimaryKeyRelatedField(queryset=Classes.objects.all())
+    date = serializers.DateField()
+    records = AttendanceBulkEntrySerializer(many=True, allow_empty=False)
+
+    def validate_records(self, value):
+        student_ids = [entry['student'] for entry in value]
+        if len(student_ids) != len(set(student_ids)):
+            raise serializers.ValidationError("Each student can only appear once per register.")
+
+        found = set(
+            StudentProfile.objects.filter(id__in=student_ids).order_by().values_list('id', flat=True)
+        )
+        missing = [student_id for student_id in student_ids if student_id not in found]
+        if missing:
+            raise serializers.ValidationError(
+                f"Students with IDs {missing} do not exist."
+            )
+        return value
+
+    def create(self, validated_data):
+        class_ref = validated_data['class_ref']
+        date = validated_data['date']
+        recorded_by = validated_data.get('recorded_by')
+
+        records = [
+            AttendanceRecord(
+                student_id=entry['student'],
+                class_ref=class_ref,
+                date=date,
+                status=entry['status'],
+                recorded_by=recorded_by,
+            )
+            for entry in validated_data['records']
+        ]
+
+        with transaction.atomic():
+            # bulk_create skips the model signals, so the daily rollup is
+            # refreshed here, including any class a student was moved out of.
+            previous_classes = set(
+                AttendanceRecord.objects
+                .filter(date=date, student_id__in=[record.student_id for record in records])
+                .exclude(class_ref=class_ref)
+                .order_by()
+                .values_list('class_ref_id', flat=True)
+                .distinct()
+            )
+            # A register re-posted by someone without a teacher profile keeps
+            # the teacher who first took it.
+            update_fields = ['class_ref', 'status']
+            if recorded_by is not None:
+                update_fields.append('recorded_by')
+            records = AttendanceRecord.objects.bulk_create(
+                records,
+                update_conflicts=True,
+                unique_fields=['student', 'date'],
+                update_fields=update_fields,
+            )
+            DailyAttendanceSummary.objects.refresh(
+                {(date, class_id) for class_id in previous_classes | {class_ref.id}}
+            )
+            bump_records_version(record.student_id for record in records)
+        return records
@@ -0,0 +1,40 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from assessment.reportcards import bump_records_version
+from .models import AttendanceRecord, DailyAttendanceSummary
+
+
+@receiver(pre_save, sender=AttendanceRecord)
+def remember_previous_summary_key(sender, instance, raw=False, **kwargs):
+    # An edit can move a record to another day or class, so the rollup row
+    # it used to count towards has to be refreshed as well.
+    instance._previous_summary_key = None
+    instance._previous_student_id = None
+    if instance.pk and not raw:
+        previous = (
+            AttendanceRecord.objects
+            .filter(pk=instance.pk)
+            .values_list("date", "class_ref_id", "student_id")
+            .first()
+        )
+        if previous:
+            instance._previous_summary_key = previous[:2]
+            instance._previous_student_id = previous[2]
+
+
+@receiver(post_save, sender=AttendanceRecord)
+def refresh_summary_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    keys = {(instance.date, instance.class_ref_id)}
+    previous = getattr(instance, "_previous_summary_key", None)
+    if previous:
+        keys.add(previous)
+    DailyAttendanceSummary.objects.refresh(keys)
+    bump_records_version({instance.student_id, getattr(instance, "_previous_student_id", None)})
+
+
+@receiver(post_delete, sender=AttendanceRecord)
+def refresh_summary_on_delete(sender, instance, **kwargs):
+    DailyAttendanceSummary.objects.refresh({(instance.date, instance.class_ref_id)})
+    bump_records_version({instance.student_id})
@@ -1,3 +1,280 @@
+from datetime import date
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APIClient
+from accounts.models import User, StudentProfile, TeacherProfile, Classes
+from .models import AttendanceRecord, AttendanceStatus, DailyAttendanceSummary
 
-# Create your tests here.
+
+class AttendanceTestMixin:
+    def setUp(self):
+        self.client = APIClient()
+
+        self.admin = User.objects.create_user(
+            email='admin@example.com',
+            password='adminpass123',
+            first_name='Ada',
+            last_name='Admin',
+            role='admin',
+            is_active=True,
+            is_verified=True
+        )
+        self.authenticate()
+
+        self.class_ref = Classes.objects.create(name='JSS 1')
+        self.students = [self.create_student(i) for i in range(5)]
+
+    def authenticate(self):
+        # Fresh instance, so profile lookups cached on the user object by an
+        # earlier request are counted again.
+        self.client.force_authenticate(user=User.objects.get(pk=self.admin.pk))
+
+    def create_student(self, index):
+        user = User.objects.create_user(
+            email=f'student{index}@example.com',
+            password='studentpass123',
+            first_name=f'Student{index}',
+            last_name='Pupil',
+            role='student',
+            is_active=True,
+            is_verified=True
+        )
+        return StudentProfile.objects.create(user=user, class_level=self.class_ref.name)
+
+
+class AttendanceBulkTest(AttendanceTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('attendance-bulk')
+
+    def register(self, statuses):
+        return {
+            'class_ref': self.class_ref.id,
+            'date': '2025-01-06',
+            'records': [
+                {'student': student.id, 'status': student_status}
+                for student, student_status in zip(self.students, statuses)
+            ]
+        }
+
+    def test_bulk_creates_register(self):
+        response = self.client.post(self.url, self.register([AttendanceStatus.PRESENT] * 5), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(AttendanceRecord.objects.filter(class_ref=self.class_ref).count(), 5)
+
+    def test_bulk_upserts_existing_records(self):
+        self.client.post(self.url, self.register([AttendanceStatus.PRESENT] * 5), format='json')
+        response = self.client.post(self.url, self.register([AttendanceStatus.ABSENT] * 5), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(AttendanceRecord.objects.count(), 5)
+        self.assertEqual(AttendanceRecord.objects.filter(status=AttendanceStatus.ABSENT).count(), 5)
+
+    def test_repost_without_teacher_profile_keeps_recorded_by(self):
+        teacher = TeacherProfile.objects.create(user=User.objects.create_user(
+            email='teacher@example.com', password='teacherpass123', role='teacher', is_active=True, is_verified=True
+        ))
+        AttendanceRecord.objects.bulk_create([
+            AttendanceRecord(student=student, class_ref=self.class_ref, date='2025-01-06', recorded_by=teacher)
+            for student in self.students
+        ])
+
+        self.client.post(self.url, self.register([AttendanceStatus.LATE] * 5), format='json')
+
+        self.assertEqual(AttendanceRecord.objects.filter(recorded_by=teacher, status=AttendanceStatus.LATE).count(), 5)
+
+    def test_bulk_rejects_unknown_student(self):
+        payload = self.register([AttendanceStatus.PRESENT] * 5)
+        payload['records'].append({'student': 99999, 'status': AttendanceStatus.PRESENT})
+
+        response = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(AttendanceRecord.objects.exists())
+
+    def test_bulk_rejects_duplicate_student(self):
+        payload = self.register([AttendanceStatus.PRESENT] * 5)
+        payload['records'].append({'student': self.students[0].id, 'status': AttendanceStatus.LATE})
+
+        response = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_query_count_is_independent_of_class_size(self):
+        payload = self.register([AttendanceStatus.PRESENT] * 2)
+        self.authenticate()
+        with self.assertNumQueries(10):
+            self.client.post(self.url, payload, format='json')
+
+        payload = self.register([AttendanceStatus.LATE] * 5)
+        self.authenticate()
+        with self.assertNumQueries(10):
+            self.client.post(self.url, payload, format='json')
+
+
+class AttendanceCompactViewTest(AttendanceTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('attendance-list') + '?view=compact'
+
+    def create_records(self, students, date):
+        AttendanceRecord.objects.bulk_create([
+            AttendanceRecord(student=student, class_ref=self.class_ref, date=date)
+            for student in students
+        ])
+
+    def test_compact_rows_are_flat(self):
+        self.create_records(self.students[:1], '2025-01-06')
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        row = response.data[0]
+        self.assertEqual(row['student'], self.students[0].id)
+        self.assertEqual(row['student_name'], 'Student0 Pupil')
+        self.assertEqual(row['class_ref'], self.class_ref.id)
+        self.assertEqual(row['class_name'], 'JSS 1')
+        self.assertEqual(row['status'], AttendanceStatus.PRESENT)
+
+    def test_compact_query_count_is_constant(self):
+        self.create_records(self.students[:1], '2025-01-06')
+        self.authenticate()
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 1)
+
+        self.create_records(self.students, '2025-01-07')
+        self.authenticate()
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 6)
+
+    def test_compact_rows_support_cursor_pagination(self):
+        self.create_records(self.students, '2025-01-06')
+
+        response = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 3})
+
+        self.assertEqual(len(response.data['results']), 3)
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_cursor_is_a_keyset_on_date_and_id(self):
+        # A whole register shares one date, so the cursor must also key on id.
+        self.create_records(self.students, '2025-01-06')
+        self.create_records(self.students[:2], '2025-01-07')
+        expected = list(AttendanceRecord.objects.order_by('-date', 'id').values_list('id', flat=True))
+
+        seen, pages = [], []
+        url = self.url + '&pagination=cursor&page_size=2'
+        with CaptureQueriesContext(connection) as queries:
+            while url:
+                response = self.client.get(url)
+                pages.append(response.data)
+                seen += [row['id'] for row in response.data['results']]
+                url = response.data['next']
+
+        self.assertEqual(seen, expected)
+        self.assertFalse([q for q in queries.captured_queries if 'OFFSET' in q['sql']])
+
+        previous = self.client.get(pages[-1]['previous'])
+        self.assertEqual([row['id'] for row in previous.data['results']], expected[4:6])
+
+
+class DailyAttendanceSummaryTest(AttendanceTestMixin, TestCase):
+    def summary(self, day):
+        return DailyAttendanceSummary.objects.get(date=day, class_ref=self.class_ref)
+
+    def test_rollup_follows_record_changes(self):
+        day = date(2025, 1, 6)
+        record = AttendanceRecord.objects.create(student=self.students[0], class_ref=self.class_ref, date=day)
+        AttendanceRecord.objects.create(
+            student=self.students[1], class_ref=self.class_ref, date=day, status=AttendanceStatus.LATE
+        )
+        self.assertEqual((self.summary(day).present, self.summary(day).late), (1, 1))
+
+        record.status = AttendanceStatus.ABSENT
+        record.save()
+        self.assertEqual((self.summary(day).present, self.summary(day).absent), (0, 1))
+
+        other_class = Classes.objects.create(name='JSS 2')
+        record.class_ref = other_class
+        record.save()
+        self.assertEqual(self.summary(day).absent, 0)
+        self.assertEqual(DailyAttendanceSummary.objects.get(date=day, class_ref=other_class).absent, 1)
+
+        AttendanceRecord.objects.filter(class_ref=self.class_ref).delete()
+        self.assertFalse(DailyAttendanceSummary.objects.filter(class_ref=self.class_ref).exists())
+
+    def test_bulk_register_updates_rollup(self):
+        payload = {
+            'class_ref': self.class_ref.id,
+            'date': '2025-01-06',
+            'records': [
+                {'student': student.id, 'status': AttendanceStatus.PRESENT} for student in self.students[:3]
+            ] + [
+                {'student': student.id, 'status': AttendanceStatus.EXCUSED} for student in self.students[3:]
+            ]
+        }
+        self.client.post(reverse('attendance-bulk'), payload, format='json')
+
+        summary = self.summary(date(2025, 1, 6))
+        self.assertEqual((summary.present, summary.excused), (3, 2))
+
+    def test_weekly_summary_reads_rollup(self):
+        today = now().date()
+        for student in self.students:
+            AttendanceRecord.objects.create(student=student, class_ref=self.class_ref, date=today)
+
+        self.authenticate()
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('weekly_attendance_summary'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [
+            {'date': today, 'present': 5, 'absent': 0, 'late': 0, 'excused': 0}
+        ])
+
+    def test_monthly_and_term_summaries(self):
+        AttendanceRecord.objects.create(student=self.students[0], class_ref=self.class_ref, date=date(2025, 1, 6))
+        AttendanceRecord.objects.create(
+            student=self.students[0], class_ref=self.class_ref, date=date(2025, 2, 3),
+            status=AttendanceStatus.ABSENT
+        )
+
+        response = self.client.get(reverse('monthly_attendance_summary'), {'year': 2025})
+        self.assertEqual([row['month'] for row in response.data], ['2025-01', '2025-02'])
+        self.assertEqual(response.data[1]['absent'], 1)
+
+        response = self.client.get(
+            reverse('term_attendance_summary'), {'start_date': '2025-01-01', 'end_date': '2025-03-31'}
+        )
+        self.assertEqual(response.data['classes'], [{
+            'class_ref': self.class_ref.id, 'class_name': 'JSS 1', 'school_days': 2,
+            'present': 1, 'absent': 1, 'late': 0, 'excused': 0
+        }])
+
+    def test_term_summary_rejects_impossible_dates(self):
+        for params in ({'start_date': '2025-02-30', 'end_date': '2025-03-31'}, {'start_date': '2025-01-01'}):
+            response = self.client.get(reverse('term_attendance_summary'), params)
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(response.data, {'error': 'start_date and end_date (YYYY-MM-DD) are required'})
+
+    def test_rebuild_command_recomputes_rollup(self):
+        day = date(2025, 1, 6)
+        AttendanceRecord.objects.bulk_create([
+            AttendanceRecord(student=student, class_ref=self.class_ref, date=day) for student in self.students
+        ])
+        self.assertFalse(DailyAttendanceSummary.objects.exists())
+
+        call_command('rebuild_attendance_summary', stdout=StringIO())
+
+        self.assertEqual(self.summary(day).present, 5)
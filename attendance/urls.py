@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import AttendanceViewSet
-from .views import weekly_attendance_summary
+from .views import weekly_attendance_summary, monthly_attendance_summary, term_attendance_summary
 
 router = DefaultRouter()
 router.register(r'records', AttendanceViewSet, basename='attendance')
@@ -9,4 +9,6 @@ router.register(r'records', AttendanceViewSet, basename='attendance')
 urlpatterns = [
     path('', include(router.urls)),
     path('weekly-summary/', weekly_attendance_summary, name='weekly_attendance_summary'),
+    path('monthly-summary/', monthly_attendance_summary, name='monthly_attendance_summary'),
+    path('term-summary/', term_attendance_summary, name='term_attendance_summary'),
 ]
\ No newline at end of file
@@ -1,15 +1,29 @@
-from rest_framework import viewsets
+from rest_framework import viewsets, status
 from django.db.models import Q
 from .models import AttendanceRecord
-from .serializers import AttendanceRecordSerializer, AttendanceCreateSerializer
+from .serializers import AttendanceRecordSerializer, AttendanceCreateSerializer, AttendanceBulkSerializer
 from accounts.permissions import IsAdminOrReadOnly
-from rest_framework.decorators import api_view, permission_classes
+from core.pagination import CursorOptInPagination
+from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.db.models import Count, Q
+from django.db.models import Count, Q, F, Value, Sum
+from django.db.models.functions import Concat, TruncMonth
+from django.utils.dateparse import parse_date
 from django.utils.timezone import now, timedelta
 
-from .models import AttendanceRecord, AttendanceStatus
+from .models import AttendanceRecord, AttendanceStatus, DailyAttendanceSummary
+
+STATUS_TOTALS = {status: Sum(status) for status in AttendanceStatus.values}
+
+
+def summary_queryset(request):
+    summaries = DailyAttendanceSummary.objects.all()
+    class_id = request.query_params.get('class_id')
+    if class_id:
+        summaries = summaries.filter(class_ref_id=class_id)
+    return summaries
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -18,13 +32,10 @@ def weekly_attendance_summary(request):
     start_date = today - timedelta(days=6) 
 
     records = (
-        AttendanceRecord.objects
+        summary_queryset(request)
         .filter(date__range=[start_date, today])
         .values('date')
-        .annotate(
-            present_count=Count('id', filter=Q(status=AttendanceStatus.PRESENT)),
-            absent_count=Count('id', filter=Q(status=AttendanceStatus.ABSENT))
-        )
+        .annotate(**STATUS_TOTALS)
         .order_by('date')
     )
 
@@ -32,28 +43,110 @@ def weekly_attendance_summary(request):
     data = [
         {
             'date': r['date'],
-            'present': r['present_count'],
-            'absent': r['absent_count']
+            'present': r['present'],
+            'absent': r['absent'],
+            'late': r['late'],
+            'excused': r['excused']
         }
         for r in records
     ]
     return Response(data)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def monthly_attendance_summary(request):
+    year = request.query_params.get('year', now().year)
+    try:
+        year = int(year)
+    except (TypeError, ValueError):
+        return Response({'error': 'year must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+
+    records = (
+        summary_queryset(request)
+        .filter(date__year=year)
+        .annotate(month=TruncMonth('date'))
+        .values('month')
+        .annotate(**STATUS_TOTALS)
+        .order_by('month')
+    )
+
+    data = [
+        {
+            'month': r['month'].strftime('%Y-%m'),
+            'present': r['present'],
+            'absent': r['absent'],
+            'late': r['late'],
+            'excused': r['excused']
+        }
+        for r in records
+    ]
+    return Response(data)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def term_attendance_summary(request):
+    try:
+        start_date = parse_date(request.query_params.get('start_date') or '')
+        end_date = parse_date(request.query_params.get('end_date') or '')
+    except ValueError:
+        # Well formed but impossible, e.g. 2025-02-30.
+        start_date = end_date = None
+    if not start_date or not end_date:
+        return Response(
+            {'error': 'start_date and end_date (YYYY-MM-DD) are required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    records = (
+        summary_queryset(request)
+        .filter(date__range=[start_date, end_date])
+        .values('class_ref', class_name=F('class_ref__name'))
+        .annotate(school_days=Count('date', distinct=True), **STATUS_TOTALS)
+        .order_by('class_name')
+    )
+
+    data = [
+        {
+            'class_ref': r['class_ref'],
+            'class_name': r['class_name'],
+            'school_days': r['school_days'],
+            'present': r['present'],
+            'absent': r['absent'],
+            'late': r['late'],
+            'excused': r['excused']
+        }
+        for r in records
+    ]
+    return Response({'start_date': start_date, 'end_date': end_date, 'classes': data})
+
 class SomeViewSet(viewsets.ModelViewSet):
    permission_classes = [IsAdminOrReadOnly]
 queryset = AttendanceRecord.objects.all()
 
 
+class AttendancePagination(CursorOptInPagination):
+    # Attendance lists have never been paginated by default; page numbers
+    # only apply when ?page_size= is passed.
+    page_size = None
+    cursor_ordering = ('-date', 'id')
+
 class AttendanceViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAdminOrReadOnly]
+    pagination_class = AttendancePagination
     
     def get_serializer_class(self):
+        if self.action == 'bulk':
+            return AttendanceBulkSerializer
         if self.action in ['create', 'update', 'partial_update']:
             return AttendanceCreateSerializer
         return AttendanceRecordSerializer
 
     def get_queryset(self):
-        queryset = AttendanceRecord.objects.all()
+        queryset = AttendanceRecord.objects.all().select_related(
+            'student__user',
+            'class_ref__teacher__user',
+            'recorded_by__user'
+        )
         
         
         start_date = self.request.query_params.get('start_date')
@@ -75,8 +168,56 @@ class AttendanceViewSet(viewsets.ModelViewSet):
             
         return queryset.order_by('-date')
 
+    def get_compact_queryset(self, queryset):
+        """Flat rows for ?view=compact, projected in the same query as the filter"""
+        return queryset.values(
+            'id',
+            'date',
+            'status',
+            'student',
+            'class_ref',
+            student_name=Concat(
+                'student__user__first_name', Value(' '), 'student__user__last_name'
+            ),
+            class_name=F('class_ref__name'),
+        )
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        compact = request.query_params.get('view') == 'compact'
+        if compact:
+            queryset = self.get_compact_queryset(queryset)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            if compact:
+                return self.get_paginated_response(page)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        if compact:
+            return Response(list(queryset))
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
     def perform_create(self, serializer):
         if hasattr(self.request.user, 'teacher_profile'):
             serializer.save(recorded_by=self.request.user.teacher_profile)
         else:
-            serializer.save()
\ No newline at end of file
+            serializer.save()
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Record a whole class register for one day in a single upsert"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+
+        return Response(
+            {
+                'class_ref': serializer.validated_data['class_ref'].id,
+                'date': serializer.validated_data['date'],
+                'count': len(serializer.validated_data['records']),
+            },
+            status=status.HTTP_201_CREATED
+        )
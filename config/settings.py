@@ -10,34 +10,55 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 LOG_DIR = os.path.join(BASE_DIR, "logs")
 os.makedirs(LOG_DIR, exist_ok=True)
 
+# Records are formatted on the request thread and written by a background
+# thread (core.log_handlers.BackgroundLogHandler) to stdout, where gunicorn,
+# Docker and Cloud Run collect them and take care of retention. LOG_FILE adds
+# a file rotated at LOG_MAX_BYTES, for single-process setups only (e.g.
+# logs/app.log under runserver): processes sharing one file would rotate it
+# under each other. DEBUG records of the loggers in LOG_DEBUG_SAMPLING are
+# thinned out to the given share.
+LOG_FILE = config("LOG_FILE", default="")
+LOG_LEVEL = config("LOG_LEVEL", default="DEBUG")
+LOG_MAX_BYTES = config("LOG_MAX_BYTES", default=10 * 1024 * 1024, cast=int)
+LOG_BACKUP_COUNT = config("LOG_BACKUP_COUNT", default=5, cast=int)
+LOG_DEBUG_SAMPLING = {
+    "accounts": 0.1,
+    "faker": 0,
+    "PIL": 0,
+}
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "formatters": {
         "standard": {"format": "%(asctime)s [%(levelname)s] %(name)s: %(message)s"},
     },
-    "handlers": {
-        "console": {
-            "class": "logging.StreamHandler",
-            "formatter": "standard",
-            "level": "DEBUG",
+    "filters": {
+        "sample_debug": {
+            "()": "core.log_handlers.DebugSampler",
+            "rates": LOG_DEBUG_SAMPLING,
         },
-        "file": {
-            "class": "logging.FileHandler",
-            "filename": os.path.join(LOG_DIR, "app.log"),
+    },
+    "handlers": {
+        "background": {
+            "()": "core.log_handlers.BackgroundLogHandler",
+            "filename": LOG_FILE,
+            "max_bytes": LOG_MAX_BYTES,
+            "backup_count": LOG_BACKUP_COUNT,
             "formatter": "standard",
+            "filters": ["sample_debug"],
             "level": "DEBUG",
         },
     },
     "loggers": {
     
         "": {
-            "handlers": ["console", "file"],
-            "level": "DEBUG",
+            "handlers": ["background"],
+            "level": LOG_LEVEL,
         },
         
         "django": {
-            "handlers": ["console", "file"],
+            "handlers": ["background"],
             "level": "INFO",
             "propagate": False,
         },
@@ -101,6 +122,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.ServerTimingMiddleware",
+    "core.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     'corsheaders.middleware.CorsMiddleware',
@@ -140,6 +163,39 @@ DATABASES = {
     )
 }
 
+# Cache (LocMemCache is per-process; point CACHE_BACKEND/CACHE_LOCATION at a
+# shared backend such as Redis or memcached when running several workers).
+# With LocMemCache, entries that other processes invalidate live at most
+# core.caching.LOCAL_CACHE_MAX_TIMEOUT seconds.
+# Authenticated users are only cached in a shared cache; with LocMemCache
+# every request loads its user from the database.
+CACHES = {
+    "default": {
+        "BACKEND": config("CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": config("CACHE_LOCATION", default="school-management"),
+    }
+}
+
+# Server-Timing header with total, view, DB, serializer and cache figures per
+# request; SERVER_TIMING_LOG also logs them as one JSON line ("core.timing").
+# Off by default: the header tells every client how many queries a request
+# ran and how long they took. Switch it on while profiling.
+SERVER_TIMING = config("SERVER_TIMING", default=False, cast=bool)
+SERVER_TIMING_LOG = config("SERVER_TIMING_LOG", default=False, cast=bool)
+
+# Per-URL-name request counts and latency histograms, served to admins in
+# Prometheus format at /api/metrics/. Each gunicorn worker writes its totals
+# to METRICS_DIR, which belongs to this deployment alone: the workers of one
+# server share it, and `manage.py clear_metrics` empties it before the
+# server starts (see start.sh in the Dockerfile). Leave it empty to report
+# the current process only.
+METRICS = config("METRICS", default=True, cast=bool)
+METRICS_DIR = config("METRICS_DIR", default=os.path.join(BASE_DIR, "metrics"))
+METRICS_FLUSH_INTERVAL = config("METRICS_FLUSH_INTERVAL", default=5, cast=float)
+
+# Points METRICS_DIR at a temporary directory for the test run.
+TEST_RUNNER = "core.test_runner.TestRunner"
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -202,7 +258,7 @@ AUTH_USER_MODEL = 'accounts.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -243,12 +299,16 @@ AUTHENTICATION_BACKENDS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',  
+        'accounts.authentication.CachedJWTAuthentication',  
         'rest_framework.authentication.SessionAuthentication',       
         'rest_framework.authentication.TokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated', 
-    ]
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
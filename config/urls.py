@@ -23,6 +23,8 @@ urlpatterns = [
     path('api/attendance/', include('attendance.urls')),
     path('api/events/', include('events.urls')),
     path('api/social-media/', include('accounts.social_urls')),
+    path('api/exports/', include('core.urls')),
+    path('api/metrics/', include('core.metrics_urls')),
     
 
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
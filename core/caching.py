@@ -0,0 +1,18 @@
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+# How long an entry may live in a process-local cache. Every gunicorn
+# worker and Cloud Run instance has a cache of its own, and deleting a key
+# there only reaches the process that made the change; the others go on
+# serving their copy until it expires.
+LOCAL_CACHE_MAX_TIMEOUT = 30
+
+
+def cache_is_shared():
+    """Whether the default cache is seen by every process (Redis, Memcached, the database)."""
+    return not isinstance(caches['default'], LocMemCache)
+
+
+def shared_cache_timeout(timeout):
+    """`timeout`, capped at LOCAL_CACHE_MAX_TIMEOUT when the cache is process-local."""
+    return timeout if cache_is_shared() else min(timeout, LOCAL_CACHE_MAX_TIMEOUT)
@@ -0,0 +1,102 @@
+import hashlib
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.response import Response
+from .timing import measure_serialization
+
+
+def make_etag(*parts):
+    """Weak ETag over cheap stand-ins for a response: ids, timestamps, counts."""
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"'
+
+
+def timestamp(value):
+    return int(value.timestamp()) if value is not None else None
+
+
+def add_validators(response, etag=None, last_modified=None):
+    if etag:
+        response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(timestamp(last_modified))
+    # Responses depend on who is asking, and clients must revalidate.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def not_modified(request, etag=None, last_modified=None):
+    """
+    A 304 response carrying the validators when the client's copy matches
+    (or 412 for a failed If-Match), otherwise None. Call it before doing the
+    expensive part of building the response.
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp(last_modified))
+    if response is not None:
+        add_validators(response, etag, last_modified)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for a viewset's list and retrieve actions.
+
+    The validators come from conditional_fields, the auto_now timestamps the
+    serialized data depends on (lookups such as "user__last_updated" reach
+    into nested objects). A list is validated with one aggregate query, the
+    newest of each timestamp plus the row count of the filtered queryset,
+    so a poll that matches returns 304 before anything is serialized. The
+    count catches deletions, which leave the timestamps untouched, and is
+    kept as row_count for the paginator so the page costs no extra COUNT.
+    Viewsets that build their list differently override list_response.
+    """
+    conditional_fields = ('updated_at',)
+    row_count = None
+
+    def list_validators(self, request, queryset):
+        latest = {f'latest_{index}': Max(field) for index, field in enumerate(self.conditional_fields)}
+        values = queryset.order_by().aggregate(rows=Count('pk'), **latest)
+        self.row_count = values['rows']
+        timestamps = [values[name] for name in latest]
+        etag = make_etag('list', request.get_full_path(), request.user.pk, values['rows'], *timestamps)
+        return etag, max(filter(None, timestamps), default=None)
+
+    def object_validators(self, request, instance):
+        timestamps = []
+        for field in self.conditional_fields:
+            value = instance
+            for name in field.split('__'):
+                value = getattr(value, name, None)
+            timestamps.append(value)
+        etag = make_etag('detail', request.get_full_path(), request.user.pk, instance.pk, *timestamps)
+        return etag, max(filter(None, timestamps), default=None)
+
+    def list_response(self, request, queryset):
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            with measure_serialization():
+                data = self.get_serializer(page, many=True).data
+            return self.get_paginated_response(data)
+
+        with measure_serialization():
+            data = self.get_serializer(queryset, many=True).data
+        return Response(data)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        etag, last_modified = self.list_validators(request, queryset)
+        cached = not_modified(request, etag, last_modified)
+        if cached is not None:
+            return cached
+        return add_validators(self.list_response(request, queryset), etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = self.object_validators(request, instance)
+        cached = not_modified(request, etag, last_modified)
+        if cached is not None:
+            return cached
+        with measure_serialization():
+            data = self.get_serializer(instance).data
+        return add_validators(Response(data), etag, last_modified)
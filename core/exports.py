@@ -0,0 +1,165 @@
+import csv
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_CHUNK_SIZE = 2000
+
+# export name -> model, (column, lookup) pairs, and the lookups each filter
+# applies to: "class" matches a class name, "date" a date range and
+# "academic_year" the student's academic year.
+EXPORTS = {
+    'students': {
+        'model': 'accounts.StudentProfile',
+        'columns': [
+            ('id', 'id'),
+            ('admission_number', 'admission_number'),
+            ('email', 'user__email'),
+            ('first_name', 'user__first_name'),
+            ('last_name', 'user__last_name'),
+            ('class_level', 'class_level'),
+            ('academic_year', 'academic_year'),
+            ('gender', 'gender'),
+            ('birth_date', 'birth_date'),
+            ('parent_name', 'parent_name'),
+            ('parent_contact', 'parent_contact'),
+            ('is_onboarded', 'is_onboarded'),
+            ('created_at', 'created_at'),
+        ],
+        'class': 'class_level',
+        'date': 'created_at__date',
+        'academic_year': 'academic_year',
+    },
+    'results': {
+        'model': 'assessment.Result',
+        'columns': [
+            ('id', 'id'),
+            ('admission_number', 'student__admission_number'),
+            ('student_first_name', 'student__user__first_name'),
+            ('student_last_name', 'student__user__last_name'),
+            ('class_level', 'student__class_level'),
+            ('exam', 'exam__title'),
+            ('assignment', 'assignment__title'),
+            ('subject', 'exam__subject__name'),
+            ('assignment_subject', 'assignment__subject__name'),
+            ('score', 'score'),
+            ('graded_on', 'graded_on'),
+        ],
+        'class': 'student__class_level',
+        'date': 'graded_on__date',
+        'academic_year': 'student__academic_year',
+    },
+    'attendance': {
+        'model': 'attendance.AttendanceRecord',
+        'columns': [
+            ('id', 'id'),
+            ('date', 'date'),
+            ('admission_number', 'student__admission_number'),
+            ('student_first_name', 'student__user__first_name'),
+            ('student_last_name', 'student__user__last_name'),
+            ('class_name', 'class_ref__name'),
+            ('status', 'status'),
+            ('recorded_by', 'recorded_by__user__email'),
+        ],
+        'class': 'class_ref__name',
+        'date': 'date',
+        'academic_year': 'student__academic_year',
+    },
+    'event-participants': {
+        'model': 'events.EventParticipant',
+        'columns': [
+            ('id', 'id'),
+            ('event', 'event__title'),
+            ('event_date', 'event__date'),
+            ('student_admission_number', 'student__admission_number'),
+            ('student_email', 'student__user__email'),
+            ('teacher_email', 'teacher__user__email'),
+            ('parent_email', 'parent__user__email'),
+            ('class_level', 'student__class_level'),
+            ('registered_at', 'registered_at'),
+        ],
+        'class': 'student__class_level',
+        'date': 'event__date__date',
+        'academic_year': 'student__academic_year',
+    },
+}
+
+
+class ExportError(Exception):
+    pass
+
+
+def export_rows(name, class_name=None, start_date=None, end_date=None, academic_year=None):
+    """
+    The export's rows as a values_list queryset in primary key order, with
+    the given filters applied. Nothing is fetched until it is iterated.
+    """
+    if name not in EXPORTS:
+        raise ExportError(f"Unknown export '{name}'. Choose one of: {', '.join(EXPORTS)}.")
+
+    spec = EXPORTS[name]
+    filters = {}
+    if class_name:
+        filters[spec['class']] = class_name
+    if start_date:
+        filters[f"{spec['date']}__gte"] = start_date
+    if end_date:
+        filters[f"{spec['date']}__lte"] = end_date
+    if academic_year:
+        filters[spec['academic_year']] = academic_year
+
+    lookups = [lookup for _, lookup in spec['columns']]
+    return apps.get_model(spec['model']).objects.filter(**filters).order_by('pk').values_list(*lookups)
+
+
+def export_header(name):
+    return [column for column, _ in EXPORTS[name]['columns']]
+
+
+class Echo:
+    """File-like object whose write() returns the line instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(name, rows, chunk_size=EXPORT_CHUNK_SIZE):
+    writer = csv.writer(Echo())
+    yield writer.writerow(export_header(name))
+    # One string per chunk keeps the per-row generator overhead out of the response.
+    lines = []
+    for row in rows.iterator(chunk_size=chunk_size):
+        lines.append(writer.writerow(row))
+        if len(lines) >= chunk_size:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+def stream_ndjson(name, rows, chunk_size=EXPORT_CHUNK_SIZE):
+    header = export_header(name)
+    encoder = DjangoJSONEncoder()
+    lines = []
+    for row in rows.iterator(chunk_size=chunk_size):
+        lines.append(encoder.encode(dict(zip(header, row))) + '\n')
+        if len(lines) >= chunk_size:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+# format -> (content type, file extension, writer)
+FORMATS = {
+    'csv': ('text/csv', 'csv', stream_csv),
+    'ndjson': ('application/x-ndjson', 'ndjson', stream_ndjson),
+}
+
+
+def stream_export(name, output='csv', chunk_size=EXPORT_CHUNK_SIZE, **filters):
+    """Return (content type, file name, iterator of text chunks) for an export."""
+    if output not in FORMATS:
+        raise ExportError(f"Unknown format '{output}'. Choose one of: {', '.join(FORMATS)}.")
+    content_type, extension, writer = FORMATS[output]
+    rows = export_rows(name, **filters)
+    return content_type, f"{name}.{extension}", writer(name, rows, chunk_size)
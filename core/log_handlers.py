@@ -0,0 +1,115 @@
+import logging
+import os
+import queue
+import sys
+import weakref
+from itertools import count
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Every live BackgroundLogHandler, restarted in the child after a fork.
+# Reconfiguring logging makes new handlers; the hook is registered once.
+handlers = weakref.WeakSet()
+
+
+def restart_handlers():
+    for handler in list(handlers):
+        handler.restart()
+
+
+os.register_at_fork(after_in_child=restart_handlers)
+
+
+class BackgroundLogHandler(QueueHandler):
+    """
+    Format records on the calling thread and write them to the console and a
+    size-rotated file on a background thread, so requests never wait on the
+    disk. Configured as a LOGGING handler with "()": the formatter, level and
+    filters set there apply here; the target handlers just write the line.
+
+    Several processes rotating one shared file would rename it under each
+    other and lose lines, so a file is for single-process setups. "{pid}"
+    in `filename` gives every process, including workers forked after
+    logging was configured, a file of its own; nothing deletes the files of
+    processes that have exited.
+    """
+
+    def __init__(self, filename=None, max_bytes=10 * 1024 * 1024, backup_count=5, console=True):
+        super().__init__(queue.SimpleQueue())
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.console = logging.StreamHandler(sys.stdout) if console else None
+        self.targets = []
+        self.listener = None
+        self.start()
+        # Threads do not survive fork(); a worker forked after logging was
+        # configured gets a listener of its own (see restart_handlers).
+        handlers.add(self)
+
+    def open_targets(self):
+        targets = [self.console] if self.console else []
+        if self.filename:
+            targets.append(RotatingFileHandler(
+                self.filename.format(pid=os.getpid()),
+                maxBytes=self.max_bytes, backupCount=self.backup_count, encoding='utf-8', delay=True,
+            ))
+        return targets
+
+    def start(self):
+        self.targets = self.open_targets()
+        self.queue = queue.SimpleQueue()
+        self.listener = QueueListener(self.queue, *self.targets)
+        self.listener.start()
+
+    def restart(self):
+        if self.listener is not None:
+            # The parent's file stays the parent's; every target writes
+            # (and flushes) whole records, so nothing is left buffered here.
+            for target in self.targets:
+                if target is not self.console:
+                    target.close()
+            self.start()
+
+    def close(self):
+        # Called by logging.shutdown() at exit: write out what is queued first.
+        handlers.discard(self)
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+            for target in self.targets:
+                target.close()
+        super().close()
+
+
+class DebugSampler(logging.Filter):
+    """
+    Keep a fraction of the DEBUG records of chatty loggers. `rates` maps a
+    logger name (which covers its children) to the share to keep: 0.1 keeps
+    every tenth record, 0 drops them all. The most specific name wins and
+    unlisted loggers keep everything. INFO and above always pass.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = rates or {}
+        self.counters = {}
+
+    def rate_for(self, name):
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition('.')[0]
+        return self.rates.get('', 1.0)
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        rate = self.rate_for(record.name)
+        if rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+        # Deterministic 1-in-N: keep the record whenever the running total of
+        # `rate` passes a whole number.
+        seen = next(self.counters.setdefault(record.name, count()))
+        return int((seen + 1) * rate) > int(seen * rate)
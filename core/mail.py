@@ -0,0 +1,107 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F
+from django.utils import timezone
+from .models import OutboxEmail, OutboxEmailStatus
+
+MAIL_BATCH_SIZE = 100
+MAIL_MAX_ATTEMPTS = 6
+# Retry after 1, 2, 4, 8... minutes, but never wait more than an hour.
+MAIL_RETRY_BASE = timedelta(minutes=1)
+MAIL_RETRY_MAX = timedelta(hours=1)
+# A claimed message is skipped by other workers for this long; if the
+# worker dies mid-batch the message simply becomes due again.
+MAIL_CLAIM_LEASE = timedelta(minutes=5)
+
+
+def queue_mail(subject, message, from_email, recipient_list):
+    """
+    Drop-in for send_mail() that writes to the outbox instead of talking to
+    SMTP. Call it inside the transaction that creates the token or record
+    the email is about.
+    """
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(recipient_list),
+    )
+
+
+def retry_delay(attempts):
+    return min(MAIL_RETRY_BASE * 2 ** max(attempts - 1, 0), MAIL_RETRY_MAX)
+
+
+def open_connection(connection):
+    # If the server is unreachable every send in the batch fails on its own
+    # and is retried with the real error, so there is nothing to do here.
+    try:
+        connection.open()
+    except Exception:
+        pass
+
+
+def claim_due_mail(limit=MAIL_BATCH_SIZE):
+    """
+    Lease up to `limit` due messages to this worker and return them. Each
+    is claimed with a conditional UPDATE, so workers never send the same
+    message twice.
+    """
+    now = timezone.now()
+    due = OutboxEmail.objects.filter(status=OutboxEmailStatus.PENDING, next_attempt_at__lte=now)
+    claimed = []
+    for message_id in due.order_by('next_attempt_at', 'id').values_list('id', flat=True)[:limit]:
+        if due.filter(pk=message_id).update(next_attempt_at=now + MAIL_CLAIM_LEASE, attempts=F('attempts') + 1):
+            claimed.append(message_id)
+    return list(OutboxEmail.objects.filter(pk__in=claimed).order_by('id'))
+
+
+def send_batch(messages, connection, max_attempts=MAIL_MAX_ATTEMPTS):
+    """
+    Send the claimed messages over one open connection and record the
+    outcome: sent, due again after a backoff, or failed for good once
+    max_attempts is used up. Returns (sent, failed) counts.
+    """
+    now = timezone.now()
+    sent = []
+    retried = []
+    for message in messages:
+        email = EmailMessage(message.subject, message.body, message.from_email, message.to, connection=connection)
+        try:
+            email.send()
+        except Exception as e:
+            message.last_error = str(e) or e.__class__.__name__
+            if message.attempts >= max_attempts:
+                message.status = OutboxEmailStatus.FAILED
+            else:
+                message.next_attempt_at = now + retry_delay(message.attempts)
+            retried.append(message)
+            # A failed command can leave the SMTP session unusable.
+            connection.close()
+            open_connection(connection)
+        else:
+            sent.append(message.pk)
+
+    if sent:
+        OutboxEmail.objects.filter(pk__in=sent).update(status=OutboxEmailStatus.SENT, sent_at=now, last_error='')
+    if retried:
+        OutboxEmail.objects.bulk_update(retried, ['status', 'next_attempt_at', 'last_error'])
+    return len(sent), len(retried)
+
+
+def send_queued_mail(batch_size=MAIL_BATCH_SIZE, max_attempts=MAIL_MAX_ATTEMPTS):
+    """Send everything that is due, one batch per connection; returns (sent, failed)."""
+    sent = failed = 0
+    while True:
+        messages = claim_due_mail(batch_size)
+        if not messages:
+            return sent, failed
+        connection = get_connection(fail_silently=False)
+        open_connection(connection)
+        try:
+            batch_sent, batch_failed = send_batch(messages, connection, max_attempts)
+        finally:
+            connection.close()
+        sent += batch_sent
+        failed += batch_failed
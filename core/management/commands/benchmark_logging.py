@@ -0,0 +1,116 @@
+import logging
+import os
+import statistics
+import tempfile
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.log_handlers import BackgroundLogHandler, DebugSampler
+
+LOGGER = 'benchmark_logging'
+FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+SIGNUP = {'email': 'ada@example.com', 'password': 'adapass123', 'first_name': 'Ada', 'role': 'student'}
+TOKEN = '4f1c2a9e8b7d6c5e4f3a2b1c0d9e8f7a'
+
+# The log calls of one signup through UserViewSet, before and after the
+# request data and tokens were taken out of them.
+BEFORE = [
+    ('accounts.views', logging.DEBUG, "get_permissions called for action=%s", ('create',)),
+    ('accounts.views', logging.DEBUG, "AllowAny permission returned for action=%s", ('create',)),
+    ('accounts.views', logging.INFO, "UserViewSet.create called", ()),
+    ('accounts.views', logging.DEBUG, "Request data: %s", (SIGNUP,)),
+    ('accounts.views', logging.DEBUG, "Serializer valid", ()),
+    ('accounts.views', logging.INFO, "User created via serializer.save() email=%s id=%s", (SIGNUP['email'], 1)),
+    ('accounts.views', logging.INFO, "Verification token generated for %s: %s", (SIGNUP['email'], TOKEN)),
+    ('accounts.views', logging.DEBUG, "Verification token for %s: %s", (SIGNUP['email'], TOKEN)),
+    ('accounts.views', logging.DEBUG, "Queueing verification email for %s", (SIGNUP['email'],)),
+    ('django.request', logging.INFO, "POST /api/accounts/users/ 201", ()),
+]
+AFTER = [
+    *BEFORE[:3],
+    *BEFORE[4:6],
+    ('accounts.views', logging.INFO, "Verification token generated for %s", (SIGNUP['email'],)),
+    *BEFORE[8:],
+]
+
+
+class Command(BaseCommand):
+    help = "Measure the time a request spends logging, with the old synchronous handlers and the background ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=5000,
+            help='Simulated signup requests per setup (default: 5000)'
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError("--requests must be at least 1")
+
+        # Console output goes to /dev/null in both setups so the terminal's
+        # speed does not decide the result; the log files are real.
+        with tempfile.TemporaryDirectory() as directory, open(os.devnull, 'w') as devnull:
+            before = self.run(self.synchronous_handlers(directory, devnull), BEFORE, options['requests'])
+            after = self.run(self.background_handlers(directory, devnull), AFTER, options['requests'])
+
+        self.stdout.write(f"{'setup':<12} {'calls/req':>9} {'mean µs':>9} {'p95 µs':>9} {'drain ms':>9}")
+        for name, calls, (timings, drain) in (('before', len(BEFORE), before), ('after', len(AFTER), after)):
+            self.stdout.write(
+                f"{name:<12} {calls:>9} {statistics.mean(timings):>9.1f} "
+                f"{self.p95(timings):>9.1f} {drain:>9.1f}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Logging costs each request {statistics.mean(after[0]):.1f} µs instead of "
+            f"{statistics.mean(before[0]):.1f} µs; the background thread's file writes are in 'drain'."
+        ))
+
+    def p95(self, timings):
+        return statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+
+    def synchronous_handlers(self, directory, devnull):
+        # What config/settings.py used to install: console and file, both
+        # written on the request thread, no rotation and no sampling.
+        formatter = logging.Formatter(FORMAT)
+        handlers = [logging.StreamHandler(devnull), logging.FileHandler(os.path.join(directory, 'before.log'))]
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        return handlers
+
+    def background_handlers(self, directory, devnull):
+        handler = BackgroundLogHandler(
+            os.path.join(directory, 'after.log'),
+            max_bytes=settings.LOG_MAX_BYTES,
+            backup_count=settings.LOG_BACKUP_COUNT,
+        )
+        handler.targets[0].setStream(devnull)
+        handler.setFormatter(logging.Formatter(FORMAT))
+        handler.addFilter(DebugSampler({
+            f'{LOGGER}.{name}': rate for name, rate in settings.LOG_DEBUG_SAMPLING.items()
+        }))
+        return [handler]
+
+    def run(self, handlers, calls, requests):
+        """Per-request logging time in µs, and the ms spent draining what the background thread had left."""
+        root = logging.getLogger(LOGGER)
+        root.setLevel(logging.DEBUG)
+        root.propagate = False
+        for handler in handlers:
+            root.addHandler(handler)
+        loggers = [(logging.getLogger(f'{LOGGER}.{name}'), level, message, args) for name, level, message, args in calls]
+
+        timings = []
+        try:
+            for _ in range(requests):
+                started = time.perf_counter()
+                for logger, level, message, args in loggers:
+                    logger.log(level, message, *args)
+                timings.append((time.perf_counter() - started) * 1_000_000)
+        finally:
+            started = time.perf_counter()
+            for handler in handlers:
+                root.removeHandler(handler)
+                handler.close()
+            drain = (time.perf_counter() - started) * 1000
+        return timings, drain
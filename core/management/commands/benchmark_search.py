@@ -0,0 +1,64 @@
+import time
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from core.search import SEARCH_FIELDS, search, search_backend, icontains_search
+
+
+class Command(BaseCommand):
+    help = "Compare the full-text search backend with the original icontains search"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'terms',
+            nargs='+',
+            help='Search strings to time, e.g. "math" "sports day"'
+        )
+        parser.add_argument(
+            '--model',
+            action='append',
+            choices=sorted(SEARCH_FIELDS),
+            help='Searchable model to benchmark (default: all of them)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Number of timed runs per search (default: 20)'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=10,
+            help='Rows fetched per search, like one page of results (default: 10)'
+        )
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError("--repeat must be at least 1")
+
+        backend = search_backend()
+        self.stdout.write(f"Full-text backend: {backend}")
+        if backend == 'icontains':
+            self.stdout.write(self.style.WARNING("No full-text index on this database; both columns use icontains."))
+
+        self.stdout.write(f"{'model':<28} {'term':<16} {'rows':>6} {'icontains ms':>13} {'fulltext ms':>12} {'speedup':>8}")
+        for label in options['model'] or SEARCH_FIELDS:
+            queryset = apps.get_model(label).objects.order_by('-pk')
+            for term in options['terms']:
+                baseline, rows = self.time_search(lambda: icontains_search(queryset, term), options)
+                fulltext, _ = self.time_search(lambda: search(queryset, term), options)
+                speedup = baseline / fulltext if fulltext else float('inf')
+                self.stdout.write(
+                    f"{label:<28} {term:<16} {rows:>6} {baseline:>13.2f} {fulltext:>12.2f} {speedup:>7.1f}x"
+                )
+
+    def time_search(self, build_queryset, options):
+        limit = options['limit']
+        rows = build_queryset().count()
+        list(build_queryset()[:limit])
+
+        started = time.perf_counter()
+        for _ in range(options['repeat']):
+            list(build_queryset()[:limit])
+        elapsed = (time.perf_counter() - started) * 1000 / options['repeat']
+        return elapsed, rows
@@ -0,0 +1,11 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.metrics import registry
+
+
+class Command(BaseCommand):
+    help = "Delete the per-worker request metrics in METRICS_DIR; run it before starting the server"
+
+    def handle(self, *args, **options):
+        cleared = registry.clear()
+        self.stdout.write(self.style.SUCCESS(f"✅ Cleared {cleared} metrics files from {settings.METRICS_DIR or '(unset)'}."))
@@ -0,0 +1,56 @@
+import sys
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from core.exports import EXPORTS, FORMATS, EXPORT_CHUNK_SIZE, ExportError, stream_export
+
+
+class Command(BaseCommand):
+    help = "Stream a full table (students, results, attendance, event participants) as CSV or NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', choices=sorted(EXPORTS), help='Table to export')
+        parser.add_argument(
+            '--format',
+            choices=sorted(FORMATS),
+            default='csv',
+            help='Output format (default: csv)'
+        )
+        parser.add_argument('--output', help='File to write (default: stdout)')
+        parser.add_argument('--class', dest='class_name', help='Only rows for this class name')
+        parser.add_argument('--start-date', type=date.fromisoformat, help='Only rows on or after YYYY-MM-DD')
+        parser.add_argument('--end-date', type=date.fromisoformat, help='Only rows on or before YYYY-MM-DD')
+        parser.add_argument('--academic-year', help='Only rows for students in this academic year, e.g. 2024/2025')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help=f'Rows fetched from the database per round trip (default: {EXPORT_CHUNK_SIZE})'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be at least 1")
+
+        try:
+            _, _, chunks = stream_export(
+                options['name'],
+                options['format'],
+                chunk_size=options['chunk_size'],
+                class_name=options['class_name'],
+                start_date=options['start_date'],
+                end_date=options['end_date'],
+                academic_year=options['academic_year'],
+            )
+        except ExportError as e:
+            raise CommandError(str(e))
+
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as file:
+                for chunk in chunks:
+                    file.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"✅ Exported {options['name']} to {options['output']}"))
+        else:
+            # Bypass OutputWrapper, which would add a newline after every chunk.
+            out = getattr(self.stdout, '_out', sys.stdout)
+            for chunk in chunks:
+                out.write(chunk)
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from core.models import SearchDocument
+from core.search import searchable_models, index_objects
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search documents used by the ?search= parameter"
+
+    def handle(self, *args, **options):
+        for model in searchable_models():
+            label = model._meta.label_lower
+            SearchDocument.objects.filter(model=label).delete()
+            indexed = index_objects(model)
+            self.stdout.write(f"🔎 Indexed {indexed} {label} rows")
+
+        self.stdout.write(self.style.SUCCESS("✅ Search index rebuilt."))
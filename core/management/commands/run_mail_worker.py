@@ -0,0 +1,44 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from core.mail import send_queued_mail, MAIL_BATCH_SIZE, MAIL_MAX_ATTEMPTS
+
+
+class Command(BaseCommand):
+    help = "Send queued emails from the outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=MAIL_BATCH_SIZE,
+            help=f'Emails sent over one connection (default: {MAIL_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=MAIL_MAX_ATTEMPTS,
+            help=f'Attempts before an email is marked failed (default: {MAIL_MAX_ATTEMPTS})'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5,
+            help='Seconds to wait before checking the outbox again (default: 5)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once nothing is due instead of polling'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['max_attempts'] < 1:
+            raise CommandError("--batch-size and --max-attempts must be at least 1")
+
+        while True:
+            sent, failed = send_queued_mail(options['batch_size'], options['max_attempts'])
+            if sent or failed:
+                self.stdout.write(self.style.SUCCESS(f"✅ Sent {sent} emails ({failed} failed attempts)."))
+            if options['once']:
+                return
+            time.sleep(options['poll_interval'])
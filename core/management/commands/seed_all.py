@@ -1,5 +1,7 @@
+import time
 from django.core.management import call_command
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from core.seeding import ScaleSeeder
 
 class Command(BaseCommand):
     help = "Seed all apps in correct dependency order"
@@ -16,8 +18,34 @@ class Command(BaseCommand):
             action='store_true',
             help='Clear existing data before seeding'
         )
+        parser.add_argument(
+            '--scale',
+            type=int,
+            help='Build a load-testing dataset with this many students using bulk inserts'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=180,
+            help='Days of attendance to generate in --scale mode (default: 180)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed for --scale mode; the same seed gives the same data (default: 42)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows per bulk insert in --scale mode (default: 5000)'
+        )
 
     def handle(self, *args, **options):
+        if options['scale'] is not None:
+            return self.seed_scale(options)
+
         # 1. Accounts (base data)
         call_command('seed', count=options['count'], clear=options['clear'])
         
@@ -32,13 +60,51 @@ class Command(BaseCommand):
         
         # 5. Events (needs all user types)
         call_command('seed_events', count=options['count'], clear=options['clear'])
-        
+
+    def seed_scale(self, options):
+        if options['scale'] < 1 or options['batch_size'] < 1 or options['days'] < 0:
+            raise CommandError("--scale and --batch-size must be at least 1 and --days cannot be negative")
+
+        if options['clear']:
+            call_command('flush', interactive=False, verbosity=0)
+            self.stdout.write(self.style.SUCCESS("✅ Cleared all data."))
+        elif ScaleSeeder.existing_seed():
+            raise CommandError("A scale dataset already exists; rerun with --clear to replace it.")
+
+        self.started = time.perf_counter()
+        self.last_label = None
+        ScaleSeeder(
+            options['scale'],
+            days=options['days'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            report=self.report,
+        ).run()
+        self.end_line()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Seeded {options['scale']} students in {time.perf_counter() - self.started:.0f}s"
+        ))
+
+    def report(self, label, done, total):
+        # Rewrite one line per phase rather than printing every batch.
+        if label != self.last_label:
+            self.end_line()
+            self.last_label = label
+        progress = f"{done:,}/{total:,}" if total else f"{done:,}"
+        self.stdout.write(f"\r   {label}: {progress} ({time.perf_counter() - self.started:.0f}s)", ending='')
+        self.stdout.flush()
+
+    def end_line(self):
+        if self.last_label is not None:
+            self.stdout.write('')
+
         
         
 # rm db.sqlite3
 # python manage.py makemigrations
 # python manage.py migrate
 # python manage.py seed_all --count 40 --clear
+# python manage.py seed_all --scale 100000 --days 365 --clear
 
 # python manage.py seed --count 20 --clear
 # python manage.py seed_assessment --count 10 --clear
@@ -0,0 +1,163 @@
+import glob
+import json
+import os
+import threading
+import time
+from time import monotonic
+from django.conf import settings
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implied.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_VIEW = 'unmatched'
+
+
+def status_class(status_code):
+    return f'{status_code // 100}xx'
+
+
+class MetricsRegistry:
+    """
+    Request counts and latency histograms per URL name, for this process.
+
+    Every worker writes its own totals to METRICS_DIR/<pid>-<start>.json,
+    at most every METRICS_FLUSH_INTERVAL seconds and whenever they are
+    scraped, and collect() adds up the files of all workers. The start time
+    in the name keeps a new worker that reuses a dead one's PID from
+    overwriting its totals. Files of workers that have exited are kept so
+    the totals never go backwards; clear the directory before the server
+    starts. With METRICS_DIR unset only this process is reported.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        self.started = time.time_ns()
+        # (view, method, status class) -> count
+        self.requests = {}
+        # (view, method) -> [count per bucket (with +Inf last), sum of seconds]
+        self.latency = {}
+        self.flushed_at = monotonic()
+
+    def check_fork(self):
+        # Called with the lock held. A worker forked from a process that had
+        # already counted requests starts from zero, under its own file name.
+        if self.pid != os.getpid():
+            self.reset()
+
+    def observe(self, view, method, status_code, seconds):
+        with self.lock:
+            self.check_fork()
+            key = (view, method, status_class(status_code))
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+            histogram = self.latency.get((view, method))
+            if histogram is None:
+                histogram = self.latency[(view, method)] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    break
+            else:
+                index = len(LATENCY_BUCKETS)
+            histogram[index] += 1
+            histogram[-1] += seconds
+
+            due = monotonic() - self.flushed_at >= settings.METRICS_FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def snapshot(self):
+        with self.lock:
+            self.check_fork()
+            return {
+                'requests': [[*key, count] for key, count in self.requests.items()],
+                'latency': [[*key, *histogram] for key, histogram in self.latency.items()],
+            }
+
+    def flush(self):
+        if not settings.METRICS_DIR:
+            return
+        self.flushed_at = monotonic()
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        snapshot = self.snapshot()
+        path = os.path.join(settings.METRICS_DIR, f'{self.pid}-{self.started}.json')
+        # Write then rename, so a scrape never reads a half-written file.
+        temporary = f'{path}.{threading.get_ident()}.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(temporary, path)
+
+    def clear(self):
+        """Delete every worker's file, e.g. before the server starts. Returns how many."""
+        if not settings.METRICS_DIR:
+            return 0
+        paths = glob.glob(os.path.join(settings.METRICS_DIR, '*.json'))
+        paths += glob.glob(os.path.join(settings.METRICS_DIR, '*.tmp'))
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        return len(paths)
+
+    def collect(self):
+        """Totals over every worker, in the snapshot() layout."""
+        if not settings.METRICS_DIR:
+            return self.snapshot()
+
+        self.flush()
+        requests, latency = {}, {}
+        for path in glob.glob(os.path.join(settings.METRICS_DIR, '*.json')):
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for *key, count in snapshot['requests']:
+                requests[tuple(key)] = requests.get(tuple(key), 0) + count
+            for view, method, *histogram in snapshot['latency']:
+                totals = latency.setdefault((view, method), [0] * len(histogram))
+                latency[(view, method)] = [total + value for total, value in zip(totals, histogram)]
+        return {
+            'requests': [[*key, count] for key, count in requests.items()],
+            'latency': [[*key, *histogram] for key, histogram in latency.items()],
+        }
+
+
+registry = MetricsRegistry()
+
+
+def label_value(value):
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def labels(**values):
+    return '{' + ','.join(f'{name}="{label_value(value)}"' for name, value in values.items()) + '}'
+
+
+def render_prometheus(snapshot):
+    """The Prometheus text exposition format (version 0.0.4) of a snapshot."""
+    lines = [
+        '# HELP http_requests_total Requests handled, by URL name, method and status class.',
+        '# TYPE http_requests_total counter',
+    ]
+    for view, method, status, count in sorted(snapshot['requests']):
+        lines.append(f'http_requests_total{labels(view=view, method=method, status=status)} {count}')
+
+    lines += [
+        '# HELP http_request_duration_seconds Time from the request reaching Django to the response leaving it.',
+        '# TYPE http_request_duration_seconds histogram',
+    ]
+    for view, method, *histogram in sorted(snapshot['latency']):
+        *buckets, total_seconds = histogram
+        cumulative = 0
+        for bound, count in zip([*map(str, LATENCY_BUCKETS), '+Inf'], buckets):
+            cumulative += count
+            lines.append(
+                f'http_request_duration_seconds_bucket{labels(view=view, method=method, le=bound)} {cumulative}'
+            )
+        lines.append(f'http_request_duration_seconds_sum{labels(view=view, method=method)} {total_seconds}')
+        lines.append(f'http_request_duration_seconds_count{labels(view=view, method=method)} {cumulative}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,81 @@
+import json
+import logging
+from time import perf_counter
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from .metrics import UNMATCHED_VIEW, registry
+from .timing import RequestTimings, current_timings
+
+logger = logging.getLogger('core.timing')
+
+
+class ServerTimingMiddleware:
+    """
+    Report where each request spent its time in a Server-Timing header:
+    total, view (the view plus rendering its response), DB time and query
+    count, serializer time and cache hits and misses. With
+    SERVER_TIMING_LOG the same numbers are logged as one JSON line.
+
+    Switched on and off with the SERVER_TIMING setting (off by default, as
+    every client sees the header). List it first in MIDDLEWARE so that
+    "total" covers the other middleware too.
+
+    The numbers stop when the response leaves the middleware. The body of a
+    StreamingHttpResponse (the data exports) is produced after that, so the
+    queries it runs while streaming are not counted.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.log = settings.SERVER_TIMING_LOG
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        request.timings = timings
+        token = current_timings.set(timings)
+        started = perf_counter()
+        try:
+            with connection.execute_wrapper(timings.execute_wrapper):
+                response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        finished = perf_counter()
+        timings.total = finished - started
+        if timings.view_started is not None:
+            timings.view = finished - timings.view_started
+
+        response['Server-Timing'] = timings.header()
+        if self.log:
+            logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                **timings.as_dict(),
+            }))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.timings.view_started = perf_counter()
+
+
+class MetricsMiddleware:
+    """
+    Count every request and its latency under the URL name it resolved to
+    (see core.metrics). Switched on and off with the METRICS setting.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = perf_counter()
+        response = self.get_response(request)
+        match = request.resolver_match
+        view = match.view_name if match else UNMATCHED_VIEW
+        registry.observe(view, request.method, response.status_code, perf_counter() - started)
+        return response
@@ -0,0 +1,104 @@
+from django.db import migrations
+
+FTS_TABLE = "core_searchdocument_fts"
+GIN_INDEX = "core_searchdoc_vector_gin"
+
+# Frozen copy of core.search.SEARCH_FIELDS at the time of this migration.
+SEARCH_FIELDS = {
+    "assessment.exam": ["title", "description", "subject__name"],
+    "assessment.assignment": ["title", "description", "subject__name"],
+    "assessment.result": [
+        "student__user__first_name",
+        "student__user__last_name",
+        "exam__title",
+        "assignment__title",
+    ],
+    "events.event": ["title", "description", "location"],
+    "announcements.announcement": ["title", "message"],
+}
+
+SQLITE_FTS_SQL = [
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    "document, content='core_searchdocument', content_rowid='id')",
+    f"CREATE TRIGGER core_searchdocument_ai AFTER INSERT ON core_searchdocument BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, document) VALUES (new.id, new.document); END",
+    f"CREATE TRIGGER core_searchdocument_ad AFTER DELETE ON core_searchdocument BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, document) VALUES ('delete', old.id, old.document); END",
+    f"CREATE TRIGGER core_searchdocument_au AFTER UPDATE ON core_searchdocument BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, document) VALUES ('delete', old.id, old.document); "
+    f"INSERT INTO {FTS_TABLE}(rowid, document) VALUES (new.id, new.document); END",
+]
+
+SQLITE_DROP_SQL = [
+    "DROP TRIGGER IF EXISTS core_searchdocument_ai",
+    "DROP TRIGGER IF EXISTS core_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS core_searchdocument_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def gin_index():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    return GinIndex(SearchVector("document", config="english"), name=GIN_INDEX)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.add_index(apps.get_model("core", "SearchDocument"), gin_index())
+    elif vendor == "sqlite":
+        with schema_editor.connection.cursor() as cursor:
+            try:
+                cursor.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+                cursor.execute("DROP TABLE temp.fts5_probe")
+            except Exception:
+                # SQLite built without FTS5: core.search falls back to icontains.
+                return
+            for statement in SQLITE_FTS_SQL:
+                cursor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.remove_index(apps.get_model("core", "SearchDocument"), gin_index())
+    elif vendor == "sqlite":
+        with schema_editor.connection.cursor() as cursor:
+            for statement in SQLITE_DROP_SQL:
+                cursor.execute(statement)
+
+
+def populate_documents(apps, schema_editor):
+    SearchDocument = apps.get_model("core", "SearchDocument")
+    for label, fields in SEARCH_FIELDS.items():
+        model = apps.get_model(label)
+        rows = model.objects.order_by().values_list("pk", *fields).iterator(chunk_size=500)
+        SearchDocument.objects.bulk_create(
+            (
+                SearchDocument(
+                    model=label,
+                    object_id=row[0],
+                    document=" ".join(str(value) for value in row[1:] if value),
+                )
+                for row in rows
+            ),
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+        ("accounts", "0007_socialmedialink"),
+        ("assessment", "0003_exam_description_exam_duration_minutes_exam_end_time_and_more"),
+        ("events", "0001_initial"),
+        ("announcements", "0002_announcement_target_parents_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(populate_documents, migrations.RunPython.noop),
+    ]
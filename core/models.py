@@ -1,3 +1,55 @@
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class SearchDocument(models.Model):
+    """
+    Flattened searchable text for one row of a searchable model (see
+    core.search). Postgres indexes it with a GIN index on its tsvector and
+    SQLite mirrors it into an FTS5 table; both are created by migration.
+    """
+    model = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    document = models.TextField(blank=True)
+
+    class Meta:
+        unique_together = ('model', 'object_id')
+
+    def __str__(self):
+        return f"{self.model}#{self.object_id}"
+
+
+class OutboxEmailStatus(models.TextChoices):
+    PENDING = "pending", "Pending"
+    SENT = "sent", "Sent"
+    FAILED = "failed", "Failed"
+
+
+class OutboxEmail(models.Model):
+    """
+    An email waiting to be sent by run_mail_worker (see core.mail). It is
+    written in the same transaction as whatever it announces, so a token
+    and its email are committed or rolled back together.
+    """
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True)
+    to = models.JSONField()
+    status = models.CharField(
+        max_length=10,
+        choices=OutboxEmailStatus.choices,
+        default=OutboxEmailStatus.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
@@ -0,0 +1,162 @@
+import json
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination, CursorPagination, Cursor, _reverse_ordering
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    CursorPagination keyed on every field of the ordering. DRF's own cursor
+    only remembers the first field and falls back to an OFFSET among rows
+    that share it; this one stores the whole tuple and continues with a
+    row comparison such as (date < d) OR (date = d AND id > i). The last
+    field must be unique and no field may be null.
+    """
+
+    def decode_position(self, position):
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def after(self, values, reverse):
+        """Rows that come after the position in the direction being read."""
+        condition = Q(pk__in=[])
+        equal = {}
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') != reverse else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+        position = self.cursor.position if self.cursor else None
+
+        queryset = queryset.order_by(*(_reverse_ordering(self.ordering) if reverse else self.ordering))
+        if position is not None:
+            queryset = queryset.filter(self.after(self.decode_position(position), reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > len(self.page)
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = self._get_position_from_instance(self.page[-1], self.ordering) if self.page else self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self._get_position_from_instance(self.page[0], self.ordering) if self.page else self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def _get_position_from_instance(self, instance, ordering):
+        names = [field.lstrip('-') for field in ordering]
+        if isinstance(instance, dict):
+            values = [instance[name] for name in names]
+        else:
+            values = [getattr(instance, name) for name in names]
+        return json.dumps([str(value) for value in values], separators=(',', ':'))
+
+
+class CursorOptInPagination(PageNumberPagination):
+    """
+    Page-number pagination by default, keyset (cursor) pagination on request.
+
+    Clients opt in with ?pagination=cursor and then follow the returned
+    next/previous links, which carry a ?cursor= token. Cursor pages avoid the
+    COUNT(*) and OFFSET scan, so deep pages cost the same as the first one.
+    Subclasses set cursor_ordering to the ordering of their list endpoint;
+    an ordering of several fields gets a keyset on all of them.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    pagination_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    cursor_ordering = '-id'
+    cursor_page_size = 10
+
+    cursor_paginator = None
+    known_count = None
+
+    def django_paginator_class(self, queryset, page_size):
+        paginator = DjangoPaginator(queryset, page_size)
+        if self.known_count is not None:
+            # Already counted by the view (see ConditionalGetMixin); skip the COUNT(*).
+            paginator.count = self.known_count
+        return paginator
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.pagination_query_param) == 'cursor'
+            or self.cursor_query_param in request.query_params
+        )
+
+    def get_cursor_paginator(self):
+        paginator = KeysetCursorPagination() if isinstance(self.cursor_ordering, (list, tuple)) else CursorPagination()
+        paginator.ordering = self.cursor_ordering
+        paginator.page_size = self.page_size or self.cursor_page_size
+        paginator.page_size_query_param = self.page_size_query_param
+        paginator.max_page_size = self.max_page_size
+        paginator.cursor_query_param = self.cursor_query_param
+        return paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.cursor_paginator = self.get_cursor_paginator()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+
+        self.cursor_paginator = None
+        self.known_count = getattr(view, 'row_count', None)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.extend([
+            {
+                'name': self.pagination_query_param,
+                'required': False,
+                'in': 'query',
+                'description': "Set to 'cursor' to use keyset pagination instead of page numbers.",
+                'schema': {'type': 'string', 'enum': ['cursor']},
+            },
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+        ])
+        return parameters
@@ -0,0 +1,15 @@
+from rest_framework.renderers import JSONRenderer
+from .timing import measure_serialization
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that counts encoding the response body as serializer time
+    in the Server-Timing header. Every API response goes through a renderer,
+    so function views and plain viewsets are measured as well as the
+    ConditionalGetMixin ones, which also time building the serializer data.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with measure_serialization():
+            return super().render(data, accepted_media_type, renderer_context)
@@ -0,0 +1,202 @@
+import re
+from functools import lru_cache
+from django.apps import apps
+from django.db import connection, OperationalError
+from django.db.models import Q, Case, When, Value, FloatField, OuterRef, Subquery
+from django.db.models.expressions import RawSQL
+from .models import SearchDocument
+
+# model label -> fields (own columns or related lookups) indexed for ?search=
+SEARCH_FIELDS = {
+    'assessment.exam': ['title', 'description', 'subject__name'],
+    'assessment.assignment': ['title', 'description', 'subject__name'],
+    'assessment.result': [
+        'student__user__first_name',
+        'student__user__last_name',
+        'exam__title',
+        'assignment__title',
+    ],
+    'events.event': ['title', 'description', 'location'],
+    'announcements.announcement': ['title', 'message'],
+}
+
+POSTGRES_SEARCH_CONFIG = 'english'
+FTS_TABLE = 'core_searchdocument_fts'
+# SQLite scores are carried back into the ORM as a CASE, so only the best
+# matches get one; the rest still match and sort after them with rank 0.
+FTS_RANKED_RESULTS = 100
+INDEX_BATCH_SIZE = 500
+
+
+def search_terms(text):
+    return [term.lower() for term in re.findall(r'\w+', text or '')]
+
+
+def build_documents(model, pks=None):
+    fields = SEARCH_FIELDS[model._meta.label_lower]
+    queryset = model.objects.all()
+    if pks is not None:
+        queryset = queryset.filter(pk__in=pks)
+
+    for row in queryset.order_by().values_list('pk', *fields).iterator(chunk_size=INDEX_BATCH_SIZE):
+        yield SearchDocument(
+            model=model._meta.label_lower,
+            object_id=row[0],
+            document=' '.join(str(value) for value in row[1:] if value),
+        )
+
+
+def index_objects(model, pks=None):
+    """Upsert the search documents for the given rows (all rows when pks is None)."""
+    indexed = 0
+    batch = []
+    for document in build_documents(model, pks):
+        batch.append(document)
+        if len(batch) >= INDEX_BATCH_SIZE:
+            indexed += write_documents(batch)
+            batch = []
+    if batch:
+        indexed += write_documents(batch)
+    return indexed
+
+
+def write_documents(documents):
+    SearchDocument.objects.bulk_create(
+        documents,
+        update_conflicts=True,
+        unique_fields=['model', 'object_id'],
+        update_fields=['document'],
+    )
+    return len(documents)
+
+
+def remove_objects(model, pks):
+    SearchDocument.objects.filter(model=model._meta.label_lower, object_id__in=pks).delete()
+
+
+def searchable_models():
+    return [apps.get_model(label) for label in SEARCH_FIELDS]
+
+
+def related_dependencies():
+    """
+    Yield (searchable model, related model, lookup to the related model, fields
+    read from it) for every related lookup in SEARCH_FIELDS, e.g.
+    (Result, User, 'student__user', {'first_name', 'last_name'}).
+    """
+    dependencies = {}
+    for model in searchable_models():
+        for field_path in SEARCH_FIELDS[model._meta.label_lower]:
+            *relations, leaf = field_path.split('__')
+            if not relations:
+                continue
+            related_model = model
+            for name in relations:
+                related_model = related_model._meta.get_field(name).related_model
+            key = (model, related_model, '__'.join(relations))
+            dependencies.setdefault(key, set()).add(leaf)
+
+    for (model, related_model, lookup), fields in dependencies.items():
+        yield model, related_model, lookup, fields
+
+
+@lru_cache(maxsize=None)
+def fts5_available():
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(f"SELECT 1 FROM {FTS_TABLE} LIMIT 1")
+        except OperationalError:
+            return False
+    return True
+
+
+def search_backend():
+    if connection.vendor == 'postgresql':
+        return 'postgres'
+    if connection.vendor == 'sqlite' and fts5_available():
+        return 'fts5'
+    return 'icontains'
+
+
+def icontains_search(queryset, text):
+    """The original substring search: an OR of icontains across the fields."""
+    condition = Q()
+    for field_path in SEARCH_FIELDS[queryset.model._meta.label_lower]:
+        condition |= Q(**{f'{field_path}__icontains': text})
+    return queryset.filter(condition)
+
+
+def postgres_search(queryset, terms):
+    from django.contrib.postgres.search import SearchVector, SearchQuery, SearchRank
+
+    vector = SearchVector('document', config=POSTGRES_SEARCH_CONFIG)
+    query = SearchQuery(
+        ' & '.join(f'{term}:*' for term in terms),
+        search_type='raw',
+        config=POSTGRES_SEARCH_CONFIG,
+    )
+    documents = (
+        SearchDocument.objects
+        .annotate(vector=vector)
+        .filter(model=queryset.model._meta.label_lower, vector=query)
+    )
+    rank = (
+        documents
+        .filter(object_id=OuterRef('pk'))
+        .annotate(rank=SearchRank(vector, query))
+        .values('rank')[:1]
+    )
+    return queryset.filter(pk__in=documents.values('object_id')).annotate(
+        search_rank=Subquery(rank, output_field=FloatField())
+    )
+
+
+def fts5_search(queryset, terms):
+    match = ' '.join(f'"{term}"*' for term in terms)
+    label = queryset.model._meta.label_lower
+    # CROSS JOIN pins the FTS table as the outer loop; left to itself SQLite
+    # may scan the documents and re-run the MATCH for every one of them.
+    matches = (
+        f"SELECT d.object_id FROM {FTS_TABLE} "
+        f"CROSS JOIN core_searchdocument d ON d.id = {FTS_TABLE}.rowid "
+        f"WHERE {FTS_TABLE} MATCH %s AND d.model = %s"
+    )
+    # Only score rows the caller's queryset can return, so the best matches
+    # are the best ones this user can actually see.
+    candidates, candidate_params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            matches.replace('SELECT d.object_id', f'SELECT d.object_id, -bm25({FTS_TABLE})')
+            + f" AND d.object_id IN ({candidates}) ORDER BY bm25({FTS_TABLE}) LIMIT %s",
+            [match, label, *candidate_params, FTS_RANKED_RESULTS],
+        )
+        ranks = cursor.fetchall()
+
+    if not ranks:
+        return queryset.none()
+    return queryset.filter(pk__in=RawSQL(matches, [match, label])).annotate(
+        search_rank=Case(
+            *[When(pk=pk, then=Value(rank)) for pk, rank in ranks],
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+    )
+
+
+def search(queryset, text):
+    """
+    Filter a queryset of a model in SEARCH_FIELDS by ?search= text, most
+    relevant first. Every word must match, as a prefix, somewhere in the row's
+    document. Falls back to icontains when no full-text index is available.
+    """
+    terms = search_terms(text)
+    backend = search_backend()
+    if not terms or backend == 'icontains':
+        return icontains_search(queryset, text)
+
+    ordering = queryset.query.order_by
+    if backend == 'postgres':
+        queryset = postgres_search(queryset, terms)
+    else:
+        queryset = fts5_search(queryset, terms)
+    return queryset.order_by('-search_rank', *ordering)
@@ -0,0 +1,310 @@
+import math
+import random
+from datetime import datetime, time, timedelta
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+from accounts.models import (
+    User, TeacherProfile, ParentProfile, StudentProfile,
+    Classes, Subject, AcademicYear, AdmissionSequence, Gender, UserRole
+)
+from accounts.stats import invalidate_user_counts
+from announcements.feeds import rebuild_feeds
+from announcements.models import Announcement
+from assessment.models import Grade, Exam, Assignment, Result
+from attendance.models import AttendanceRecord, AttendanceStatus, DailyAttendanceSummary
+from events.models import Event, EventParticipant
+from core.search import index_objects, searchable_models
+
+SEED_EMAIL_DOMAIN = 'seed.school'
+LEVELS = ["Primary 1", "Primary 2", "JSS 1", "JSS 2", "SSS 1"]
+SUBJECTS = ["Mathematics", "English", "Science", "History", "Geography"]
+GRADES = [("A", "Excellent"), ("B", "Good"), ("C", "Average"), ("D", "Below Average"), ("F", "Fail")]
+STATUS_WEIGHTS = [
+    (AttendanceStatus.PRESENT, 85),
+    (AttendanceStatus.ABSENT, 8),
+    (AttendanceStatus.LATE, 5),
+    (AttendanceStatus.EXCUSED, 2),
+]
+CLASS_SIZE = 40
+STUDENTS_PER_TEACHER = 25
+STUDENTS_PER_PARENT = 2
+ASSESSMENTS_PER_SUBJECT = 2
+NAME_POOL_SIZE = 500
+
+
+class ScaleSeeder:
+    """
+    Builds a load-testing dataset around `scale` students: classes of 40, a
+    teacher per 25 students, a parent per two, exams and assignments with a
+    result for every student, `days` of weekday attendance, announcements
+    and events. Everything is drawn from one seeded Random, so the same
+    arguments always produce the same data.
+
+    Rows are written with bulk_create in batches, every user of a role shares
+    one password hash, and progress is reported through `report(label, done,
+    total)` instead of per row. bulk_create skips signals, so the attendance
+    rollup, search index, user counts and announcement feeds are rebuilt once
+    at the end.
+    """
+
+    def __init__(self, scale, days=180, seed=42, batch_size=5000, report=None):
+        self.scale = scale
+        self.days = days
+        self.batch_size = batch_size
+        self.report = report or (lambda label, done, total: None)
+        self.random = random.Random(seed)
+        fake = Faker()
+        fake.seed_instance(seed)
+        self.first_names = [fake.first_name() for _ in range(NAME_POOL_SIZE)]
+        self.last_names = [fake.last_name() for _ in range(NAME_POOL_SIZE)]
+        self.words = [fake.word().title() for _ in range(NAME_POOL_SIZE)]
+
+        self.today = timezone.localdate()
+        self.start_date = self.today - timedelta(days=days)
+        self.passwords = {}
+
+    @classmethod
+    def existing_seed(cls):
+        return User.objects.filter(email__endswith=f'@{SEED_EMAIL_DOMAIN}').exists()
+
+    def run(self):
+        self.create_reference_data()
+        self.create_staff()
+        self.create_parents()
+        self.create_students()
+        self.create_assessments()
+        self.create_attendance()
+        self.create_announcements_and_events()
+        self.rebuild_derived_data()
+
+    # Helpers
+
+    def password(self, raw):
+        # One PBKDF2 run per role instead of one per user.
+        if raw not in self.passwords:
+            self.passwords[raw] = make_password(raw)
+        return self.passwords[raw]
+
+    def batches(self, items):
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def insert(self, label, model, objects, total):
+        done = 0
+        for batch in self.batches(objects):
+            model.objects.bulk_create(batch)
+            done += len(batch)
+            self.report(label, done, total)
+        return done
+
+    def user(self, role, index):
+        return User(
+            email=f'{role}{index}@{SEED_EMAIL_DOMAIN}',
+            first_name=self.random.choice(self.first_names),
+            last_name=self.random.choice(self.last_names),
+            role=role,
+            is_active=True,
+            is_verified=True,
+            password=self.password(f'{role}123'),
+        )
+
+    def insert_users(self, label, role, count, build_profile):
+        """Create `count` users of a role with their profiles; returns the profiles."""
+        profiles = []
+        done = 0
+        for indexes in self.batches(range(count)):
+            users = [self.user(role, index) for index in indexes]
+            batch = [build_profile(user, index) for user, index in zip(users, indexes)]
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+                if role == UserRole.STUDENT:
+                    AdmissionSequence.objects.assign(batch)
+                profiles.extend(type(batch[0]).objects.bulk_create(batch))
+            done += len(batch)
+            self.report(label, done, count)
+        return profiles
+
+    def gender(self):
+        return self.random.choice([Gender.MALE, Gender.FEMALE])
+
+    # Phases
+
+    def create_reference_data(self):
+        AcademicYear.objects.get_or_create(name="2023/2024", defaults={'current': False})
+        AcademicYear.objects.get_or_create(name="2024/2025", defaults={'current': True})
+        for name, description in GRADES:
+            Grade.objects.get_or_create(name=name, defaults={'description': description})
+        self.grades = list(Grade.objects.all())
+
+        class_count = max(1, math.ceil(self.scale / CLASS_SIZE))
+        streams = math.ceil(class_count / len(LEVELS))
+        names = [f"{level} - {stream + 1}" for level in LEVELS for stream in range(streams)][:class_count]
+        self.classes = Classes.objects.bulk_create([Classes(name=name) for name in names])
+        self.report("classes", len(self.classes), class_count)
+
+    def create_staff(self):
+        User.objects.create_superuser(
+            email=f"admin@{SEED_EMAIL_DOMAIN}",
+            password="admin123",
+            first_name="Admin",
+            last_name="User",
+        )
+
+        count = max(len(self.classes), math.ceil(self.scale / STUDENTS_PER_TEACHER))
+        self.teachers = self.insert_users("teachers", UserRole.TEACHER, count, lambda user, index: TeacherProfile(
+            user=user,
+            gender=self.gender(),
+            subject_specialization=SUBJECTS[index % len(SUBJECTS)],
+            hire_date=self.today - timedelta(days=self.random.randint(0, 5 * 365)),
+            is_principal=index == 0,
+        ))
+
+        for index, class_ref in enumerate(self.classes):
+            class_ref.teacher = self.teachers[index]
+        Classes.objects.bulk_update(self.classes, ['teacher'], batch_size=self.batch_size)
+
+        subjects = [
+            Subject(name=name, assigned_class=class_ref, teacher=self.random.choice(self.teachers))
+            for class_ref in self.classes for name in SUBJECTS
+        ]
+        self.insert("subjects", Subject, subjects, len(subjects))
+        self.subjects = list(Subject.objects.filter(assigned_class__in=self.classes).order_by('id'))
+
+    def create_parents(self):
+        count = max(1, math.ceil(self.scale / STUDENTS_PER_PARENT))
+        self.parents = self.insert_users("parents", UserRole.PARENT, count, lambda user, index: ParentProfile(
+            user=user,
+            gender=self.gender(),
+            occupation=self.random.choice(self.words),
+        ))
+
+    def create_students(self):
+        academic_year = AcademicYear.objects.get(current=True).name
+
+        def build(user, index):
+            parent = self.parents[index // STUDENTS_PER_PARENT]
+            profile = StudentProfile(
+                user=user,
+                gender=self.gender(),
+                class_level=self.classes[index // CLASS_SIZE].name,
+                academic_year=academic_year,
+                parent_name=parent.user.get_full_name(),
+            )
+            # bulk_create skips save(), which derives the flag from the
+            # onboarding fields; these students have not filled them in.
+            profile.is_onboarded = all(getattr(profile, field) for field in StudentProfile.ONBOARDING_FIELDS)
+            return profile
+
+        students = self.insert_users("students", UserRole.STUDENT, self.scale, build)
+        # (student id, class) pairs are all later phases need.
+        self.students = [(student.pk, self.classes[index // CLASS_SIZE]) for index, student in enumerate(students)]
+
+    def create_assessments(self):
+        exams = []
+        assignments = []
+        for subject in self.subjects:
+            for _ in range(ASSESSMENTS_PER_SUBJECT):
+                day = self.start_date + timedelta(days=self.random.randint(0, self.days))
+                exams.append(Exam(
+                    title=f"{subject.name} {self.random.choice(self.words)} Exam",
+                    subject=subject, teacher_id=subject.teacher_id, grade=self.random.choice(self.grades), exam_date=day,
+                ))
+                assignments.append(Assignment(
+                    title=f"{subject.name} {self.random.choice(self.words)} Assignment",
+                    description="Complete the exercises.",
+                    subject=subject, teacher_id=subject.teacher_id, grade=self.random.choice(self.grades), due_date=day,
+                ))
+        self.insert("exams", Exam, exams, len(exams))
+        self.insert("assignments", Assignment, assignments, len(assignments))
+
+        by_class = {}
+        for exam in exams:
+            by_class.setdefault(exam.subject.assigned_class_id, []).append(('exam', exam))
+        for assignment in assignments:
+            by_class.setdefault(assignment.subject.assigned_class_id, []).append(('assignment', assignment))
+
+        per_student = len(SUBJECTS) * ASSESSMENTS_PER_SUBJECT * 2
+        results = (
+            Result(student_id=student_id, score=round(self.random.uniform(40, 100), 2), **{kind: assessment})
+            for student_id, class_ref in self.students
+            for kind, assessment in by_class[class_ref.pk]
+        )
+        self.insert("results", Result, results, len(self.students) * per_student)
+
+    def school_days(self):
+        day = self.start_date
+        while day <= self.today:
+            if day.weekday() < 5:
+                yield day
+            day += timedelta(days=1)
+
+    def create_attendance(self):
+        statuses = [status for status, _ in STATUS_WEIGHTS]
+        weights = [weight for _, weight in STATUS_WEIGHTS]
+        days = list(self.school_days())
+        records = (
+            AttendanceRecord(
+                student_id=student_id, class_ref=class_ref, date=day, status=status,
+                recorded_by_id=class_ref.teacher_id,
+            )
+            for day in days
+            for (student_id, class_ref), status in zip(
+                self.students, self.random.choices(statuses, weights, k=len(self.students))
+            )
+        )
+        self.insert("attendance records", AttendanceRecord, records, len(days) * len(self.students))
+
+    def create_announcements_and_events(self):
+        now = timezone.now()
+        count = max(10, self.scale // 1000)
+        announcements = []
+        for _ in range(count):
+            start = now - timedelta(days=self.random.randint(0, 60))
+            announcements.append(Announcement(
+                title=f"{self.random.choice(self.words)} notice",
+                message="Please read this announcement.",
+                start_date=start,
+                end_date=start + timedelta(days=self.random.randint(7, 90)),
+                target_students=self.random.random() > 0.3,
+                target_teachers=self.random.random() > 0.5,
+                target_parents=self.random.random() > 0.5,
+            ))
+        self.insert("announcements", Announcement, announcements, count)
+
+        events = [
+            Event(
+                title=f"{self.random.choice(self.words)} Day",
+                description="School event.",
+                date=timezone.make_aware(datetime.combine(
+                    self.today + timedelta(days=self.random.randint(-30, 60)), time(10)
+                )),
+                location=self.random.choice(["Hall", "Field", "Library"]),
+            )
+            for _ in range(count)
+        ]
+        self.insert("events", Event, events, count)
+
+        participants = (
+            EventParticipant(event=self.random.choice(events), student_id=student_id)
+            for student_id, _ in self.students
+            if self.random.random() < 0.1
+        )
+        self.insert("event participants", EventParticipant, participants, None)
+
+    def rebuild_derived_data(self):
+        DailyAttendanceSummary.objects.rebuild(batch_size=self.batch_size)
+        self.report("attendance summaries", DailyAttendanceSummary.objects.count(), None)
+
+        for model in searchable_models():
+            self.report(f"{model._meta.verbose_name_plural} indexed", index_objects(model), None)
+
+        invalidate_user_counts()
+        rebuild_feeds()
@@ -0,0 +1,35 @@
+from functools import partial
+from django.db.models.signals import post_save, post_delete
+from .search import searchable_models, related_dependencies, index_objects, remove_objects
+
+
+def index_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_objects(sender, [instance.pk])
+
+
+def remove_on_delete(sender, instance, **kwargs):
+    remove_objects(sender, [instance.pk])
+
+
+def reindex_dependents(model, lookup, fields, sender, instance, raw=False, update_fields=None, **kwargs):
+    # e.g. a renamed Subject changes the documents of its exams and assignments
+    if raw or (update_fields is not None and not fields & set(update_fields)):
+        return
+    pks = list(model.objects.filter(**{lookup: instance}).values_list('pk', flat=True))
+    if pks:
+        index_objects(model, pks)
+
+
+def connect_search_signals():
+    for model in searchable_models():
+        post_save.connect(index_on_save, sender=model, dispatch_uid=f'search-index-{model._meta.label_lower}')
+        post_delete.connect(remove_on_delete, sender=model, dispatch_uid=f'search-remove-{model._meta.label_lower}')
+
+    for model, related_model, lookup, fields in related_dependencies():
+        post_save.connect(
+            partial(reindex_dependents, model, lookup, fields),
+            sender=related_model,
+            weak=False,
+            dispatch_uid=f'search-dependents-{model._meta.label_lower}-{lookup}',
+        )
@@ -0,0 +1,19 @@
+import tempfile
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Runs the suite with METRICS_DIR pointed at a throwaway directory, so
+    requests made by the tests never write into the deployment's metrics.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.metrics_dir = tempfile.TemporaryDirectory(prefix='metrics-')
+        settings.METRICS_DIR = self.metrics_dir.name
+
+    def teardown_test_environment(self, **kwargs):
+        self.metrics_dir.cleanup()
+        super().teardown_test_environment(**kwargs)
@@ -1,3 +1,752 @@
-from django.test import TestCase
+import json
+import logging
+import os
+import smtplib
+import tempfile
+from unittest import mock
+from datetime import date, timedelta
+from io import StringIO
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from accounts.authentication import PROFILE_RELATIONS
+from accounts.models import User, AdminProfile, TeacherProfile, StudentProfile, ParentProfile, Classes, Subject, Lesson
+from accounts.views import LessonViewSet
+from attendance.models import DailyAttendanceSummary
+from announcements.models import Announcement
+from assessment.models import Grade, Exam, Assignment, Result
+from attendance.models import AttendanceRecord, AttendanceStatus
+from events.models import Event, EventParticipant
+from .log_handlers import BackgroundLogHandler, DebugSampler, restart_handlers
+from .mail import queue_mail, send_queued_mail
+from .metrics import registry
+from .models import SearchDocument, OutboxEmail, OutboxEmailStatus
+from .search import search, search_backend, icontains_search
 
-# Create your tests here.
+
+class CursorOptInPaginationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='admin@example.com',
+            password='adminpass123',
+            first_name='Ada',
+            last_name='Admin',
+            role='admin',
+            is_active=True,
+            is_verified=True
+        )
+        # Loaded the way the JWT authentication loads it, with the profiles
+        # joined, so the counts below are the view's own queries.
+        self.client.force_authenticate(
+            user=User.objects.select_related(*PROFILE_RELATIONS).get(pk=self.user.pk)
+        )
+
+        Exam.objects.bulk_create([
+            Exam(title=f'Exam {i}', exam_date='2025-03-01') for i in range(15)
+        ])
+        self.url = reverse('exam-list')
+
+    def test_page_numbers_are_the_default(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 15)
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_cursor_pagination_is_opt_in(self):
+        response = self.client.get(self.url, {'pagination': 'cursor'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', response.data)
+        self.assertIn('cursor=', response.data['next'])
+        first_page = [exam['title'] for exam in response.data['results']]
+        self.assertEqual(first_page[0], 'Exam 14')
+        self.assertEqual(len(first_page), 10)
+
+        response = self.client.get(response.data['next'])
+
+        second_page = [exam['title'] for exam in response.data['results']]
+        self.assertEqual(len(second_page), 5)
+        self.assertEqual(second_page[-1], 'Exam 0')
+        self.assertIsNone(response.data['next'])
+
+    def test_cursor_pages_skip_count_query(self):
+        with self.assertNumQueries(2):
+            self.client.get(self.url, {'page_size': 5})
+        with self.assertNumQueries(1):
+            self.client.get(self.url, {'pagination': 'cursor', 'page_size': 5})
+
+
+class RoleScopingTest(TestCase):
+    """
+    List endpoints narrow their rows to the caller's role profile, reached
+    through the User.<role>_profile aliases.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = TeacherProfile.objects.create(user=cls.create_user('teacher@example.com', 'teacher'))
+        cls.other_teacher = TeacherProfile.objects.create(user=cls.create_user('other@example.com', 'teacher'))
+        jss1 = Classes.objects.create(name='JSS 1', teacher=cls.teacher)
+        jss2 = Classes.objects.create(name='JSS 2', teacher=cls.other_teacher)
+        cls.maths = Subject.objects.create(name='Mathematics', assigned_class=jss1, teacher=cls.teacher)
+        Subject.objects.create(name='English', assigned_class=jss2, teacher=cls.other_teacher)
+
+        cls.student = StudentProfile.objects.create(
+            user=cls.create_user('student@example.com', 'student'), class_level='JSS 1'
+        )
+        other_student = StudentProfile.objects.create(
+            user=cls.create_user('classmate@example.com', 'student'), class_level='JSS 1'
+        )
+        exam = Exam.objects.create(title='Mid-term', subject=cls.maths, teacher=cls.teacher, exam_date='2025-03-01')
+        cls.result = Result.objects.create(student=cls.student, exam=exam, score=70)
+        Result.objects.create(student=other_student, exam=exam, score=60)
+
+        event = Event.objects.create(title='Sports Day', description='Games', date=timezone.now(), location='Field')
+        cls.participant = EventParticipant.objects.create(event=event, student=cls.student)
+        EventParticipant.objects.create(event=event, student=other_student)
+
+    @classmethod
+    def create_user(cls, email, role):
+        return User.objects.create_user(email=email, password='pass12345', role=role, is_active=True, is_verified=True)
+
+    def get(self, profile, url_name):
+        client = APIClient()
+        client.force_authenticate(user=profile.user)
+        response = client.get(reverse(url_name))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['results'] if isinstance(response.data, dict) else response.data
+
+    def test_results_are_scoped_to_the_student_or_the_exam_teacher(self):
+        self.assertEqual([row['id'] for row in self.get(self.student, 'result-list')], [self.result.id])
+        self.assertEqual(len(self.get(self.teacher, 'result-list')), 2)
+        self.assertEqual(self.get(self.other_teacher, 'result-list'), [])
+
+    def test_subjects_are_scoped_to_the_teacher_or_the_students_class(self):
+        self.assertEqual([row['name'] for row in self.get(self.student, 'subject-list')], ['Mathematics'])
+        self.assertEqual([row['name'] for row in self.get(self.other_teacher, 'subject-list')], ['English'])
+
+    def test_participants_route_is_not_taken_by_the_event_detail(self):
+        rows = self.get(self.student, 'eventparticipant-list')
+
+        self.assertEqual([row['id'] for row in rows], [self.participant.id])
+        self.assertEqual(len(self.get(self.teacher, 'eventparticipant-list')), 2)
+
+
+class QueryBudgetTest(TestCase):
+    """
+    Every list endpoint must cost the same number of queries whatever the
+    page size, and every list/retrieve endpoint must stay within its budget.
+    A nested serializer without a matching select_related shows up here as a
+    count that grows with the page.
+    """
+    STUDENTS = 12
+
+    # url name -> maximum queries for one request, authentication excluded
+    LIST_BUDGETS = {
+        'exam-list': 3,
+        'assignment-list': 3,
+        'result-list': 4,
+        'attendance-list': 3,
+        'eventparticipant-list': 3,
+        'event-list': 2,
+        'announcements-list': 2,
+        'student-list': 2,
+        'classes-list': 2,
+        'subject-list': 3,
+        'teacher-list': 2,
+        'parent-list': 2,
+        'admin-list': 2,
+        'grade-list': 2,
+    }
+    RETRIEVE_BUDGETS = {
+        'exam-detail': 2,
+        'assignment-detail': 2,
+        'result-detail': 3,
+        'attendance-detail': 2,
+        'eventparticipant-detail': 2,
+        'event-detail': 1,
+        'announcements-detail': 1,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher_user = cls.create_user('teacher@example.com', 'teacher')
+        cls.teacher = TeacherProfile.objects.create(user=cls.teacher_user, subject_specialization='Maths')
+        cls.admin_user = cls.create_user('admin@example.com', 'admin')
+
+        for i in range(2):
+            AdminProfile.objects.create(user=cls.create_user(f'admin{i}@example.com', 'admin'), position='Bursar')
+            TeacherProfile.objects.create(user=cls.create_user(f'teacher{i}@example.com', 'teacher'))
+
+        class_ref = Classes.objects.create(name='JSS 1', teacher=cls.teacher)
+        maths = Subject.objects.create(name='Mathematics', assigned_class=class_ref, teacher=cls.teacher)
+        grade = Grade.objects.create(name='A')
+        Grade.objects.create(name='B')
+        for i in range(cls.STUDENTS):
+            Lesson.objects.create(title=f'Lesson {i}', content='Notes', subject=maths, date='2025-03-01')
+        for i in range(2, 5):
+            other_class = Classes.objects.create(name=f'JSS {i}', teacher=cls.teacher)
+            Subject.objects.create(name='Mathematics', assigned_class=other_class, teacher=cls.teacher)
+
+        students = []
+        for i in range(cls.STUDENTS):
+            parent = ParentProfile.objects.create(user=cls.create_user(f'parent{i}@example.com', 'parent'))
+            student = StudentProfile.objects.create(
+                user=cls.create_user(f'student{i}@example.com', 'student'),
+                class_level=class_ref.name,
+                parent_name=parent.user.get_full_name()
+            )
+            students.append((student, parent))
+
+        exam = Exam.objects.create(
+            title='Mid-term', subject=maths, teacher=cls.teacher, grade=grade, exam_date='2025-03-01'
+        )
+        assignment = Assignment.objects.create(
+            title='Fractions', description='Worksheet', subject=maths,
+            teacher=cls.teacher, grade=grade, due_date='2025-03-05'
+        )
+        for i in range(cls.STUDENTS):
+            Exam.objects.create(title=f'Quiz {i}', subject=maths, teacher=cls.teacher, grade=grade, exam_date='2025-02-01')
+            Assignment.objects.create(
+                title=f'Homework {i}', description='Practice', subject=maths,
+                teacher=cls.teacher, grade=grade, due_date='2025-02-05'
+            )
+
+        event = Event.objects.create(
+            title='Sports Day', description='Annual games', date=timezone.now(), location='Field'
+        )
+        for i in range(cls.STUDENTS):
+            Event.objects.create(
+                title=f'Club {i}', description='Club meeting', date=timezone.now(), location='Hall'
+            )
+            Announcement.objects.create(
+                title=f'Notice {i}', message='Read me', target_teachers=True,
+                start_date=timezone.now() - timedelta(days=1)
+            )
+
+        for student, parent in students:
+            Result.objects.create(student=student, exam=exam, score=70)
+            Result.objects.create(student=student, assignment=assignment, score=80)
+            AttendanceRecord.objects.create(
+                student=student, class_ref=class_ref, date='2025-03-03',
+                status=AttendanceStatus.PRESENT, recorded_by=cls.teacher
+            )
+            EventParticipant.objects.create(event=event, student=student)
+            EventParticipant.objects.create(event=event, parent=parent)
+        EventParticipant.objects.create(event=event, teacher=cls.teacher)
+
+    @classmethod
+    def create_user(cls, email, role):
+        user = User(email=email, first_name=role.title(), last_name=email.split('@')[0], role=role,
+                    is_active=True, is_verified=True)
+        user.set_unusable_password()
+        user.save()
+        return user
+
+    def count_queries(self, user, url, params=None):
+        # A fresh user instance and an empty cache per request, so profile
+        # lookups or feeds cached by a previous request do not hide queries.
+        cache.clear()
+        client = APIClient()
+        client.force_authenticate(user=User.objects.get(pk=user.pk))
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+        return len(context.captured_queries), response
+
+    def user_for(self, url_name):
+        if url_name.startswith(('student-', 'admin-')):
+            return self.admin_user
+        return self.teacher_user
+
+    def test_list_query_count_does_not_depend_on_page_size(self):
+        for url_name, budget in self.LIST_BUDGETS.items():
+            with self.subTest(endpoint=url_name):
+                url = reverse(url_name)
+                user = self.user_for(url_name)
+                small, _ = self.count_queries(user, url, {'page_size': 1})
+                large, response = self.count_queries(user, url, {'page_size': 100})
+
+                rows = response.data['results'] if isinstance(response.data, dict) else response.data
+                self.assertGreater(len(rows), 1, url_name)
+                self.assertEqual(small, large, f"{url_name} query count grows with page size")
+                self.assertEqual(large, budget, f"{url_name} no longer costs {budget} queries")
+
+    def test_lesson_list_query_count_does_not_depend_on_size(self):
+        # LessonViewSet is not routed, so it is called directly.
+        view = LessonViewSet.as_view({'get': 'list'})
+        counts = []
+        for _ in range(2):
+            request = APIRequestFactory().get('/lessons/')
+            force_authenticate(request, user=User.objects.get(pk=self.teacher_user.pk))
+            with CaptureQueriesContext(connection) as context:
+                response = view(request)
+            self.assertEqual(len(response.data), Lesson.objects.count())
+            counts.append(len(context.captured_queries))
+            Lesson.objects.exclude(title='Lesson 0').delete()
+
+        self.assertEqual(counts, [1, 1])
+
+    def test_retrieve_query_budgets(self):
+        lookups = {
+            'exam-detail': Exam.objects.first(),
+            'assignment-detail': Assignment.objects.first(),
+            'result-detail': Result.objects.filter(assignment__isnull=False).first(),
+            'attendance-detail': AttendanceRecord.objects.first(),
+            'eventparticipant-detail': EventParticipant.objects.filter(student__isnull=False).first(),
+            'event-detail': Event.objects.first(),
+            'announcements-detail': Announcement.objects.first(),
+        }
+        for url_name, budget in self.RETRIEVE_BUDGETS.items():
+            with self.subTest(endpoint=url_name):
+                url = reverse(url_name, args=[lookups[url_name].pk])
+                count, _ = self.count_queries(self.user_for(url_name), url)
+                self.assertEqual(count, budget, f"{url_name} no longer costs {budget} queries")
+
+
+class FullTextSearchTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='admin@example.com',
+            password='adminpass123',
+            role='admin',
+            is_active=True,
+            is_verified=True
+        )
+        self.client.force_authenticate(user=self.user)
+
+        class_ref = Classes.objects.create(name='JSS 1')
+        self.maths = Subject.objects.create(name='Mathematics', assigned_class=class_ref)
+        self.english = Subject.objects.create(name='English', assigned_class=class_ref)
+        self.algebra = Exam.objects.create(
+            title='Algebra test', subject=self.maths, exam_date='2025-03-01',
+            description='Mathematics mathematics mathematics'
+        )
+        self.geometry = Exam.objects.create(title='Geometry test', subject=self.maths, exam_date='2025-03-02')
+        self.essay = Exam.objects.create(title='Essay writing', subject=self.english, exam_date='2025-03-03')
+
+    def titles(self, queryset):
+        return [exam.title for exam in queryset]
+
+    def test_sqlite_uses_fts5(self):
+        self.assertEqual(search_backend(), 'fts5')
+
+    def test_search_matches_related_fields_and_ranks_by_relevance(self):
+        results = search(Exam.objects.order_by('-id'), 'math')
+
+        self.assertEqual(self.titles(results), ['Algebra test', 'Geometry test'])
+
+    def test_every_term_must_match(self):
+        results = search(Exam.objects.all(), 'geometry math')
+
+        self.assertEqual(self.titles(results), ['Geometry test'])
+
+    def test_index_follows_related_renames_and_deletes(self):
+        self.english.name = 'Literature'
+        self.english.save()
+        self.assertEqual(self.titles(search(Exam.objects.all(), 'literature')), ['Essay writing'])
+
+        self.essay.delete()
+        self.assertFalse(SearchDocument.objects.filter(model='assessment.exam', object_id=self.essay.pk).exists())
+
+    def test_search_agrees_with_icontains_on_whole_words(self):
+        for term in ['algebra', 'test', 'english']:
+            with self.subTest(term=term):
+                self.assertEqual(
+                    set(self.titles(search(Exam.objects.all(), term))),
+                    set(self.titles(icontains_search(Exam.objects.all(), term)))
+                )
+
+    def test_search_parameter_on_endpoints(self):
+        Event.objects.create(title='Sports Day', description='Games', date=timezone.now(), location='Field')
+        Announcement.objects.create(title='Exam timetable', message='Mathematics first')
+
+        response = self.client.get(reverse('exam-list'), {'search': 'essay'})
+        self.assertEqual([exam['title'] for exam in response.data['results']], ['Essay writing'])
+
+        response = self.client.get(reverse('event-list'), {'search': 'sports'})
+        self.assertEqual([event['title'] for event in response.data['results']], ['Sports Day'])
+
+        response = self.client.get(reverse('announcements-list'), {'search': 'mathematics'})
+        self.assertEqual([item['title'] for item in response.data['results']], ['Exam timetable'])
+
+
+class ScaleSeedTest(TestCase):
+    def seed(self):
+        call_command('seed_all', scale=45, days=6, clear=True, stdout=StringIO())
+        return list(User.objects.order_by('email').values_list('email', 'first_name', 'last_name'))
+
+    def test_scale_seed_builds_a_consistent_dataset(self):
+        self.seed()
+
+        self.assertEqual(StudentProfile.objects.count(), 45)
+        self.assertEqual(Classes.objects.count(), 2)
+        self.assertEqual(Result.objects.count(), 45 * 20)
+        school_days = AttendanceRecord.objects.values('date').distinct().count()
+        self.assertEqual(AttendanceRecord.objects.count(), 45 * school_days)
+        self.assertEqual(
+            sum(DailyAttendanceSummary.objects.values_list('present', flat=True)),
+            AttendanceRecord.objects.filter(status=AttendanceStatus.PRESENT).count()
+        )
+        self.assertEqual(
+            StudentProfile.objects.values('admission_number').distinct().count(), 45
+        )
+        self.assertEqual(User.objects.filter(role='student').values('password').distinct().count(), 1)
+        self.assertTrue(User.objects.get(email='student0@seed.school').check_password('student123'))
+        # Seeded students lack phone, address, photo...: none is onboarded.
+        self.assertFalse(StudentProfile.objects.filter(is_onboarded=True).exists())
+
+    def test_scale_seed_is_deterministic(self):
+        self.assertEqual(self.seed(), self.seed())
+
+
+class ExportTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            email='admin@example.com', password='adminpass123', role='admin', is_active=True, is_verified=True
+        )
+        self.client.force_authenticate(user=self.admin)
+
+        self.jss1 = Classes.objects.create(name='JSS 1')
+        self.jss2 = Classes.objects.create(name='JSS 2')
+        self.students = []
+        for i, class_ref in enumerate([self.jss1, self.jss1, self.jss2]):
+            user = User.objects.create_user(
+                email=f'student{i}@example.com', password='studentpass123', first_name=f'Student{i}',
+                last_name='Pupil', role='student', is_active=True, is_verified=True
+            )
+            self.students.append(StudentProfile.objects.create(
+                user=user, class_level=class_ref.name, academic_year='2024/2025' if i else '2023/2024'
+            ))
+            for day in (date(2025, 1, 6), date(2025, 2, 3)):
+                AttendanceRecord.objects.create(student=self.students[-1], class_ref=class_ref, date=day)
+
+    def export(self, name, **params):
+        response = self.client.get(reverse('export-data', args=[name]), params, HTTP_ACCEPT='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export_with_filters(self):
+        body = self.export('attendance', **{'class': 'JSS 1', 'start_date': '2025-02-01'})
+
+        lines = body.splitlines()
+        self.assertEqual(lines[0], 'id,date,admission_number,student_first_name,student_last_name,class_name,status,recorded_by')
+        self.assertEqual([line.split(',')[3] for line in lines[1:]], ['Student0', 'Student1'])
+        self.assertTrue(all(',2025-02-03,' in line for line in lines[1:]))
+
+    def test_ndjson_export_by_academic_year(self):
+        body = self.export('students', output='ndjson', academic_year='2024/2025')
+
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['email'] for row in rows], ['student1@example.com', 'student2@example.com'])
+
+    def test_export_is_fetched_in_chunks(self):
+        from .exports import stream_export
+
+        _, _, chunks = stream_export('attendance', chunk_size=2)
+
+        self.assertEqual(len(list(chunks)), 1 + 3)
+
+    def test_invalid_requests(self):
+        url = reverse('export-data', args=['attendance'])
+        self.assertEqual(self.client.get(reverse('export-data', args=['payroll'])).status_code, 400)
+        self.assertEqual(self.client.get(url, {'output': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start_date': '06/01/2025'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'end_date': '2025-02-30'}).status_code, 400)
+
+        self.client.force_authenticate(user=self.students[0].user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_command(self):
+        out = StringIO()
+        call_command('export_data', 'attendance', '--end-date', '2025-01-31', stdout=out)
+
+        self.assertEqual(len(out.getvalue().splitlines()), 1 + 3)
+
+
+class BouncingEmailBackend(locmem.EmailBackend):
+    """locmem backend that counts connections and refuses bounce@ addresses."""
+    opened = 0
+
+    def open(self):
+        BouncingEmailBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        for message in messages:
+            if any(address.startswith('bounce@') for address in message.to):
+                raise smtplib.SMTPRecipientsRefused({message.to[0]: (550, b'No such user')})
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND='core.tests.BouncingEmailBackend')
+class MailOutboxTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        BouncingEmailBackend.opened = 0
+        self.user = User.objects.create_user(
+            email='ada@example.com', password='adapass123', first_name='Ada', role='student',
+            is_active=True, is_verified=True
+        )
+
+    def test_password_reset_is_queued_not_sent(self):
+        response = self.client.post(reverse('password-reset'), {'email': self.user.email}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(mail.outbox), 0)
+        self.user.refresh_from_db()
+        queued = OutboxEmail.objects.get()
+        self.assertEqual(queued.to, [self.user.email])
+        self.assertIn(self.user.password_reset_token, queued.body)
+
+        call_command('run_mail_worker', '--once', stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, 'Your Password Reset Code')
+        self.assertEqual(OutboxEmail.objects.get().status, OutboxEmailStatus.SENT)
+
+    def test_signup_queues_verification_email(self):
+        response = self.client.post(reverse('user-list'), {
+            'email': 'new@example.com', 'password': 'newpass1234', 'first_name': 'New',
+            'last_name': 'User', 'role': 'student',
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        queued = OutboxEmail.objects.get()
+        self.assertEqual(queued.to, ['new@example.com'])
+        self.assertIn(response.data['token'], queued.body)
+
+    def test_batch_shares_one_connection_and_failures_back_off(self):
+        for address in ['one@example.com', 'bounce@example.com', 'two@example.com']:
+            queue_mail('Hello', 'Body', None, [address])
+
+        self.assertEqual(send_queued_mail(), (2, 1))
+
+        self.assertEqual(BouncingEmailBackend.opened, 2)  # the first, and one reopen after the bounce
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['one@example.com', 'two@example.com'])
+        bounced = OutboxEmail.objects.get(to=['bounce@example.com'])
+        self.assertEqual(bounced.status, OutboxEmailStatus.PENDING)
+        self.assertEqual(bounced.attempts, 1)
+        self.assertIn('No such user', bounced.last_error)
+        self.assertGreater(bounced.next_attempt_at, timezone.now() + timedelta(seconds=50))
+
+        # Not due yet, so nothing is retried until the backoff has passed.
+        self.assertEqual(send_queued_mail(), (0, 0))
+        OutboxEmail.objects.filter(pk=bounced.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(send_queued_mail(max_attempts=2), (0, 1))
+        bounced.refresh_from_db()
+        self.assertEqual(bounced.status, OutboxEmailStatus.FAILED)
+        self.assertEqual(bounced.attempts, 2)
+
+
+@override_settings(SERVER_TIMING=True)
+class ServerTimingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='admin@example.com', password='adminpass123', role='admin', is_active=True, is_verified=True
+        )
+        Event.objects.create(title='Sports Day', description='Games', date=timezone.now(), location='Field')
+
+    def get(self, url):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        return response, len(context.captured_queries)
+
+    def metrics(self, response):
+        return dict(
+            (metric.split(';', 1) + [''])[:2] for metric in response['Server-Timing'].split(', ')
+        )
+
+    def test_header_reports_queries_serialization_and_cache(self):
+        response, queries = self.get(reverse('event-list'))
+        metrics = self.metrics(response)
+
+        self.assertEqual(set(metrics), {'total', 'view', 'db', 'serialize'})
+        self.assertIn(f'desc="{queries} queries"', metrics['db'])
+
+        self.get(reverse('announcements-list'))
+        response, _ = self.get(reverse('announcements-list'))
+        self.assertEqual(self.metrics(response)['cache'], 'desc="hits=2 misses=0"')
+
+    def test_function_views_report_serialization(self):
+        response, _ = self.get(reverse('weekly_attendance_summary'))
+
+        self.assertIn('serialize', self.metrics(response))
+
+    @override_settings(SERVER_TIMING_LOG=True)
+    def test_timings_are_logged_as_json(self):
+        with self.assertLogs('core.timing', 'INFO') as logs:
+            self.get(reverse('event-list'))
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual((line['path'], line['status']), (reverse('event-list'), 200))
+        self.assertGreater(line['queries'], 0)
+
+    @override_settings(SERVER_TIMING=False)
+    def test_can_be_switched_off(self):
+        response, _ = self.get(reverse('event-list'))
+
+        self.assertNotIn('Server-Timing', response)
+
+
+class MetricsTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_override = override_settings(METRICS_DIR=directory.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.directory = directory.name
+        registry.reset()
+
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            email='admin@example.com', password='adminpass123', role='admin', is_active=True, is_verified=True
+        )
+        self.client.force_authenticate(user=self.admin)
+
+    def scrape(self):
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        return response.content.decode().splitlines()
+
+    def test_requests_are_counted_per_url_name(self):
+        self.client.get(reverse('event-list'))
+        self.client.get(reverse('event-list'))
+        self.client.get('/api/no-such-endpoint/')
+
+        lines = self.scrape()
+
+        self.assertIn('http_requests_total{view="event-list",method="GET",status="2xx"} 2', lines)
+        self.assertIn('http_requests_total{view="unmatched",method="GET",status="4xx"} 1', lines)
+        self.assertIn('http_request_duration_seconds_bucket{view="event-list",method="GET",le="+Inf"} 2', lines)
+        self.assertIn('http_request_duration_seconds_count{view="event-list",method="GET"} 2', lines)
+
+    def test_other_workers_are_added_up(self):
+        self.client.get(reverse('event-list'))
+        # Three requests that took over 10 seconds, i.e. only in the +Inf bucket.
+        buckets = [0] * 11 + [3]
+        with open(os.path.join(self.directory, '99999-1.json'), 'w') as f:
+            json.dump({
+                'requests': [['event-list', 'GET', '2xx', 3], ['event-list', 'GET', '5xx', 1]],
+                'latency': [['event-list', 'GET', *buckets, 36.0]],
+            }, f)
+
+        lines = self.scrape()
+
+        self.assertIn('http_requests_total{view="event-list",method="GET",status="2xx"} 4', lines)
+        self.assertIn('http_requests_total{view="event-list",method="GET",status="5xx"} 1', lines)
+        self.assertIn('http_request_duration_seconds_bucket{view="event-list",method="GET",le="10.0"} 1', lines)
+        self.assertIn('http_request_duration_seconds_bucket{view="event-list",method="GET",le="+Inf"} 4', lines)
+        self.assertIn('http_request_duration_seconds_count{view="event-list",method="GET"} 4', lines)
+
+    def test_worker_reusing_a_pid_keeps_the_dead_workers_totals(self):
+        with open(os.path.join(self.directory, f'{os.getpid()}-1.json'), 'w') as f:
+            json.dump({'requests': [['event-list', 'GET', '2xx', 5]], 'latency': []}, f)
+
+        self.client.get(reverse('event-list'))
+        lines = self.scrape()
+
+        self.assertIn('http_requests_total{view="event-list",method="GET",status="2xx"} 6', lines)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+    def test_clear_metrics_command(self):
+        self.client.get(reverse('event-list'))
+        registry.flush()
+
+        out = StringIO()
+        call_command('clear_metrics', stdout=out)
+
+        self.assertIn('Cleared 1 metrics files', out.getvalue())
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_admin_only(self):
+        teacher = User.objects.create_user(
+            email='teacher@example.com', password='teacherpass123', role='teacher', is_active=True, is_verified=True
+        )
+        self.client.force_authenticate(user=teacher)
+
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class LoggingPipelineTest(TestCase):
+    def record(self, name, level=logging.DEBUG):
+        return logging.LogRecord(name, level, __file__, 1, 'message', (), None)
+
+    def test_debug_sampling_per_logger(self):
+        sampler = DebugSampler({'accounts': 0.25, 'accounts.stats': 1, 'faker': 0})
+
+        kept = [sampler.filter(self.record('accounts.views')) for _ in range(8)]
+
+        self.assertEqual(kept.count(True), 2)
+        self.assertTrue(sampler.filter(self.record('accounts.stats')))
+        self.assertFalse(sampler.filter(self.record('faker.factory')))
+        self.assertTrue(sampler.filter(self.record('faker.factory', logging.WARNING)))
+        self.assertTrue(sampler.filter(self.record('events.views')))
+
+    def test_records_are_written_in_the_background_and_rotated(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'app.log')
+            handler = BackgroundLogHandler(path, max_bytes=200, backup_count=2, console=False)
+            handler.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+            logger = logging.getLogger('core.tests.background')
+            logger.addHandler(handler)
+            logger.propagate = False
+            try:
+                for i in range(20):
+                    logger.warning('line %s of the rotation test', i)
+            finally:
+                logger.removeHandler(handler)
+                handler.close()
+
+            self.assertEqual(sorted(os.listdir(directory)), ['app.log', 'app.log.1', 'app.log.2'])
+            with open(path) as f:
+                self.assertTrue(f.read().endswith('WARNING line 19 of the rotation test\n'))
+
+    def test_fork_hook_is_registered_once(self):
+        with mock.patch('core.log_handlers.os.register_at_fork') as register_at_fork:
+            handler = BackgroundLogHandler(console=False)
+            handler.close()
+
+        register_at_fork.assert_not_called()
+
+    def test_every_process_gets_its_own_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            handler = BackgroundLogHandler(os.path.join(directory, 'app-{pid}.log'), console=False)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger = logging.getLogger('core.tests.per_process')
+            logger.addHandler(handler)
+            logger.propagate = False
+            try:
+                logger.warning('parent')
+                # A forked worker has no listener thread and then runs the
+                # fork hook.
+                handler.listener.stop()
+                with mock.patch('core.log_handlers.os.getpid', return_value=4242):
+                    restart_handlers()
+                logger.warning('worker')
+            finally:
+                logger.removeHandler(handler)
+                handler.close()
+
+            with open(os.path.join(directory, f'app-{os.getpid()}.log')) as f:
+                self.assertEqual(f.read(), 'parent\n')
+            with open(os.path.join(directory, 'app-4242.log')) as f:
+                self.assertEqual(f.read(), 'worker\n')
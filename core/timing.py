@@ -0,0 +1,83 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from django.core.cache import cache
+
+# The timings of the request being handled, or None when the Server-Timing
+# middleware is off (every helper below is then a no-op).
+current_timings = ContextVar('current_timings', default=None)
+
+
+class RequestTimings:
+    """Where one request spent its time. Durations are in seconds."""
+
+    def __init__(self):
+        self.total = 0.0
+        self.view_started = None
+        self.view = None
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        # Installed with connection.execute_wrapper() for the whole request.
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += perf_counter() - started
+            self.queries += 1
+
+    def as_dict(self):
+        milliseconds = lambda seconds: round(seconds * 1000, 1) if seconds is not None else None
+        return {
+            'total_ms': milliseconds(self.total),
+            'view_ms': milliseconds(self.view),
+            'db_ms': milliseconds(self.db),
+            'queries': self.queries,
+            'serialize_ms': milliseconds(self.serialize),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+        }
+
+    def header(self):
+        metrics = [f'total;dur={self.total * 1000:.1f}']
+        if self.view is not None:
+            metrics.append(f'view;dur={self.view * 1000:.1f}')
+        metrics.append(f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries"')
+        if self.serialize:
+            metrics.append(f'serialize;dur={self.serialize * 1000:.1f}')
+        if self.cache_hits or self.cache_misses:
+            metrics.append(f'cache;desc="hits={self.cache_hits} misses={self.cache_misses}"')
+        return ', '.join(metrics)
+
+
+@contextmanager
+def measure_serialization():
+    """
+    Time a block of serializer work. Queries it triggers (lazy querysets,
+    related fields) are already counted as DB time, so they are left out.
+    """
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    started, db_before = perf_counter(), timings.db
+    try:
+        yield
+    finally:
+        timings.serialize += perf_counter() - started - (timings.db - db_before)
+
+
+def cache_get(key):
+    """cache.get() that counts the lookup as a hit or a miss for Server-Timing."""
+    value = cache.get(key)
+    timings = current_timings.get()
+    if timings is not None:
+        if value is None:
+            timings.cache_misses += 1
+        else:
+            timings.cache_hits += 1
+    return value
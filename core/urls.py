@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import ExportView
+
+urlpatterns = [
+    path('<str:name>/', ExportView.as_view(), name='export-data'),
+]
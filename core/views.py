@@ -1,3 +1,69 @@
-from django.shortcuts import render
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from rest_framework import status
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from accounts.permissions import RolePermission
+from .exports import stream_export, ExportError
+from .metrics import registry, render_prometheus
 
-# Create your views here.
+
+class OwnContentTypeNegotiation(BaseContentNegotiation):
+    # For views that pick their own content type (exports, metrics), so a
+    # client asking for text/csv or text/plain is not turned away by the
+    # JSON renderers.
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class ExportView(APIView):
+    """
+    Stream a full table as CSV (default) or NDJSON (?output=ndjson).
+    Optional filters: class (class name), start_date and end_date
+    (YYYY-MM-DD) and academic_year.
+    """
+    permission_classes = [IsAuthenticated, RolePermission]
+    required_roles = ["admin"]
+    content_negotiation_class = OwnContentTypeNegotiation
+
+    def get(self, request, name):
+        params = request.query_params
+        filters = {
+            'class_name': params.get('class'),
+            'academic_year': params.get('academic_year'),
+        }
+        for param in ('start_date', 'end_date'):
+            value = params.get(param)
+            try:
+                # None for a malformed date, ValueError for an impossible one.
+                parsed = parse_date(value) if value else None
+            except ValueError:
+                parsed = None
+            if value and parsed is None:
+                return Response({"error": f"{param} must be a date in YYYY-MM-DD format."},
+                                status=status.HTTP_400_BAD_REQUEST)
+            filters[param] = parsed
+
+        try:
+            content_type, filename, chunks = stream_export(name, params.get('output', 'csv'), **filters)
+        except ExportError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class MetricsView(APIView):
+    """Request counts and latency histograms of every worker, in Prometheus text format."""
+    permission_classes = [IsAuthenticated, RolePermission]
+    required_roles = ["admin"]
+    content_negotiation_class = OwnContentTypeNegotiation
+
+    def get(self, request):
+        return HttpResponse(render_prometheus(registry.collect()), content_type='text/plain; version=0.0.4')
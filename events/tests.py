@@ -1,3 +1,68 @@
+from datetime import timedelta
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from accounts.models import User
+from .models import Event
 
-# Create your tests here.
+
+class EventConditionalGetTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.student = User.objects.create_user(
+            email='student@example.com',
+            password='studentpass123',
+            role='student',
+            is_active=True,
+            is_verified=True
+        )
+        self.client.force_authenticate(user=self.student)
+        self.url = reverse('event-list')
+
+        soon = timezone.now() + timedelta(days=7)
+        self.event = Event.objects.create(title='Sports day', description='Races', date=soon, location='Field')
+        Event.objects.create(title='Open day', description='Tours', date=soon, location='Hall')
+
+    def test_unchanged_list_is_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_list_changes_when_an_event_is_edited_or_deleted(self):
+        etag = self.client.get(self.url)['ETag']
+
+        self.event.location = 'Stadium'
+        self.event.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+        etag = response['ETag']
+        Event.objects.filter(title='Open day').delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+
+    def test_etag_depends_on_the_query(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, {'page_size': 1}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_unchanged_event_is_not_modified(self):
+        url = reverse('event-detail', args=[self.event.pk])
+        etag = self.client.get(url)['ETag']
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.event.title = 'Sports gala'
+        self.event.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
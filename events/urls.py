@@ -3,8 +3,8 @@ from rest_framework.routers import DefaultRouter
 from .views import EventViewSet, EventParticipantViewSet
 
 router = DefaultRouter()
-router.register(r'', EventViewSet, basename='event')
 router.register(r'participants', EventParticipantViewSet, basename='eventparticipant')
+router.register(r'', EventViewSet, basename='event')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -8,15 +8,15 @@ from .serializers import (
     EventParticipantCreateSerializer
 )
 from accounts.permissions import IsAdminOrReadOnly
-from rest_framework.pagination import PageNumberPagination
+from core.conditional import ConditionalGetMixin
+from core.pagination import CursorOptInPagination
+from core.search import search as search_queryset
 from rest_framework.response import Response
 
-class EventPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+class EventPagination(CursorOptInPagination):
+    cursor_ordering = '-date'
 
-class EventViewSet(viewsets.ModelViewSet):
+class EventViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Event.objects.all().order_by('-date')
     serializer_class = EventSerializer
     permission_classes = [permissions.IsAuthenticated, IsAdminOrReadOnly]
@@ -34,30 +34,12 @@ class EventViewSet(viewsets.ModelViewSet):
      
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search) |
-                Q(location__icontains=search)
-            )
+            queryset = search_queryset(queryset, search)
             
         return queryset
 
-    def list(self, request, *args, **kwargs):
-      
-        queryset = self.filter_queryset(self.get_queryset())
-        page = self.paginate_queryset(queryset)
-        
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-            
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
-
-class EventParticipantPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+class EventParticipantPagination(CursorOptInPagination):
+    cursor_ordering = '-registered_at'
 
 class EventParticipantViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
@@ -69,7 +51,12 @@ class EventParticipantViewSet(viewsets.ModelViewSet):
         return EventParticipantSerializer
 
     def get_queryset(self):
-        queryset = EventParticipant.objects.all()
+        queryset = EventParticipant.objects.all().select_related(
+            'event',
+            'student__user',
+            'teacher__user',
+            'parent__user'
+        )
         
      
         event_id = self.request.query_params.get('event_id')